@@ -27,8 +27,14 @@
   * Red  : Communication error
   Every update, the LED will alternate in brightness.
 
+  Readings are reported either as a tab-delimited ASCII line in reply to `?`,
+  or as a binary telemetry frame in reply to `?b`. See
+  `src_python/ambre_telemetry.py` for the frame layout. After the command
+  `stream on` the frames get pushed out periodically without being queried,
+  until `stream off` is received.
+
   Dennis van Gils
-  31-08-2020
+  15-10-2026
 *******************************************************************************/
 
 #include <Arduino.h>
@@ -48,6 +54,13 @@ Adafruit_NeoPixel neo(1, PIN_NEOPIXEL, NEO_GRB + NEO_KHZ800);
 #define NEO_DIM 3  // Brightness level for dim intensity [0 -255]
 #define NEO_BRIGHT 8 // Brightness level for bright intensity [0 - 255]
 
+// Identity to reply to `id?`. Give each board its own when acquiring from
+// several chambers at once, by building with the flag
+// `'-D CHAMBER_ID="Ambre chamber 2"'`, see `platformio.ini`.
+#ifndef CHAMBER_ID
+#define CHAMBER_ID "Ambre chamber"
+#endif
+
 #define PIN_DS18B20 5
 #define PIN_DHT22 6
 #define PIN_SOLENOID_VALVE 12
@@ -66,6 +79,52 @@ bool is_valve_open = false;  // State of the solenoid valve
 float humi_threshold = 50;   // Humidity threshold [%]
 bool open_valve_when_super_humi = true;
 
+bool is_streaming = false;       // Push out telemetry frames periodically?
+uint32_t stream_period = 1000;   // [ms]
+
+// Binary telemetry frame. Little-endian, like the SAMD51 itself.
+#define TELEMETRY_SYNC_WORD 0xA55A
+struct __attribute__((packed)) TelemetryFrame {
+    uint16_t sync;
+    uint8_t length;         // Payload length: `millis` up to `is_valve_open`
+    uint32_t millis;        // [ms]
+    float ds18_temp;        // ['C]
+    float dht22_temp;       // ['C]
+    float dht22_humi;       // [%]
+    uint8_t is_valve_open;
+    uint16_t crc;           // CRC-16/CCITT-FALSE over `length` up to `crc`
+};
+
+// -----------------------------------------------------------------------------
+//    Binary telemetry
+// -----------------------------------------------------------------------------
+
+uint16_t crc16_ccitt(const uint8_t *data, size_t len) {
+    uint16_t crc = 0xFFFF;
+    while (len--) {
+        crc ^= (uint16_t)(*data++) << 8;
+        for (uint8_t i = 0; i < 8; i++) {
+            crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : (crc << 1);
+        }
+    }
+    return crc;
+}
+
+void send_telemetry_frame(uint32_t tick) {
+    TelemetryFrame frame;
+    frame.sync = TELEMETRY_SYNC_WORD;
+    frame.length = offsetof(TelemetryFrame, crc) - offsetof(TelemetryFrame, millis);
+    frame.millis = tick;
+    frame.ds18_temp = ds18_temp;
+    frame.dht22_temp = dht22_temp;
+    frame.dht22_humi = dht22_humi;
+    frame.is_valve_open = is_valve_open;
+    frame.crc = crc16_ccitt(
+        (uint8_t *)&frame + offsetof(TelemetryFrame, length),
+        offsetof(TelemetryFrame, crc) - offsetof(TelemetryFrame, length));
+    Serial.write((uint8_t *)&frame, sizeof(frame));
+}
+
 // -----------------------------------------------------------------------------
 //    setup
 // -----------------------------------------------------------------------------
@@ -103,6 +162,7 @@ void loop() {
     uint32_t now = millis();
     static uint32_t dht22_tick = 0;
     static uint32_t ds18_tick = 0;
+    static uint32_t stream_tick = 0;
     static bool toggle_LED = false;
 
     if (now - dht22_tick >= UPDATE_PERIOD_DHT22) {
@@ -155,11 +215,35 @@ void loop() {
         }
     }
 
+    if (is_streaming && (now - stream_tick >= stream_period)) {
+        stream_tick = now;
+        send_telemetry_frame(now);
+    }
+
     if (sc.available()) {
         strCmd = sc.getCmd();
 
         if (strcmp(strCmd, "id?") == 0) {
-            Serial.println("Arduino, Ambre chamber");
+            Serial.println("Arduino, " CHAMBER_ID);
+
+        } else if (strcmp(strCmd, "?b") == 0) {
+            // Readings as binary telemetry frame
+            send_telemetry_frame(ds18_tick);
+
+        } else if (strcmp(strCmd, "bin?") == 0) {
+            // Binary telemetry frames are supported
+            Serial.println(1);
+
+        } else if (strcmp(strCmd, "stream on") == 0) {
+            is_streaming = true;
+            stream_tick = now - stream_period;  // Send first frame right away
+
+        } else if (strcmp(strCmd, "stream off") == 0) {
+            is_streaming = false;
+
+        } else if (strncmp(strCmd, "stream period", 13) == 0) {
+            // Set streaming period [ms]
+            stream_period = (uint32_t)max(parseFloatInString(strCmd, 13), 1.f);
 
         } else if (strcmp(strCmd, "th?") == 0) {
             // Get humidity threshold
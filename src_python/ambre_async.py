@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Asyncio device engine of the Ambre chamber, as an alternative to
+``QDeviceIO``.
+
+``QDeviceIO`` spends two threads on each Arduino: One for the DAQ and one for
+the jobs. Here, a single asyncio event loop running in a single thread does
+the queries, the command sends and the timeouts of any number of Arduinos
+concurrently. Select it with ``--engine asyncio``.
+
+Each Arduino gets an ``AsyncDeviceIO``, offering the part of the ``QDeviceIO``
+interface used by this application, signals included. The signals get emitted
+from the thread of the event loop and hence reach the widgets as queued
+connections through the Qt event loop, just like those of ``QDeviceIO``. The
+readings take the same path into the ``State``, the history and the log.
+"""
+
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+
+import time
+import asyncio
+import threading
+
+import serial
+from PyQt5 import QtCore
+
+from dvg_debug_functions import dprint, print_fancy_traceback as pft
+
+from ambre_telemetry import FRAME_SIZE, decode_frame
+
+# Interval at which to check for received bytes on serial ports that can not be
+# waited upon by the event loop, e.g. on Windows
+POLL_INTERVAL = 0.005  # [s]
+
+
+# ------------------------------------------------------------------------------
+#   AsyncEngine
+# ------------------------------------------------------------------------------
+
+
+class AsyncEngine(object):
+    """A single asyncio event loop, running in a thread of its own, shared by
+    all ``AsyncDeviceIO`` instances. The thread gets started by the first
+    device and stops once the last device has quit.
+
+    Args:
+        name (str, optional):
+            Name of the thread.
+    """
+
+    def __init__(self, name="asyncio"):
+        self.name = name
+        self.loop = asyncio.new_event_loop()
+        self._thread = None
+        self._N_devices = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Register a device, starting the event loop when not yet running."""
+        with self._lock:
+            self._N_devices += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=self.name, daemon=True
+                )
+                self._thread.start()
+
+    def release(self):
+        """Unregister a device, stopping the event loop after the last one."""
+        with self._lock:
+            self._N_devices -= 1
+            if self._N_devices > 0 or self._thread is None:
+                return
+
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Schedule coroutine ``coro`` on the event loop from any thread.
+        Returns a ``concurrent.futures.Future``."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, callback, *args):
+        """Schedule ``callback(*args)`` on the event loop from any thread."""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+
+# ------------------------------------------------------------------------------
+#   AsyncSerialLink
+# ------------------------------------------------------------------------------
+
+
+class AsyncSerialLink(object):
+    """Received bytes of a serial port, awaitable from the event loop.
+
+    Depending on the port, the event loop gets notified of received bytes by
+    the file descriptor of the port, by the ``on_reply_queued`` callback of a
+    ``SimulatedSerial``, or else by polling every ``POLL_INTERVAL``. Reads
+    never block the event loop.
+
+    Also offers the non-blocking part of the ``serial.Serial`` interface, i.e.
+    ``in_waiting``, ``read()`` and ``reset_input_buffer()``, on the received
+    bytes, such that it can stand in for the port of a
+    ``TelemetryStreamReader``.
+
+    Args:
+        ser (serial.Serial | SimulatedSerial):
+            Opened serial port.
+
+        loop (asyncio.AbstractEventLoop):
+            Event loop to await the bytes on.
+
+    Attributes:
+        timeout (float):
+            Read timeout [s], taken over from the port when attached.
+
+        is_broken (bool):
+            Has reading from the port failed, e.g. because it got unplugged?
+            All waits fail right away from then on, until reattached.
+    """
+
+    def __init__(self, ser, loop):
+        self.ser = ser
+        self.timeout = ser.timeout
+        self._loop = loop
+        self._buffer = bytearray()
+        self._waiter = None  # Future to resolve once bytes got received
+        self._mode = None
+        self._poll_handle = None
+        self._fd = None
+        self.is_broken = False
+
+    def attach(self):
+        """Start receiving. Must be called from within the event loop."""
+        self.timeout = self.ser.timeout
+        self.is_broken = False
+
+        if hasattr(self.ser, "on_reply_queued"):
+            self.ser.on_reply_queued = self._on_reply_queued
+            self._mode = "notify"
+        else:
+            try:
+                self._fd = self.ser.fileno()
+                self._loop.add_reader(self._fd, self._pull)
+            except (AttributeError, NotImplementedError, OSError, ValueError):
+                self._mode = "poll"
+                self._poll()
+            else:
+                self._mode = "reader"
+                self.ser.timeout = 0  # Never block, just in case
+
+        self._pull()  # Bytes received before attaching
+
+    def detach(self):
+        """Stop receiving. Must be called from within the event loop."""
+        if self._mode == "notify":
+            self.ser.on_reply_queued = None
+        elif self._mode == "reader":
+            self._loop.remove_reader(self._fd)
+            try:
+                self.ser.timeout = self.timeout
+            except (serial.SerialException, ValueError):
+                pass  # The port has gone or has been closed already
+        elif self._mode == "poll":
+            self._poll_handle.cancel()
+        self._mode = None
+
+    def reattach(self, ser):
+        """Start receiving from the newly opened port ``ser`` instead, e.g.
+        after a reconnect. Must be called from within the event loop."""
+        self.detach()
+        self.ser = ser
+        self._buffer.clear()
+        self.attach()
+
+    def _on_reply_queued(self, t_ready):
+        # Called from the thread that queued the reply
+        try:
+            self._loop.call_soon_threadsafe(self._pull_at, t_ready)
+        except RuntimeError:
+            pass  # Event loop has been stopped
+
+    def _pull_at(self, t_ready):
+        # The event loop may fire timers a tad early
+        delay = t_ready - time.perf_counter()
+        if delay > 0:
+            self._loop.call_later(delay, self._pull_at, t_ready)
+        else:
+            self._pull()
+
+    def _poll(self):
+        self._pull()
+        if self._mode == "poll":
+            self._poll_handle = self._loop.call_later(POLL_INTERVAL, self._poll)
+
+    def _pull(self):
+        try:
+            N_bytes = self.ser.in_waiting
+            if N_bytes:
+                self._buffer.extend(self.ser.read(N_bytes))
+        except Exception as err:  # pylint: disable=broad-except
+            # Most likely gone. Stop receiving, instead of being notified of
+            # the failing port over and over again.
+            pft(err, 3)
+            self.detach()
+            self.is_broken = True
+            N_bytes = 0
+
+        if (
+            (N_bytes or self.is_broken)
+            and self._waiter is not None
+            and not self._waiter.done()
+        ):
+            self._waiter.set_result(None)
+
+    async def _wait(self, is_satisfied, timeout) -> bool:
+        deadline = self._loop.time() + timeout
+        while not is_satisfied():
+            if self.is_broken:
+                return False
+
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                return False
+
+            # Not `asyncio.wait_for()`, which can swallow a cancellation when
+            # the bytes arrive at the same time
+            self._waiter = self._loop.create_future()
+            try:
+                await asyncio.wait((self._waiter,), timeout=remaining)
+            finally:
+                self._waiter = None
+
+        return True
+
+    async def wait_for_data(self, size=1, timeout=None) -> bool:
+        """Wait until at least ``size`` bytes have been received. Returns False
+        on a timeout."""
+        timeout = self.timeout if timeout is None else timeout
+        return await self._wait(lambda: len(self._buffer) >= size, timeout)
+
+    async def read_exactly(self, size, timeout=None) -> bytes:
+        """Wait for ``size`` bytes. Returns fewer bytes on a timeout, like
+        ``serial.Serial.read()``."""
+        timeout = self.timeout if timeout is None else timeout
+        await self._wait(lambda: len(self._buffer) >= size, timeout)
+        return self.read(size)
+
+    async def read_until(self, expected=b"\n", timeout=None) -> bytes:
+        """Wait for ``expected``, and return all bytes up to and including it.
+        Returns the bytes received so far on a timeout, like
+        ``serial.Serial.read_until()``."""
+        timeout = self.timeout if timeout is None else timeout
+        await self._wait(lambda: expected in self._buffer, timeout)
+        idx = self._buffer.find(expected)
+        return self.read(len(self._buffer) if idx < 0 else idx + len(expected))
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self._buffer)
+
+    def read(self, size=1) -> bytes:
+        """Take up to ``size`` of the received bytes, without waiting."""
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def reset_input_buffer(self):
+        self._buffer.clear()
+        if not self.is_broken:
+            self.ser.reset_input_buffer()
+
+
+# ------------------------------------------------------------------------------
+#   Queries
+# ------------------------------------------------------------------------------
+
+
+async def query_ascii_values(ard, link, msg, delimiter="\t"):
+    """Awaitable counterpart of ``Arduino.query_ascii_values()``."""
+    if not ard.write(msg):
+        return False, []
+
+    reply = await link.read_until(b"\n")
+    if not reply.endswith(b"\n"):
+        pft("Received 0 bytes. Read probably timed out.", 3)
+        return False, []
+
+    try:
+        return True, list(map(float, reply.decode().strip().split(delimiter)))
+    except ValueError as err:
+        pft(err, 3)
+        return False, []
+
+
+async def query_binary_state(ard, link):
+    """Awaitable counterpart of ``ambre_telemetry.query_binary_state()``."""
+    if not ard.write("?b"):
+        return False, []
+
+    readings = decode_frame(await link.read_exactly(FRAME_SIZE))
+    if readings is None:
+        # Out of sync or timed out. Drop whatever is left over so that the
+        # next query starts at a frame boundary again.
+        pft("Received corrupt telemetry frame.", 3)
+        link.reset_input_buffer()
+        return False, []
+
+    return True, readings
+
+
+# ------------------------------------------------------------------------------
+#   AsyncDeviceIO
+# ------------------------------------------------------------------------------
+
+
+class AsyncDeviceIO(QtCore.QObject):
+    """Counterpart of ``QDeviceIO`` running on an ``AsyncEngine`` instead of on
+    two threads of its own. Offers the part of the ``QDeviceIO`` interface used
+    by this application.
+
+    Args:
+        engine (AsyncEngine):
+            Engine to run on, possibly shared with other devices.
+
+        dev (Arduino):
+            Connected Arduino.
+
+        DAQ_function (Callable):
+            Coroutine function performing a single DAQ update. Returns True
+            when successful.
+
+        DAQ_interval_ms (int, optional):
+            Interval in between the DAQ updates [ms]. With 0, the DAQ updates
+            run back to back, e.g. when ``DAQ_function`` awaits a stream.
+
+        critical_not_alive_count (int, optional):
+            Number of consecutive failed DAQ updates after which the connection
+            is considered lost. With 0, it is never considered lost.
+
+    Attributes:
+        link (AsyncSerialLink):
+            Received bytes of the Arduino.
+
+        update_counter_DAQ (int):
+            Number of DAQ updates performed.
+
+        not_alive_counter_DAQ (int):
+            Number of consecutive failed DAQ updates.
+
+        obtained_DAQ_interval_ms (float):
+            Interval in between the two most recent DAQ updates [ms].
+
+        obtained_DAQ_rate_Hz (float):
+            Rate of the DAQ updates, evaluated every second [Hz].
+    """
+
+    signal_DAQ_updated = QtCore.pyqtSignal()
+    signal_connection_lost = QtCore.pyqtSignal()
+
+    def __init__(
+        self,
+        engine,
+        dev,
+        DAQ_function,
+        DAQ_interval_ms=1000,
+        critical_not_alive_count=1,
+    ):
+        super().__init__()
+        self.engine = engine
+        self.dev = dev
+        self.DAQ_function = DAQ_function
+        self.DAQ_interval_ms = DAQ_interval_ms
+        self.critical_not_alive_count = critical_not_alive_count
+
+        self.link = AsyncSerialLink(dev.ser, engine.loop)
+        self.update_counter_DAQ = 0
+        self.not_alive_counter_DAQ = 0
+        self.obtained_DAQ_interval_ms = float("nan")
+        self.obtained_DAQ_rate_Hz = float("nan")
+
+        self._task = None
+        self._is_quitting = False
+
+    def start(self, DAQ_priority=None) -> bool:
+        """Start the DAQ. ``DAQ_priority`` is accepted for compatibility with
+        ``QDeviceIO`` and ignored, the whole process having a raised priority
+        already."""
+        # pylint: disable=unused-argument
+        self.engine.acquire()
+        self._task = self.engine.submit(self._create_task()).result()
+        return True
+
+    def unpause_DAQ(self):
+        """No-op: Unlike a ``QDeviceIO`` worker with a continuous trigger, the
+        DAQ does not start out paused."""
+
+    def send(self, instruction, pass_args=()):
+        """Call ``instruction(*pass_args)`` on the event loop, in between the
+        DAQ updates, e.g. ``send(ard.write, "th50")``."""
+        if not isinstance(pass_args, tuple):
+            pass_args = (pass_args,)
+        self.engine.call_soon(self._perform_job, instruction, pass_args)
+
+    def _perform_job(self, instruction, pass_args):
+        try:
+            instruction(*pass_args)
+        except Exception as err:  # pylint: disable=broad-except
+            pft(err, 3)
+
+    def quit(self) -> bool:
+        """Stop the DAQ and wait for it to have stopped."""
+        print(
+            "Closing task %s " % ("%s_DAQ" % self.dev.name).ljust(18, "."),
+            end="",
+        )
+        if self._task is not None:
+            self.engine.submit(self._cancel_task()).result()
+            self._task = None
+            self.engine.release()
+
+        print("done.")
+        return True
+
+    async def _create_task(self):
+        return asyncio.ensure_future(self._run())
+
+    async def _cancel_task(self):
+        self._is_quitting = True
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        except Exception as err:  # pylint: disable=broad-except
+            pft(err, 3)
+
+    async def _run(self):
+        self.link.attach()
+        try:
+            await self._DAQ_loop()
+        finally:
+            self.link.detach()
+
+    async def _DAQ_loop(self):
+        interval = self.DAQ_interval_ms / 1e3
+        t_next = time.perf_counter()
+        t_prev = None
+        t_rate = None
+        N_rate = 0
+
+        while not self._is_quitting:
+            if interval > 0:
+                # Keep to a fixed schedule. Ticks missed by falling behind get
+                # skipped, like they would by a `QTimer`.
+                wait = t_next - time.perf_counter()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                elif wait < -interval:
+                    t_next = time.perf_counter()
+                t_next += interval
+            else:
+                await asyncio.sleep(0)  # Let the other devices have a go
+
+            # Keep track of the obtained DAQ interval and DAQ rate
+            now = time.perf_counter()
+            self.update_counter_DAQ += 1
+            if t_prev is None:
+                t_rate = now
+            else:
+                self.obtained_DAQ_interval_ms = (now - t_prev) * 1e3
+                N_rate += 1
+                if now - t_rate >= 1:
+                    self.obtained_DAQ_rate_Hz = N_rate / (now - t_rate)
+                    t_rate = now
+                    N_rate = 0
+            t_prev = now
+
+            try:
+                success = await self.DAQ_function()
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:  # pylint: disable=broad-except
+                pft(err, 3)
+                dprint("@ AsyncDeviceIO %s\n" % self.dev.name)
+            else:
+                if success:
+                    self.not_alive_counter_DAQ = 0
+                else:
+                    self.not_alive_counter_DAQ += 1
+
+            if (
+                self.critical_not_alive_count > 0
+                and self.not_alive_counter_DAQ >= self.critical_not_alive_count
+            ):
+                dprint(
+                    "AsyncDeviceIO %s: Lost connection to device."
+                    % self.dev.name
+                )
+                self.dev.is_alive = False
+                self.signal_connection_lost.emit()
+                return
+
+            self.signal_DAQ_updated.emit()
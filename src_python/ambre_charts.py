@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Chart curves of the Ambre chamber that plot straight out of the shared
+``HistoryBuffer``, instead of each keeping their own copy of the data.
+
+Long histories get reduced by min/max decimation before being handed to
+pyqtgraph, such that the render cost is bounded by the width of the plot in
+pixels instead of by the length of the history.
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+
+from typing import Tuple
+
+import numpy as np
+from PyQt5 import QtCore
+import pyqtgraph as pg
+
+from dvg_pyqtgraph_threadsafe import ThreadSafeCurve
+
+from ambre_history import HistoryBuffer
+
+# Number of pixel columns to assume when the plot has not been laid out yet
+DEFAULT_PIXEL_WIDTH = 1000
+
+# Fraction by which the time span in view may exceed the span of a history
+# tier and still be plotted from it
+VIEW_SPAN_TOLERANCE = 0.05
+
+# ------------------------------------------------------------------------------
+#   MinMaxDecimator
+# ------------------------------------------------------------------------------
+
+
+class MinMaxDecimator(object):
+    """Reduces a growing and sliding series to the minimum and maximum of
+    consecutive buckets of samples, keeping both in chronological order. Peaks
+    survive the decimation, unlike with plain subsampling.
+
+    Buckets are aligned to the absolute sample index, i.e. the count of
+    samples ever appended to the history. Hence, a completed bucket never
+    changes and is computed only once: Each call to ``decimate()`` only has to
+    process the samples that arrived since the previous call, plus the two
+    partially filled buckets at either end of the series. The cache is rebuilt
+    when the bucket size changes, which happens in powers of two.
+    """
+
+    def __init__(self):
+        self.bucket_size = 0
+        self._k0 = 0  # Absolute number of the first cached bucket
+        self._x = np.empty((0, 2))  # Cached [bucket, min/max point] x-values
+        self._y = np.empty((0, 2))  # Cached [bucket, min/max point] y-values
+
+    def reset(self):
+        self.bucket_size = 0
+        self._x = np.empty((0, 2))
+        self._y = np.empty((0, 2))
+
+    @staticmethod
+    def _minmax(x, y, B):
+        """Min/max points of each bucket of ``B`` samples, ``len(x)`` being a
+        multiple of ``B``, returned as (x, y) arrays of shape (N_buckets, 2)."""
+        y = y.reshape(-1, B)
+        x = x.reshape(-1, B)
+        is_nan = np.isnan(y)
+        i_min = np.argmin(np.where(is_nan, np.inf, y), axis=1)
+        i_max = np.argmax(np.where(is_nan, -np.inf, y), axis=1)
+        idx = np.sort(np.stack((i_min, i_max), axis=1), axis=1)
+        rows = np.arange(len(y))[:, None]
+        return x[rows, idx], y[rows, idx]
+
+    def decimate(self, x, y, index_end, N_buckets_max):
+        """Decimate the series ``(x, y)``, of which the last sample has
+        absolute index ``index_end - 1``, to at most ``N_buckets_max`` buckets,
+        i.e. twice as many points.
+
+        Returns:
+            Tuple (x, y) of the decimated series. The last sample is always
+            included, as the chart aligns on it.
+        """
+        N = len(x)
+        if N <= 2 * N_buckets_max:
+            self.reset()
+            return x, y
+
+        # Smallest power of two bucket size giving no more than the maximum
+        # number of buckets
+        B = 1 << int(np.ceil(np.log2(N / N_buckets_max)))
+        if B != self.bucket_size:
+            self.reset()
+            self.bucket_size = B
+
+        index_start = index_end - N
+        k_first = -(-index_start // B)  # First complete bucket
+        k_end = index_end // B  # Past the last complete bucket
+
+        # Drop the cached buckets that slid out of the history, e.g. when the
+        # history got cleared, and append the newly completed ones
+        if len(self._x):
+            N_cached_end = self._k0 + len(self._x)
+            drop = min(max(k_first - self._k0, 0), len(self._x))
+            self._x = self._x[drop:]
+            self._y = self._y[drop:]
+            self._k0 += drop
+            if len(self._x) == 0 or N_cached_end > k_end:
+                self.reset()
+                self.bucket_size = B
+
+        k_new = self._k0 + len(self._x) if len(self._x) else k_first
+        if k_new < k_end:
+            i0 = k_new * B - index_start
+            i1 = k_end * B - index_start
+            x_new, y_new = self._minmax(x[i0:i1], y[i0:i1], B)
+            if len(self._x):
+                self._x = np.concatenate((self._x, x_new))
+                self._y = np.concatenate((self._y, y_new))
+            else:
+                self._k0 = k_new
+                self._x, self._y = x_new, y_new
+
+        # Partially filled buckets at either end
+        i_head = k_first * B - index_start
+        i_tail = k_end * B - index_start
+        if k_first >= k_end:
+            # No complete bucket at all
+            return x, y
+
+        x_head, y_head = x[:i_head], y[:i_head]
+        x_tail, y_tail = x[i_tail:], y[i_tail:]
+        if i_head > 0:
+            x_head, y_head = self._minmax(x_head, y_head, i_head)
+        if len(x_tail) > 0:
+            x_tail, y_tail = self._minmax(x_tail, y_tail, len(x_tail))
+
+        return (
+            np.concatenate(
+                (x_head.ravel(), self._x.ravel(), x_tail.ravel(), x[-1:])
+            ),
+            np.concatenate(
+                (y_head.ravel(), self._y.ravel(), y_tail.ravel(), y[-1:])
+            ),
+        )
+
+
+# ------------------------------------------------------------------------------
+#   HistoryBufferCurve
+# ------------------------------------------------------------------------------
+
+
+class HistoryBufferCurve(ThreadSafeCurve):
+    """History chart curve plotting a single field of a ``HistoryBuffer``
+    against its `time` field. Interchangeable with ``HistoryChartCurve`` for
+    ``LegendSelect`` and ``PlotManager``.
+
+    Data is not pushed into this curve. Instead, append to the linked history
+    and the curve will pick it up on the next ``update()``. The history holds
+    all fields of a sample at once, hence ``appendData()`` and
+    ``extendData()`` of a single field are not supported and raise a
+    ``TypeError``.
+
+    When the part of the history in view holds more samples than there are
+    pixel columns in the plot, the history gets min/max decimated to a bucket
+    per pixel column.
+
+    When the history is a ``TieredHistory`` and the time span in view reaches
+    further back than the raw samples, the min/max envelope of the first
+    aggregate tier retaining that time span gets plotted instead.
+
+    A refresh is skipped when the curve is hidden, or when neither the history
+    nor the view has changed since the curve was last drawn. The history's
+    ``N_written`` serves as generation counter.
+
+    Args:
+        history (HistoryBuffer):
+            Shared history to plot from.
+
+        field (str):
+            Name of the field in the history to plot as y-data.
+
+        linked_curve (pyqtgraph.PlotDataItem):
+            Curve to plot the data out into.
+
+        decimate (bool, optional):
+            Apply min/max decimation?
+
+    Attributes:
+        N_redraws (int):
+            Number of times the curve got redrawn.
+
+        N_skipped (int):
+            Number of refreshes skipped for having nothing new to draw.
+    """
+
+    def __init__(
+        self,
+        history: HistoryBuffer,
+        field: str,
+        linked_curve: pg.PlotDataItem,
+        decimate: bool = True,
+    ):
+        super().__init__(
+            capacity=None,
+            linked_curve=linked_curve,
+            shift_right_x_to_zero=True,
+        )
+        self.history = history
+        self.field = field
+        self.decimate = decimate
+        self._decimator = MinMaxDecimator()
+        self._tier_decimators = {}
+
+        self.N_redraws = 0
+        self.N_skipped = 0
+        self._drawn_key = None  # History generation and view last drawn
+
+        # Only draw the decimated points that are within view
+        linked_curve.setClipToView(True)
+
+    def appendData(self, x, y):
+        raise TypeError(
+            "`HistoryBufferCurve` plots from its history. Call `append()` of "
+            "the history instead."
+        )
+
+    def extendData(self, x_list, y_list):
+        raise TypeError(
+            "`HistoryBufferCurve` plots from its history. Call `extend()` of "
+            "the history instead."
+        )
+
+    def update(self, create_snapshot: bool = True):
+        """Copy the current contents of the history and redraw the curve, if
+        there is anything new to draw. The history is locked only for as long
+        as the copy takes."""
+        if create_snapshot:
+            if not self.curve.isVisible():
+                self.N_skipped += 1
+                return
+
+            x_range = self._view_x_range()
+            key = (self.history.N_written, self.x_axis_divisor, x_range)
+            if key == self._drawn_key:
+                self.N_skipped += 1
+                return
+            self._drawn_key = key
+
+            tier = self._select_tier(x_range)
+            if tier is None:
+                self._snapshot_x, self._snapshot_y = self._snapshot_raw(x_range)
+            else:
+                self._snapshot_x, self._snapshot_y = self._snapshot_tier(
+                    tier, x_range
+                )
+
+        self.N_redraws += 1
+        super().update(create_snapshot=False)
+
+    def _view_x_range(self):
+        """Time span in view [s], without the padding of the view range, and
+        the width of the plot [pixels]."""
+        vb = self.curve.getViewBox()
+        if vb is None:
+            return np.inf, DEFAULT_PIXEL_WIDTH
+
+        x_min, x_max = vb.viewRange()[0]
+        span = (x_max - x_min) / (1 + 2 * vb.suggestPadding(0))
+        width = int(vb.width()) if vb.width() >= 1 else DEFAULT_PIXEL_WIDTH
+        return span * self.x_axis_divisor, width
+
+    def _select_tier(self, x_range):
+        """Aggregate tier to plot from, or None for the raw samples. The raw
+        samples are used for as long as they cover the time span in view."""
+        tiers = getattr(self.history, "tiers", None)
+        if not tiers:
+            return None
+
+        span_in_view = x_range[0] / (1 + VIEW_SPAN_TOLERANCE)
+        locker = QtCore.QMutexLocker(self.history.mutex)
+        view = self.history.view()
+        is_full = len(view) == self.history.capacity
+        raw_span = view["time"][-1] - view["time"][0] if len(view) else 0
+        locker.unlock()
+
+        if not is_full or span_in_view <= raw_span:
+            return None
+
+        for tier in tiers:
+            if span_in_view <= tier.retention:
+                return tier
+        return tiers[-1]
+
+    def _max_buckets(self, span, x_range) -> int:
+        """Number of buckets of a history spanning ``span`` seconds needed for
+        a bucket per pixel column across the time span in view."""
+        span_in_view, width = x_range
+        if span <= 0 or span_in_view <= 0:
+            return width
+        return max(int(width * span / span_in_view), width)
+
+    def _snapshot_raw(self, x_range):
+        locker = QtCore.QMutexLocker(self.history.mutex)
+        view = self.history.view()
+        if not self.decimate or len(view) < 2:
+            x = np.array(view["time"])
+            y = np.array(view[self.field], dtype=np.float64)
+        else:
+            x, y = self._decimator.decimate(
+                view["time"],
+                view[self.field],
+                self.history.N_written,
+                self._max_buckets(view["time"][-1] - view["time"][0], x_range),
+            )
+            x = np.array(x)
+            y = np.array(y, dtype=np.float64)
+        locker.unlock()
+
+        return x, y
+
+    def _snapshot_tier(self, tier, x_range):
+        """Plot the min and max of each bucket of the tier, followed by the most
+        recent raw sample to stay aligned with the raw charts."""
+        decimator = self._tier_decimators.setdefault(
+            id(tier), MinMaxDecimator()
+        )
+
+        locker = QtCore.QMutexLocker(tier.buffer.mutex)
+        view = tier.buffer.view()
+        x = np.repeat(view["time"], 2)
+        y = np.column_stack(
+            (view[self.field + "_min"], view[self.field + "_max"])
+        ).ravel()
+        index_end = 2 * tier.buffer.N_written
+        locker.unlock()
+
+        if self.decimate and len(x) >= 2:
+            x, y = decimator.decimate(
+                x, y, index_end, self._max_buckets(x[-1] - x[0], x_range)
+            )
+
+        locker = QtCore.QMutexLocker(self.history.mutex)
+        view = self.history.view()
+        x = np.concatenate((x, view["time"][-1:]))
+        y = np.concatenate((y, view[self.field][-1:])).astype(np.float64)
+        locker.unlock()
+
+        return x, y
+
+    @QtCore.pyqtSlot()
+    def clear(self):
+        """Clear the linked history, hence all curves plotting from it."""
+        self.history.clear()
+        self.update()
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        N = len(self.history)
+        return (N, N)
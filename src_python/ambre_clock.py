@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Clock service of the Ambre chamber.
+
+The hot paths, like the DAQ functions, only take numeric timestamps from the
+clock. Formatting a timestamp into a date or time string is deferred to where
+it gets displayed or written, and is cached per second, since the strings only
+change once per second anyhow.
+
+A ``VirtualClock`` can take the place of the ``Clock`` to run time at a
+different pace, e.g. during an accelerated replay, or to step it by hand.
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+
+import math
+import time
+
+# Formats as used throughout the GUI and the log file names
+FMT_DATE = "%d-%m-%Y"  # E.g. 15-10-2026
+FMT_TIME = "%H:%M:%S"  # E.g. 08:06:14
+FMT_DATETIME = "%y%m%d_%H%M%S"  # E.g. 261015_080614, reverse notation
+
+
+class Clock(object):
+    """Hands out wall-clock and monotonic timestamps, and formats wall-clock
+    timestamps lazily with a per-second cache. Safe to use from multiple
+    threads."""
+
+    def __init__(self):
+        # Tuple (second, struct_time, dict of format -> string). Gets replaced
+        # as a whole, so that concurrent readers never see a mixed state.
+        self._cache = (None, None, {})
+
+    def now(self) -> float:
+        """Wall-clock time [s since the epoch]."""
+        return time.time()
+
+    def monotonic(self) -> float:
+        """Monotonic time [s], for measuring intervals."""
+        return time.perf_counter()
+
+    def format(self, fmt: str, t: float = None) -> str:
+        """Format wall-clock time ``t``, or the current time when None, with
+        ``time.strftime()`` format ``fmt``."""
+        sec = math.floor(self.now() if t is None else t)
+
+        cache = self._cache
+        if cache[0] != sec:
+            cache = (sec, time.localtime(sec), {})
+            self._cache = cache
+
+        s = cache[2].get(fmt)
+        if s is None:
+            s = time.strftime(fmt, cache[1])
+            cache[2][fmt] = s
+        return s
+
+    def date_str(self, t: float = None) -> str:
+        return self.format(FMT_DATE, t)
+
+    def time_str(self, t: float = None) -> str:
+        return self.format(FMT_TIME, t)
+
+    def datetime_str(self, t: float = None) -> str:
+        return self.format(FMT_DATETIME, t)
+
+
+class VirtualClock(Clock):
+    """Clock running at ``speed`` times real time, starting at wall-clock time
+    ``start``. Can additionally be stepped by hand with ``advance()`` and
+    ``set_time()``. A ``speed`` of 0 only moves when stepped.
+
+    Args:
+        start (float, optional):
+            Wall-clock time to start at [s since the epoch]. Defaults to now.
+
+        speed (float, optional):
+            Pace of the clock as a multiple of real time.
+    """
+
+    def __init__(self, start: float = None, speed: float = 1.0):
+        super().__init__()
+        self.speed = speed
+        self._start = time.time() if start is None else start
+        self._t0 = time.perf_counter()
+        self._offset = 0.0  # Time stepped by hand [s]
+
+    def _elapsed(self) -> float:
+        return (time.perf_counter() - self._t0) * self.speed + self._offset
+
+    def now(self) -> float:
+        return self._start + self._elapsed()
+
+    def monotonic(self) -> float:
+        return self._elapsed()
+
+    def advance(self, dt: float):
+        """Step the clock forward by ``dt`` seconds."""
+        self._offset += dt
+
+    def set_time(self, t: float):
+        """Set the wall-clock time to ``t`` [s since the epoch]. Does not
+        affect ``monotonic()``."""
+        self._start += t - self.now()
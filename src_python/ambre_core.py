@@ -0,0 +1,1182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Acquisition and logging core of the Ambre chamber, free of any GUI.
+
+``AmbreCore`` connects to the Arduino, or to a simulated or replayed one, runs
+the DAQ in its own thread and records the readings to file. It only depends on
+``QtCore``, so it can run inside a bare ``QCoreApplication`` on a server
+without a display, as well as underneath the main window.
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+# pylint: disable=bare-except
+
+import os
+import re
+import time
+import asyncio
+import argparse
+import threading
+from collections import deque
+
+import numpy as np
+import psutil
+from PyQt5 import QtCore
+
+from dvg_debug_functions import dprint, print_fancy_traceback as pft
+from dvg_devices.Arduino_protocol_serial import Arduino
+from dvg_qdeviceio import QDeviceIO, DAQ_TRIGGER
+
+from ambre_async import (
+    AsyncEngine,
+    AsyncDeviceIO,
+    query_ascii_values as query_ascii_values_async,
+    query_binary_state as query_binary_state_async,
+)
+from ambre_clock import Clock, VirtualClock
+from ambre_discovery import PortFinder
+from ambre_reconnect import Reconnector, BACKOFF_MAX
+from ambre_simulator import SimulatedArduino
+from ambre_replay import ReplayFirmwareModel, load_replay
+from ambre_history import TieredHistory
+from ambre_recording import BinaryRecorder, FILE_SUFFIX
+from ambre_filelogger import ThreadedFileLogger
+from ambre_timing import DAQTiming, TIMING_DTYPE, TIMING_FIELDS, TIMING_SUFFIX
+from ambre_profiler import StageProfiler, PROFILE_FILE
+from ambre_metrics import METRICS_HOST
+from ambre_telemetry import (
+    supports_binary_telemetry,
+    query_binary_state,
+    TelemetryStreamReader,
+)
+
+# Constants
+# fmt: off
+DAQ_INTERVAL_MS    = 1000  # [ms]
+LOG_FLUSH_INTERVAL = 1     # [s]
+REPLAY_TICK_MS     = 50    # [ms]
+# fmt: on
+
+# `connect_to_specific_ID` of the Arduino, unless given on the command line
+DEVICE_ID = "Ambre chamber"
+
+# Capacity of the history kept only to feed the log, when no longer one got set
+# up for the charts. Covers any backlog of streamed frames in between two writes
+# to the log.
+LOG_HISTORY_CAPACITY = 10000
+
+# Maximum number of raw samples in the history, i.e. an hour at 10 ms per
+# sample, taking about 15 MB. The tiers of aggregates reach further back.
+MAX_HISTORY_CAPACITY = 360000
+
+# Number of DAQ intervals to evaluate the jitter over
+N_JITTER_INTERVALS = 100
+
+# Maximum time the DAQ thread sleeps at once while waiting to reconnect
+RECONNECT_POLL_INTERVAL = 0.1  # [s]
+
+# ------------------------------------------------------------------------------
+#   Arduino state
+# ------------------------------------------------------------------------------
+
+
+class State(object):
+    """Reflects the actual readings, parsed into separate variables, of the
+    Arduino. There should only be one instance of the State class per Arduino.
+    """
+
+    def __init__(self):
+        self.time = np.nan  # [s]
+        self.ds18b20_temp = np.nan  # ['C]
+        self.dht22_temp = np.nan  # ['C]
+        self.dht22_humi = np.nan  # [%]
+        self.is_valve_open = False
+
+        # Automatic valve control
+        self.humi_threshold = np.nan  # [%]
+        self.open_valve_when_super_humi = np.nan
+
+
+# ------------------------------------------------------------------------------
+#   Command line
+# ------------------------------------------------------------------------------
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Ambre chamber")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help=(
+            "acquire and record without a GUI, reporting the status to the "
+            "console instead"
+        ),
+    )
+    parser.add_argument(
+        "--devices",
+        nargs="+",
+        default=[DEVICE_ID],
+        metavar="ID",
+        help=(
+            "acquire from all Arduinos with these IDs at once, each with its "
+            "own charts and log file (default: `%s`)" % DEVICE_ID
+        ),
+    )
+    parser.add_argument(
+        "--engine",
+        choices=("qdeviceio", "asyncio"),
+        default="qdeviceio",
+        help=(
+            "run the DAQ of each Arduino on two threads of its own "
+            "(qdeviceio), or that of all Arduinos on a single asyncio event "
+            "loop (asyncio) (default: qdeviceio)"
+        ),
+    )
+    parser.add_argument(
+        "--sim",
+        action="store_true",
+        help="connect to a simulated Arduino instead of the real device",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0,
+        metavar="MS",
+        help="reply latency of the simulated Arduino [ms] (default: 0)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=DAQ_INTERVAL_MS,
+        metavar="MS",
+        help=(
+            "DAQ interval [ms], 0 acquires as fast as possible "
+            "(default: %d)" % DAQ_INTERVAL_MS
+        ),
+    )
+    parser.add_argument(
+        "--ascii",
+        action="store_true",
+        help="query the readings as ASCII instead of as binary frames",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "let the Arduino push out the readings every interval, instead of "
+            "polling"
+        ),
+    )
+    parser.add_argument(
+        "--no-reconnect",
+        action="store_true",
+        help=(
+            "stop acquiring upon the first missed reply, instead of trying to "
+            "reconnect"
+        ),
+    )
+    parser.add_argument(
+        "--reconnect-max",
+        type=float,
+        default=BACKOFF_MAX,
+        metavar="S",
+        help=(
+            "maximum pause in between the attempts to reconnect, doubling "
+            "from 1 s onwards (default: %g)" % BACKOFF_MAX
+        ),
+    )
+    parser.add_argument(
+        "--binary-log",
+        action="store_true",
+        help=(
+            "record to a binary `%s` file as well, next to the text log"
+            % FILE_SUFFIX
+        ),
+    )
+    parser.add_argument(
+        "--timing-log",
+        action="store_true",
+        help=(
+            "record the timing of every DAQ tick to a binary `%s%s` file as "
+            "well, next to the text log" % (TIMING_SUFFIX, FILE_SUFFIX)
+        ),
+    )
+    parser.add_argument(
+        "--rotate-size",
+        type=float,
+        default=None,
+        metavar="MB",
+        help="start a new log segment every MB megabytes",
+    )
+    parser.add_argument(
+        "--rotate-every",
+        type=float,
+        default=None,
+        metavar="HOURS",
+        help="start a new log segment every HOURS hours",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=["gzip", "xz", "zstd", "none"],
+        default="gzip",
+        help="compression of rotated-out log segments (default: gzip)",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="FILE",
+        help=(
+            "play back a recorded text log or `%s` file instead of "
+            "connecting to the Arduino" % FILE_SUFFIX
+        ),
+    )
+    parser.add_argument(
+        "--speed",
+        default="1",
+        metavar="X",
+        help=(
+            "replay speed as a multiple of real time, e.g. 1, 10 or 100, or "
+            "`max` for as fast as possible (default: 1)"
+        ),
+    )
+    parser.add_argument(
+        "--startup-log",
+        metavar="FILE",
+        help=(
+            "append the startup timing, including the time to the first "
+            "sample, as a JSON line to FILE"
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=PROFILE_FILE,
+        default=None,
+        metavar="FILE",
+        help=(
+            "profile the stages of the DAQ from the start and dump the "
+            "profile at exit, as a table and as JSON to FILE (default: %s). "
+            "Send SIGUSR1, or press Ctrl+P in the GUI, to enable or dump it "
+            "while running." % PROFILE_FILE
+        ),
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        metavar="PORT",
+        help=(
+            "serve the readings and the DAQ health in the Prometheus text "
+            "format at http://HOST:PORT/metrics"
+        ),
+    )
+    parser.add_argument(
+        "--metrics-host",
+        default=METRICS_HOST,
+        metavar="HOST",
+        help="address to serve the metrics at (default: %s)" % METRICS_HOST,
+    )
+    parser.add_argument(
+        "--comments",
+        default="",
+        metavar="TEXT",
+        help="headless only: comments to write into the log header",
+    )
+    parser.add_argument(
+        "--status-every",
+        type=float,
+        default=10,
+        metavar="S",
+        help="headless only: report the status every S seconds (default: 10)",
+    )
+    return parser
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.replay is not None and len(args.devices) > 1:
+        parser.error("argument --replay: plays back a single device only")
+    return args
+
+
+def create_cores(args, **kwargs) -> list:
+    """Create an ``AmbreCore`` for each of the device IDs on the command line.
+    With several devices, the log files get the device ID appended to their
+    name. With ``--engine asyncio``, all cores share a single ``AsyncEngine``.
+    All cores share a single ``PortFinder``, scanning the serial ports once for
+    all of the devices. Keyword arguments are passed onto ``AmbreCore``."""
+    if args.engine == "asyncio":
+        kwargs.setdefault("engine", AsyncEngine())
+    if not args.sim and args.replay is None:
+        kwargs.setdefault("port_finder", PortFinder(args.devices))
+
+    if len(args.devices) == 1:
+        return [AmbreCore(args, device_id=args.devices[0], **kwargs)]
+
+    return [
+        AmbreCore(
+            args,
+            device_id=device_id,
+            name="Ard%i" % (idx + 1),
+            file_tag="_" + re.sub(r"\W+", "_", device_id).strip("_"),
+            **kwargs,
+        )
+        for idx, device_id in enumerate(args.devices)
+    ]
+
+
+def raise_process_priority():
+    """Set the priority of this process to maximum in the operating system."""
+    try:
+        proc = psutil.Process(os.getpid())
+        if os.name == "nt":
+            proc.nice(psutil.REALTIME_PRIORITY_CLASS)  # Windows
+        else:
+            proc.nice(-20)  # Other
+    except:
+        print("Warning: Could not set process to maximum priority.\n")
+
+
+# ------------------------------------------------------------------------------
+#   AmbreCore
+# ------------------------------------------------------------------------------
+
+
+class AmbreCore(object):
+    """Arduino connection, DAQ and recording of the Ambre chamber.
+
+    Usage: ``connect()`` to the Arduino, create the Qt application, optionally
+    ``setup_history()``, ``setup()`` the loggers and DAQ worker, then
+    ``start()`` acquiring. Call ``stop()`` and finally ``quit()`` when done.
+    To connect while doing other work, call ``prepare()`` and
+    ``start_connecting()`` instead of ``connect()``, and later
+    ``finish_connecting()``.
+
+    Args:
+        args (argparse.Namespace):
+            Parsed command line, see ``build_arg_parser()``.
+
+        device_id (str, optional):
+            ``connect_to_specific_ID`` of the Arduino.
+
+        name (str, optional):
+            Short name of the Arduino, also naming the DAQ threads.
+
+        file_tag (str, optional):
+            Appended to the name of the log files, to tell apart the logs of
+            several devices recording at once.
+
+        get_comments (Callable, optional):
+            Returns the comments to write into the header of a new log. When
+            None, the comments of the command line are used, or else those of
+            the recording being replayed.
+
+        engine (AsyncEngine, optional):
+            Run the DAQ on this asyncio engine instead of on a ``QDeviceIO``.
+
+        port_finder (PortFinder, optional):
+            Discovers the serial port of the Arduino. Defaults to a new
+            ``PortFinder`` for this Arduino only.
+
+        debug (bool, optional):
+            Show debug info of the DAQ worker in the terminal.
+
+    Attributes:
+        clock (Clock):
+            Source of all timestamps. Gets replaced by a ``VirtualClock``
+            during an accelerated replay.
+
+        state (State):
+            Most recent readings.
+
+        ard (Arduino | SimulatedArduino):
+            The (simulated) Arduino.
+
+        history (TieredHistory | None):
+            History of the readings, see ``setup_history()``. The log gets
+            written from it.
+
+        log (ThreadedFileLogger):
+            Text file logger.
+
+        recorder (BinaryRecorder | None):
+            Optional binary recorder alongside the text log.
+
+        timing (DAQTiming):
+            Timing of the most recent DAQ ticks.
+
+        timing_recorder (BinaryRecorder | None):
+            Optional recorder of the timing of every DAQ tick alongside the
+            text log.
+
+        profiler (StageProfiler):
+            Durations of the stages of the DAQ function.
+
+        qdev (QDeviceIO | AsyncDeviceIO):
+            Multithreaded, or asynchronous, communication with the Arduino.
+
+        reconnector (Reconnector | None):
+            Recovers a lost connection and measures the outages. None when
+            replaying or with ``--no-reconnect``, upon which a lost connection
+            makes ``qdev`` emit ``signal_connection_lost``.
+
+        replay_comments (str):
+            Header comments of the recording being replayed.
+    """
+
+    def __init__(
+        self,
+        args,
+        device_id=DEVICE_ID,
+        name="Ard",
+        file_tag="",
+        get_comments=None,
+        engine=None,
+        port_finder=None,
+        debug=False,
+    ):
+        self.args = args
+        self.device_id = device_id
+        self.name = name
+        self.file_tag = file_tag
+        self.engine = engine
+        self.port_finder = port_finder
+        self.debug = debug
+        self.get_comments = (
+            get_comments
+            if get_comments is not None
+            else lambda: args.comments or self.replay_comments
+        )
+
+        self.clock = Clock()
+        self.state = State()
+        self.ard = None
+        self.history = None
+        self.log = None
+        self.recorder = None
+        self.timing = None
+        self.timing_recorder = None
+        self.profiler = StageProfiler(enabled=args.profile is not None)
+        self.qdev = None
+        self.reconnector = (
+            None
+            if args.replay is not None or args.no_reconnect
+            else Reconnector(
+                device_id, self.reconnect, backoff_max=args.reconnect_max
+            )
+        )
+
+        self.DAQ_interval_ms = max(args.interval, 0)
+        self.replay_file = args.replay
+        self.replay_comments = ""
+        self.use_binary_telemetry = True
+        self.use_streaming = False
+
+        self._stream_reader = None
+        self._stream_time_offset = np.nan
+
+        # `time` of the first reading of the recording [s]
+        self._t_log_start = np.nan
+
+        # `history.N_written` up to which the readings have been logged, or
+        # passed over when not recording
+        self._N_logged = 0
+
+        # Intervals in between the most recent DAQ updates [s]
+        self._DAQ_intervals = deque(maxlen=N_JITTER_INTERVALS)
+        self._t_prev_DAQ = None
+        self._is_running = False
+
+        # Connecting in the background
+        self._connector = None
+        self._is_connected = False
+        self.connect_span = None  # (start, stop) of `time.perf_counter()`
+
+    # --------------------------------------------------------------------------
+    #   Connect to Arduino
+    # --------------------------------------------------------------------------
+
+    def prepare(self):
+        """Load the recording to replay, if any, and create the (simulated)
+        Arduino without connecting to it yet. Settles the DAQ interval and the
+        clock."""
+        args = self.args
+
+        if self.replay_file is not None:
+            self.replay_comments, replay_data = load_replay(self.replay_file)
+            replay_speed = np.inf if args.speed == "max" else float(args.speed)
+            print(
+                "Replaying %i readings of `%s` at %s speed\n"
+                % (len(replay_data), self.replay_file, args.speed)
+            )
+
+            # Size the history to the interval of the recording
+            if len(replay_data) > 1:
+                self.DAQ_interval_ms = round(
+                    np.median(np.diff(replay_data["time"])) * 1e3
+                )
+
+            # Every reading gets streamed in, regardless of the replay speed
+            args.stream = True
+            if np.isfinite(replay_speed):
+                self.clock = VirtualClock(speed=replay_speed)
+            self.ard = SimulatedArduino(
+                name=self.name,
+                long_name="Replay",
+                connect_to_specific_ID=self.device_id,
+                firmware=ReplayFirmwareModel(
+                    replay_data, speed=replay_speed, ID=self.device_id
+                ),
+            )
+        elif args.sim:
+            self.ard = SimulatedArduino(
+                name=self.name,
+                connect_to_specific_ID=self.device_id,
+                reply_latency=args.latency / 1e3,
+            )
+        else:
+            self.ard = Arduino(
+                name=self.name, connect_to_specific_ID=self.device_id
+            )
+            if self.port_finder is None:
+                self.port_finder = PortFinder([self.device_id])
+        self.ard.serial_settings["baudrate"] = 115200
+
+    def connect(self) -> bool:
+        """Connect to the Arduino, negotiate the telemetry format and read the
+        initial state of the valve control. Returns True when alive."""
+        if self.ard is None:
+            self.prepare()
+
+        args = self.args
+        ard = self.ard
+        if isinstance(ard, SimulatedArduino):
+            ard.auto_connect()
+        else:
+            port = self.port_finder.find(self.device_id)
+            if port is not None:
+                ard.connect_at_port(port)
+
+        if not (ard.is_alive):
+            return False
+
+        # Negotiate the telemetry format
+        self.use_binary_telemetry = (
+            not args.ascii and supports_binary_telemetry(ard)
+        )
+        print(
+            "Telemetry: %s\n"
+            % ("Binary" if self.use_binary_telemetry else "ASCII")
+        )
+        if args.stream and not self.use_binary_telemetry:
+            print(
+                "Warning: Streaming requires binary telemetry. "
+                "Polling instead.\n"
+            )
+        self.use_streaming = args.stream and self.use_binary_telemetry
+
+        # Get the initial state of the valve control
+        success, reply = ard.query("th?")
+        if success:
+            self.state.humi_threshold = float(reply)
+
+        success, reply = ard.query("open when super humi?")
+        if success:
+            self.state.open_valve_when_super_humi = bool(int(reply))
+
+        return True
+
+    def reconnect(self) -> bool:
+        """Reconnect to the Arduino after an outage. Discovers its port anew,
+        as it may have come back at another port, and restores the streaming
+        and the valve control settings, as it may have been reset. Returns
+        True when alive."""
+        ard = self.ard
+        state = self.state
+        ard.close(ignore_exceptions=True)
+        if isinstance(ard, SimulatedArduino):
+            ard.connect_at_port(verbose=False)
+        else:
+            port = self.port_finder.rediscover(self.device_id)
+            if port is not None:
+                ard.connect_at_port(port, verbose=False)
+
+        if not (ard.is_alive):
+            return False
+
+        if not np.isnan(state.humi_threshold):
+            ard.write("th%.0f" % state.humi_threshold)
+        if isinstance(state.open_valve_when_super_humi, bool):
+            ard.write(
+                "open when super humi"
+                if state.open_valve_when_super_humi
+                else "open when sub humi"
+            )
+
+        if self.use_streaming:
+            self._start_streaming()
+        return True
+
+    def start_connecting(self):
+        """Call ``connect()`` in a separate thread, e.g. while the GUI is
+        being built. Collect the result with ``finish_connecting()``."""
+        if self.ard is None:
+            self.prepare()
+
+        self._connector = threading.Thread(
+            target=self._connect_in_background,
+            name="connect_%s" % self.name,
+            daemon=True,
+        )
+        self._connector.start()
+
+    def finish_connecting(self) -> bool:
+        """Wait for ``start_connecting()`` to finish. Returns True when
+        alive."""
+        self._connector.join()
+        return self._is_connected
+
+    def _connect_in_background(self):
+        t_start = time.perf_counter()
+        try:
+            self._is_connected = self.connect()
+        except Exception as err:  # pylint: disable=broad-except
+            pft(err, 3)
+            self._is_connected = False
+        self.connect_span = (t_start, time.perf_counter())
+
+    def is_replay_finished(self) -> bool:
+        """Have all recorded readings been played back and received?"""
+        return (
+            self.replay_file is not None
+            and self.ard.firmware.is_finished
+            and self.ard.ser.in_waiting == 0
+            and (self.engine is None or self.qdev.link.in_waiting == 0)
+        )
+
+    # --------------------------------------------------------------------------
+    #   Set up
+    # --------------------------------------------------------------------------
+
+    def setup_history(self, history_time, history_tiers=()):
+        """Keep a history of the readings. Without, ``setup()`` keeps a short
+        history only to feed the log.
+
+        Args:
+            history_time (float):
+                Time span of the raw history [s]. At short DAQ intervals the
+                raw history spans less, as it holds no more than
+                ``MAX_HISTORY_CAPACITY`` samples.
+
+            history_tiers (list of tuple, optional):
+                Tiers (period [s], retention [s]) of aggregates beyond the raw
+                history.
+        """
+        capacity = round(history_time * 1e3 / max(self.DAQ_interval_ms, 1))
+        self.history = TieredHistory(
+            capacity=min(capacity, MAX_HISTORY_CAPACITY),
+            tiers=history_tiers,
+        )
+        self._N_logged = 0
+
+    def setup(self):
+        """Create the file loggers and the DAQ worker. Requires a connected
+        Arduino and a running Qt application."""
+        args = self.args
+
+        if self.history is None:
+            self.history = TieredHistory(capacity=LOG_HISTORY_CAPACITY)
+            self._N_logged = 0
+
+        self.log = ThreadedFileLogger(
+            write_header_function=self.write_header_to_log,
+            write_data_function=self.write_data_to_log,
+            flush_interval=LOG_FLUSH_INTERVAL,
+            rotate_size=(
+                None
+                if args.rotate_size is None
+                else int(args.rotate_size * 1e6)
+            ),
+            rotate_interval=(
+                None if args.rotate_every is None else args.rotate_every * 3600
+            ),
+            compression=None if args.compress == "none" else args.compress,
+        )
+
+        # Optional binary recording alongside the text log
+        if args.binary_log:
+            self.recorder = BinaryRecorder(flush_interval=LOG_FLUSH_INTERVAL)
+            self.log.signal_recording_stopped.connect(self.recorder.close)
+
+        # Streaming ticks have no intended start
+        self.timing = DAQTiming(
+            0 if self.use_streaming else self.DAQ_interval_ms
+        )
+        if args.timing_log:
+            self.timing_recorder = BinaryRecorder(
+                dtype=TIMING_DTYPE, flush_interval=LOG_FLUSH_INTERVAL
+            )
+            self.log.signal_recording_stopped.connect(
+                self.timing_recorder.close
+            )
+
+        if self.engine is not None:
+            self.qdev = AsyncDeviceIO(
+                self.engine,
+                self.ard,
+                DAQ_function=(
+                    self.DAQ_function_stream_async
+                    if self.use_streaming
+                    else self.DAQ_function_async
+                ),
+                DAQ_interval_ms=(
+                    0 if self.use_streaming else self.DAQ_interval_ms
+                ),
+                critical_not_alive_count=1 if self.reconnector is None else 0,
+            )
+            return
+
+        # Create QDeviceIO
+        self.qdev = QDeviceIO(self.ard)
+
+        # Create workers
+        # fmt: off
+        self.qdev.create_worker_DAQ(
+            DAQ_trigger              = (
+                DAQ_TRIGGER.INTERNAL_TIMER
+                if self.DAQ_interval_ms > 0 and not self.use_streaming
+                else DAQ_TRIGGER.CONTINUOUS
+            ),
+            DAQ_function             = (
+                self.DAQ_function_stream
+                if self.use_streaming
+                else self.DAQ_function
+            ),
+            DAQ_interval_ms          = self.DAQ_interval_ms,
+            critical_not_alive_count = 1 if self.reconnector is None else 0,
+            debug                    = self.debug,
+        )
+        # fmt: on
+        self.qdev.create_worker_jobs()
+
+    def start(self):
+        """Start streaming, when applicable, and start the workers."""
+        if self.use_streaming:
+            self._start_streaming()
+
+        self.qdev.start(DAQ_priority=QtCore.QThread.TimeCriticalPriority)
+        if self.DAQ_interval_ms == 0 or self.use_streaming:
+            self.qdev.unpause_DAQ()  # CONTINUOUS starts out paused
+        self._is_running = True
+
+    def _start_streaming(self):
+        stream_period_ms = (
+            REPLAY_TICK_MS
+            if self.replay_file is not None
+            else max(round(self.DAQ_interval_ms), 1)
+        )
+        self._stream_time_offset = np.nan
+        self._stream_reader = TelemetryStreamReader(
+            self.ard.ser if self.engine is None else self.qdev.link
+        )
+
+        # A read should not time out in between two regular frames
+        ard = self.ard
+        ard.ser.timeout = max(ard.ser.timeout, 2 * stream_period_ms / 1e3)
+        ard.write("stream period %d" % stream_period_ms)
+        ard.write("stream on")
+
+    def is_running(self) -> bool:
+        return self._is_running
+
+    def stop(self):
+        """Stop the workers and close the log files."""
+        if not self._is_running:
+            return
+
+        self._is_running = False
+        self.qdev.quit()
+        self.log.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.timing_recorder is not None:
+            self.timing_recorder.close()
+
+        if self.use_streaming and self.ard.is_alive:
+            self.ard.write("stream off")
+
+    def quit(self):
+        """Disconnect from the Arduino and flush the log files to disk."""
+        self.ard.close()
+
+        print("Flushing log to disk........... ", end="")
+        self.log.quit()
+        if self.recorder is not None:
+            self.recorder.quit()
+        if self.timing_recorder is not None:
+            self.timing_recorder.quit()
+        print("done.")
+
+    # --------------------------------------------------------------------------
+    #   Arduino update functions
+    # --------------------------------------------------------------------------
+
+    def DAQ_function(self):
+        t_start = time.perf_counter()
+        if self._needs_reconnect():
+            return self._try_reconnect()
+
+        # Date-time keeping. Gets formatted only when needed.
+        self.profiler.start()
+        t_wall = self.clock.now()
+
+        # Query the Arduino for its state
+        if self.use_binary_telemetry:
+            success_, tmp_state = query_binary_state(self.ard)
+        else:
+            success_, tmp_state = self.ard.query_ascii_values(
+                "?", delimiter="\t"
+            )
+        rtt = time.perf_counter() - t_start
+        self.profiler.lap("query")
+
+        success = self.process_reading(t_wall, success_, tmp_state)
+        self._record_timing(t_start, rtt)
+        self.profiler.lap("bookkeeping")
+        return success
+
+    async def DAQ_function_async(self):
+        """Counterpart of `DAQ_function()` on the asyncio engine."""
+        t_start = time.perf_counter()
+        if self._needs_reconnect():
+            return await self._try_reconnect_async()
+
+        self.profiler.start()
+        t_wall = self.clock.now()
+
+        if self.use_binary_telemetry:
+            success_, tmp_state = await query_binary_state_async(
+                self.ard, self.qdev.link
+            )
+        else:
+            success_, tmp_state = await query_ascii_values_async(
+                self.ard, self.qdev.link, "?", delimiter="\t"
+            )
+        rtt = time.perf_counter() - t_start
+        self.profiler.lap("query")
+
+        success = self.process_reading(t_wall, success_, tmp_state)
+        self._record_timing(t_start, rtt)
+        self.profiler.lap("bookkeeping")
+        return success
+
+    def process_reading(self, t_wall, success_, tmp_state):
+        """Parse the reply to a query of the state of the Arduino, queried at
+        wall-clock time `t_wall`, and add it to the history and the log."""
+        clock = self.clock
+        state = self.state
+        ard = self.ard
+
+        if not (success_):
+            dprint(
+                "'%s' reports IOError @ %s %s"
+                % (ard.name, clock.date_str(t_wall), clock.time_str(t_wall))
+            )
+            self._notify_failure()
+            return False
+
+        # Parse readings into separate state variables
+        try:
+            (
+                state.time,
+                state.ds18b20_temp,
+                state.dht22_temp,
+                state.dht22_humi,
+                state.is_valve_open,
+            ) = tmp_state
+            state.time /= 1000  # Arduino time, [msec] to [s]
+            state.is_valve_open = bool(state.is_valve_open)
+        except Exception as err:  # pylint: disable=broad-except
+            pft(err, 3)
+            dprint(
+                "'%s' reports IOError @ %s %s"
+                % (ard.name, clock.date_str(t_wall), clock.time_str(t_wall))
+            )
+            self._notify_failure()
+            return False
+
+        # We will use PC time instead
+        state.time = clock.monotonic()
+        self.profiler.lap("parse")
+
+        # Add readings to the history and log them to file. The history stays
+        # locked in between, so that clearing the charts can't drop readings
+        # from the log.
+        locker = QtCore.QMutexLocker(self.history.mutex)
+        self.history.append(
+            state.time,
+            state.ds18b20_temp,
+            state.dht22_temp,
+            state.dht22_humi,
+            state.is_valve_open,
+        )
+        self.profiler.lap("history")
+
+        self._update_log(clock.datetime_str(t_wall) + self.file_tag + ".txt")
+        locker.unlock()
+        self.profiler.lap("log")
+
+        # Return success
+        self._notify_success()
+        return True
+
+    def DAQ_function_stream(self):
+        """Counterpart of `DAQ_function()` when the Arduino is streaming. Gets
+        called continuously and processes all the frames that have arrived
+        since the previous call in one batch. Its timed duration starts once
+        the frames have arrived.
+        """
+        if self._needs_reconnect():
+            return self._try_reconnect()
+
+        clock = self.clock
+        state = self.state
+
+        # Block until at least one frame has been received
+        frames = self._stream_reader.read()
+        if (
+            self.replay_file is not None
+            and frames is not None
+            and len(frames) == 0
+        ):
+            return True  # No recorded readings due yet, or the replay has ended
+        if frames is None or len(frames) == 0:
+            dprint(
+                "'%s' reports IOError @ %s %s"
+                % (self.ard.name, clock.date_str(), clock.time_str())
+            )
+            self._notify_failure()
+            return False
+
+        # Date-time keeping
+        t_start = time.perf_counter()
+        self.profiler.start()
+        str_cur_datetime = clock.datetime_str()
+
+        # Map Arduino time onto PC time, fixed at the first received frame,
+        # such that frames arriving in a backlog keep their true spacing
+        if np.isnan(self._stream_time_offset):
+            self._stream_time_offset = (
+                clock.monotonic() - frames["millis"][-1] / 1e3
+            )
+        t = frames["millis"] / 1e3 + self._stream_time_offset
+
+        # The state holds the most recent frame
+        state.time = float(t[-1])
+        state.ds18b20_temp = float(frames["ds18b20_temp"][-1])
+        state.dht22_temp = float(frames["dht22_temp"][-1])
+        state.dht22_humi = float(frames["dht22_humi"][-1])
+        state.is_valve_open = bool(frames["is_valve_open"][-1])
+
+        # Add all frames to the history and log them to file in one go, see
+        # `process_reading()`
+        locker = QtCore.QMutexLocker(self.history.mutex)
+        self.history.extend(
+            time=t,
+            ds18b20_temp=frames["ds18b20_temp"],
+            dht22_temp=frames["dht22_temp"],
+            dht22_humi=frames["dht22_humi"],
+            is_valve_open=frames["is_valve_open"],
+        )
+        self.profiler.lap("history")
+
+        self._update_log(str_cur_datetime + self.file_tag + ".txt")
+        locker.unlock()
+        self.profiler.lap("log")
+
+        # Return success
+        self._notify_success()
+        self._record_timing(t_start, np.nan)
+        self.profiler.lap("bookkeeping")
+        return True
+
+    async def DAQ_function_stream_async(self):
+        """Counterpart of `DAQ_function_stream()` on the asyncio engine."""
+        if self._needs_reconnect():
+            return await self._try_reconnect_async()
+
+        await self.qdev.link.wait_for_data(self._stream_reader.bytes_needed())
+        return self.DAQ_function_stream()
+
+    def _record_timing(self, t_start, rtt):
+        row = self.timing.record(t_start, rtt, time.perf_counter() - t_start)
+        recorder = self.timing_recorder
+        if recorder is not None and recorder.is_open():
+            # Same time base as the rows of the text log: The time of the most
+            # recent reading, i.e. of the last frame of a streamed batch
+            recorder.write(self.state.time - self._t_log_start, *row)
+
+    def _notify_success(self):
+        t_now = time.perf_counter()
+        if self._t_prev_DAQ is not None:
+            self._DAQ_intervals.append(t_now - self._t_prev_DAQ)
+        self._t_prev_DAQ = t_now
+
+        if self.reconnector is not None:
+            self.reconnector.notify_success()
+
+    def _notify_failure(self):
+        if self.reconnector is not None and self.reconnector.notify_failure():
+            self._mark_gap()
+
+    def _mark_gap(self):
+        """Mark the start of an outage by a reading of NaNs, in the history as
+        well as in the log. The log keeps recording into the same file."""
+        state = self.state
+        state.time = self.clock.monotonic()
+        state.ds18b20_temp = np.nan
+        state.dht22_temp = np.nan
+        state.dht22_humi = np.nan
+
+        locker = QtCore.QMutexLocker(self.history.mutex)
+        self.history.append(
+            state.time, np.nan, np.nan, np.nan, state.is_valve_open
+        )
+        if self.log.is_recording():
+            self._update_log(self.clock.datetime_str() + self.file_tag + ".txt")
+        else:
+            self._N_logged = self.history.N_written
+        locker.unlock()
+
+        # Leave the outage out of the jitter and the tick lateness
+        self._t_prev_DAQ = None
+        self.timing.restart_schedule()
+
+    def _needs_reconnect(self) -> bool:
+        return self.reconnector is not None and self.reconnector.needs_attempt()
+
+    def _try_reconnect(self) -> bool:
+        """Attempt to reconnect once due. Returns True when reconnected."""
+        wait = self.reconnector.time_until_attempt()
+        if wait > 0:
+            # Sleep in short bouts, to keep the DAQ thread quittable
+            time.sleep(min(wait, RECONNECT_POLL_INTERVAL))
+            return False
+        return self.reconnector.attempt()
+
+    async def _try_reconnect_async(self) -> bool:
+        """Counterpart of `_try_reconnect()` on the asyncio engine. The attempt
+        itself blocks, so it runs in a thread of its own."""
+        wait = self.reconnector.time_until_attempt()
+        if wait > 0:
+            await asyncio.sleep(wait)
+            return False
+
+        link = self.qdev.link
+        link.detach()
+        success = await asyncio.get_running_loop().run_in_executor(
+            None, self.reconnector.attempt
+        )
+        if success:
+            link.reattach(self.ard.ser)
+        return success
+
+    def DAQ_jitter_ms(self) -> float:
+        """Standard deviation of the intervals in between the most recent
+        successful DAQ updates [ms]. In case of streaming, an update covers a
+        whole batch of frames."""
+        intervals = list(self._DAQ_intervals)  # Snapshot, as the DAQ appends
+        if len(intervals) < 2:
+            return np.nan
+        return float(np.std(intervals)) * 1e3
+
+    # --------------------------------------------------------------------------
+    #   File logger functions
+    # --------------------------------------------------------------------------
+
+    def _update_log(self, filepath):
+        """Have the log write out the readings added to the history since the
+        previous call, when recording or about to. Hold ``history.mutex``."""
+        log = self.log
+        if not (log.is_recording() or log.is_about_to_record()):
+            self._N_logged = self.history.N_written  # Pass them over
+        log.update(filepath=filepath, mode="w")
+
+    def _unlogged_rows(self):
+        """View of the readings in the history that have not been logged yet.
+        Hold ``history.mutex`` while using it."""
+        history = self.history
+        view = history.view()
+        N_new = min(max(history.N_written - self._N_logged, 0), len(view))
+        return view[len(view) - N_new :]
+
+    def write_header_to_log(self):
+        log = self.log
+        locker = QtCore.QMutexLocker(self.history.mutex)
+        rows = self._unlogged_rows()
+        self._t_log_start = (
+            float(rows["time"][0]) if len(rows) else self.state.time
+        )
+        locker.unlock()
+
+        comments = self.get_comments()
+        log.write("[HEADER]\n")
+        log.write(comments)
+        log.write("\n\n[DATA]\n")
+        log.write("time\tDS18B20 temp.\tDHT22 temp.\tDHT22 humi.\tvalve\n")
+        log.write("[s]\t[±0.5 °C]\t[±0.5 °C]\t[±3 pct]\t[0/1]\n")
+
+        if self.recorder is not None:
+            self.recorder.open(
+                log.get_filepath().with_suffix(FILE_SUFFIX),
+                comments=comments,
+                start="%s %s" % (self.clock.date_str(), self.clock.time_str()),
+                units=["s", "°C", "°C", "%", "0/1"],
+            )
+
+        if self.timing_recorder is not None:
+            self.timing_recorder.open(
+                log.get_filepath().with_suffix(TIMING_SUFFIX + FILE_SUFFIX),
+                comments=comments,
+                start="%s %s" % (self.clock.date_str(), self.clock.time_str()),
+                units=["s"] + ["ms"] * len(TIMING_FIELDS),
+                DAQ_interval_ms=self.timing.interval * 1e3,
+            )
+
+    def write_data_to_log(self):
+        # Write out the readings added to the history since the previous
+        # write, straight from a view of it. Each row gets the time of the
+        # reading itself, instead of the time of writing it out. Frames
+        # processed in one batch, e.g. when catching up on a backlog, keep
+        # their own spacing.
+        history = self.history
+        locker = QtCore.QMutexLocker(history.mutex)
+        rows = self._unlogged_rows()
+        self._N_logged = history.N_written
+        if len(rows) == 0:
+            locker.unlock()
+            return
+
+        elapsed = rows["time"] - self._t_log_start
+        text = "".join(
+            "%.3f\t%.1f\t%.1f\t%.1f\t%i\n" % row
+            for row in zip(
+                elapsed.tolist(),
+                rows["ds18b20_temp"].tolist(),
+                rows["dht22_temp"].tolist(),
+                rows["dht22_humi"].tolist(),
+                rows["is_valve_open"].tolist(),
+            )
+        )
+        records = None
+        if self.recorder is not None:
+            records = rows.astype(self.recorder.dtype)
+            records["time"] = elapsed
+        locker.unlock()
+
+        self.log.write(text)
+        if records is not None:
+            self.recorder.write_records(records)
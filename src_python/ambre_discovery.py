@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Discovery of the serial ports of the Ambre chamber Arduinos.
+
+``Arduino.auto_connect()`` probes the serial ports one after the other with
+the `id?` query, waiting up to the full read timeout on each port holding a
+silent device. Here, all candidate ports get probed concurrently with a short
+timeout instead. The last-known port of each identity is kept in a small JSON
+file and gets probed first, so that the full scan only takes place on a miss.
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+
+import json
+import time
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import serial
+import serial.tools.list_ports
+
+from dvg_debug_functions import print_fancy_traceback as pft
+
+# Last-known port of each identity. Next to the scripts, instead of in the
+# current directory, to be found from wherever the application gets started.
+PORT_CACHE_FILE = Path(__file__).parent / "config" / "ports.json"
+
+# Read timeout of the `id?` query while probing a port
+PROBE_TIMEOUT = 0.5  # [s]
+
+# Maximum number of ports to probe at once
+MAX_PROBES = 32
+
+
+def probe_port(port, baudrate=115200, timeout=PROBE_TIMEOUT):
+    """Ask the device at ``port`` for its identity.
+
+    Returns:
+        The specific identity of the Arduino, e.g. ``"Ambre chamber"``, or
+        None when the port could not be opened or does not hold an Arduino.
+    """
+    try:
+        with serial.Serial(
+            port=port,
+            baudrate=baudrate,
+            timeout=timeout,
+            write_timeout=timeout,
+        ) as ser:
+            ser.reset_input_buffer()
+            ser.write(b"id?\n")
+            reply = ser.readline()
+    except (serial.SerialException, OSError, ValueError):
+        return None
+
+    # Expected: "Arduino, [specific ID]"
+    try:
+        reply = reply.decode().split(",")
+    except UnicodeDecodeError:
+        return None
+    if len(reply) < 2 or reply[0].strip() != "Arduino":
+        return None
+    return reply[1].strip()
+
+
+class PortFinder(object):
+    """Finds the serial ports of the Arduinos by their identity. Can be shared
+    by several cores, so that the ports get scanned only once for all of the
+    identities.
+
+    Args:
+        IDs (list of str):
+            Specific identities to find, e.g. ``["Ambre chamber"]``.
+
+        cache_file (str, optional):
+            JSON file holding the last-known port of each identity.
+
+        baudrate (int, optional):
+            Baudrate to probe the ports at.
+
+    Attributes:
+        ports (dict):
+            Port found per identity.
+
+        span (tuple | None):
+            ``time.perf_counter()`` values (start, stop) of the initial
+            discovery, once performed.
+    """
+
+    def __init__(self, IDs, cache_file=PORT_CACHE_FILE, baudrate=115200):
+        self.IDs = list(IDs)
+        self.cache_file = Path(cache_file)
+        self.baudrate = baudrate
+        self.ports = {}
+        self.span = None
+        self._lock = threading.Lock()
+        self._reported = {}  # Port last printed per identity
+
+    def find(self, ID):
+        """Port of the Arduino with identity ``ID``, or None when not found.
+        The first call performs the discovery, which later calls wait for."""
+        with self._lock:
+            if self.span is None:
+                self.span = self._discover(self.IDs)
+            return self.ports.get(ID)
+
+    def rediscover(self, ID):
+        """Forget the port of the Arduino with identity ``ID`` and discover it
+        anew, e.g. after it got plugged back in, possibly at another port. The
+        ports of the other identities are left alone. Returns the port, or None
+        when not found."""
+        with self._lock:
+            self.ports.pop(ID, None)
+            self._discover([ID])
+            return self.ports.get(ID)
+
+    def list_ports(self) -> list:
+        """Candidate ports to scan."""
+        return [p.device for p in serial.tools.list_ports.comports()]
+
+    def _discover(self, IDs) -> tuple:
+        """Discover the ports of ``IDs``. Returns the span of the discovery."""
+        t_start = time.perf_counter()
+        cache = self._load_cache()
+
+        # Try the last-known ports first. Ports already found are in use.
+        cached = {
+            ID: cache[ID]
+            for ID in IDs
+            if ID in cache and cache[ID] not in self.ports.values()
+        }
+        replies = self._probe(set(cached.values()))
+        for ID, port in cached.items():
+            if replies.get(port) == ID:
+                self.ports[ID] = port
+
+        # Scan all other ports on a miss
+        if not all(ID in self.ports for ID in IDs):
+            candidates = [
+                port
+                for port in self.list_ports()
+                if port not in self.ports.values()
+            ]
+            for port, ID in self._probe(candidates).items():
+                if ID in IDs and ID not in self.ports:
+                    self.ports[ID] = port
+
+        span = (t_start, time.perf_counter())
+        N_found = sum(ID in self.ports for ID in IDs)
+        self._report(IDs, N_found, span)
+
+        if N_found:
+            cache.update(self.ports)
+            self._save_cache(cache)
+
+        return span
+
+    def _report(self, IDs, N_found, span):
+        """Print the outcome of the first discovery of each identity and of any
+        later discovery that changed its port, but not the repeated outcome of
+        every attempt to reconnect."""
+        changed = [
+            ID
+            for ID in IDs
+            if ID not in self._reported
+            or self._reported[ID] != self.ports.get(ID)
+        ]
+        if not changed:
+            return
+
+        print(
+            "Port discovery: Found %i of %i Arduino(s) in %.0f ms"
+            % (N_found, len(IDs), (span[1] - span[0]) * 1e3)
+        )
+        for ID in changed:
+            self._reported[ID] = self.ports.get(ID)
+            print("  `%s` @ %s" % (ID, self.ports.get(ID, "not found")))
+        print()
+
+    def _probe(self, ports) -> dict:
+        """Probe all ``ports`` concurrently. Returns the reply per port."""
+        ports = list(ports)
+        if not ports:
+            return {}
+
+        with ThreadPoolExecutor(min(len(ports), MAX_PROBES)) as pool:
+            replies = pool.map(
+                lambda port: probe_port(port, self.baudrate), ports
+            )
+            return dict(zip(ports, replies))
+
+    def _load_cache(self) -> dict:
+        try:
+            with self.cache_file.open(encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}  # Missing or corrupt: Do a full scan
+        return cache if isinstance(cache, dict) else {}
+
+    def _save_cache(self, cache: dict):
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with self.cache_file.open("w", encoding="utf-8") as f:
+                json.dump(cache, f, indent=2)
+        except OSError as err:
+            pft(err, 3)
@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""File logging of the Ambre chamber without touching the filesystem from out
+of the DAQ thread.
+
+``BackgroundFileWriter`` owns the file and performs all I/O in a dedicated
+thread, drained from a bounded queue. ``ThreadedFileLogger`` is a drop-in
+replacement for ``dvg_pyqt_filelogger.FileLogger`` that routes its file
+operations through such a writer.
+
+Long recordings can be rotated by size or by wall-clock period. The first
+segment keeps the requested file name, e.g. `261015_080614.txt`, and the next
+segments are numbered `261015_080614.002.txt`, `261015_080614.003.txt`, etc.
+Only the first segment carries the header. Each rotated-out segment gets
+compressed by a background worker, and the chain of segments is kept in order
+in the manifest `261015_080614.segments.json`.
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+
+import io
+import os
+import gzip
+import lzma
+import json
+import time
+import shutil
+import threading
+from pathlib import Path
+from collections import deque
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from dvg_debug_functions import print_fancy_traceback as pft
+from dvg_pyqt_filelogger import FileLogger
+
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "xz": ".xz", "zstd": ".zst"}
+
+# ------------------------------------------------------------------------------
+#   SegmentCompressor
+# ------------------------------------------------------------------------------
+
+
+class SegmentCompressor(object):
+    """Compresses closed log segments in a dedicated thread, replaces them by
+    their compressed counterpart and keeps the manifest of the segment chain
+    up to date.
+
+    Args:
+        compression (str | None, optional):
+            One of "gzip", "xz" or "zstd", or None to not compress. Falls back
+            to "gzip" when "zstd" is requested but package `zstandard` is not
+            installed.
+    """
+
+    def __init__(self, compression="gzip"):
+        if compression == "zstd" and zstandard is None:
+            print("Warning: Package `zstandard` not found. Using gzip instead.")
+            print("To install: `pip install zstandard`")
+            compression = "gzip"
+        if compression is not None and compression not in COMPRESSION_SUFFIXES:
+            raise ValueError("Unknown compression `%s`" % compression)
+        self.compression = compression
+
+        self._lock = threading.Lock()  # Guards the manifests
+        self._manifests = {}  # Manifest path -> list of segment paths
+        self._queue = deque()
+        self._cv = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, name="SegmentCompressor", daemon=True
+        )
+        self._thread.start()
+
+    @staticmethod
+    def manifest_path(base_path: Path) -> Path:
+        return base_path.with_name(base_path.stem + ".segments.json")
+
+    def add_segment(self, base_path: Path, segment_path: Path):
+        """Register a newly opened segment at the end of the chain."""
+        manifest = self.manifest_path(base_path)
+        with self._lock:
+            segments = self._manifests.setdefault(manifest, [])
+            segments.append(segment_path)
+            self._write_manifest(manifest, base_path, segments)
+
+    def compress(self, base_path: Path, segment_path: Path):
+        """Queue a closed segment for compression."""
+        if self.compression is None:
+            return
+
+        with self._cv:
+            self._queue.append((base_path, segment_path))
+            self._cv.notify()
+
+    def quit(self, timeout=None):
+        """Finish compressing all queued segments."""
+        with self._cv:
+            self._queue.append(None)
+            self._cv.notify()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while not self._queue:
+                    self._cv.wait()
+                item = self._queue.popleft()
+
+            if item is None:
+                return
+
+            base_path, segment_path = item
+            packed_path = segment_path.with_name(
+                segment_path.name + COMPRESSION_SUFFIXES[self.compression]
+            )
+            try:
+                self._compress_file(segment_path, packed_path)
+                os.remove(segment_path)
+            except Exception as err:  # pylint: disable=broad-except
+                pft(err, 3)
+                continue
+
+            manifest = self.manifest_path(base_path)
+            with self._lock:
+                segments = self._manifests.get(manifest, [])
+                segments = [
+                    packed_path if x == segment_path else x for x in segments
+                ]
+                self._manifests[manifest] = segments
+                self._write_manifest(manifest, base_path, segments)
+
+    def _compress_file(self, src: Path, dst: Path):
+        if self.compression == "gzip":
+            opener = gzip.open
+        elif self.compression == "xz":
+            opener = lzma.open
+        else:
+            opener = zstandard.open
+
+        with open(src, "rb") as f_in, opener(dst, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out, 1 << 20)
+
+    @staticmethod
+    def _write_manifest(manifest: Path, base_path: Path, segments):
+        tmp_path = manifest.with_name(manifest.name + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "base": base_path.name,
+                        "segments": [x.name for x in segments],
+                    },
+                    f,
+                    indent=2,
+                )
+            os.replace(tmp_path, manifest)
+        except Exception as err:  # pylint: disable=broad-except
+            pft(err, 3)
+
+
+# ------------------------------------------------------------------------------
+#   BackgroundFileWriter
+# ------------------------------------------------------------------------------
+
+
+class BackgroundFileWriter(object):
+    """Performs the file I/O of a single file in a dedicated thread. All
+    public methods return immediately and never block on the filesystem.
+
+    Writes are collected in a bounded queue and written out in batches. The
+    file is flushed and synced to disk every ``flush_interval`` seconds while
+    there is unflushed data, and when the file gets closed.
+
+    Args:
+        name (str, optional):
+            Name of the writer thread.
+
+        max_queue_size (int, optional):
+            Maximum number of pending writes. Writes exceeding it are dropped
+            and counted. Opening and closing the file is never dropped.
+
+        flush_interval (float, optional):
+            Flush cadence in seconds.
+
+        fsync (bool, optional):
+            Also ask the OS to commit each flush to disk?
+
+        rotate_size (int | None, optional):
+            Start a new segment when the current one has grown to this many
+            bytes.
+
+        rotate_interval (float | None, optional):
+            Start a new segment when the current one has been open for this
+            many seconds.
+
+        compression (str | None, optional):
+            Compression of rotated-out segments, see ``SegmentCompressor``.
+
+    Attributes:
+        N_queue_full (int):
+            Number of times a write found the queue full.
+
+        N_dropped (int):
+            Number of dropped writes.
+
+        N_flushes (int):
+            Number of performed flushes.
+
+        N_rotations (int):
+            Number of performed rotations.
+    """
+
+    def __init__(
+        self,
+        name="FileWriter",
+        max_queue_size=10000,
+        flush_interval=1.0,
+        fsync=True,
+        rotate_size=None,
+        rotate_interval=None,
+        compression="gzip",
+    ):
+        self.max_queue_size = max_queue_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.rotate_size = rotate_size
+        self.rotate_interval = rotate_interval
+
+        self.N_queue_full = 0
+        self.N_dropped = 0
+        self.N_flushes = 0
+        self.N_rotations = 0
+
+        self._compressor = None
+        if rotate_size is not None or rotate_interval is not None:
+            self._compressor = SegmentCompressor(compression)
+
+        # Segment bookkeeping, only touched by the writer thread
+        self._base_path = None
+        self._segment_path = None
+        self._segment_idx = 0
+        self._segment_bytes = 0
+        self._segment_t0 = 0
+        self._mode = "w"
+        self._encoding = "utf-8"
+
+        self._queue = deque()
+        self._N_pending_writes = 0
+        self._cv = threading.Condition()
+        self._filehandle = None
+
+        self._thread = threading.Thread(
+            target=self._run, name=name, daemon=True
+        )
+        self._thread.start()
+
+    # --------------------------------------------------------------------------
+    #   Producer side, callable from any thread
+    # --------------------------------------------------------------------------
+
+    def _put(self, item):
+        with self._cv:
+            self._queue.append(item)
+            self._cv.notify()
+
+    def open(self, filepath, mode="w", encoding="utf-8"):
+        """Request to open ``filepath``. Closes the current file first."""
+        self._put(("open", filepath, mode, encoding))
+
+    def write(self, data) -> bool:
+        """Queue ``data`` for writing.
+
+        Returns:
+            False when the queue was full and the data got dropped.
+        """
+        with self._cv:
+            if self._N_pending_writes >= self.max_queue_size:
+                self.N_queue_full += 1
+                self.N_dropped += 1
+                return False
+
+            self._queue.append(("write", data))
+            self._N_pending_writes += 1
+            self._cv.notify()
+
+        return True
+
+    def flush(self):
+        """Request an immediate flush."""
+        self._put(("flush",))
+
+    def close(self):
+        """Request to flush and close the current file."""
+        self._put(("close",))
+
+    def quit(self, timeout=None):
+        """Close the current file and wait for the writer thread to finish,
+        including any pending compression."""
+        self._put(("quit",))
+        self._thread.join(timeout)
+        if self._compressor is not None:
+            self._compressor.quit(timeout)
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of writes waiting in the queue."""
+        return self._N_pending_writes
+
+    # --------------------------------------------------------------------------
+    #   Writer thread
+    # --------------------------------------------------------------------------
+
+    def _run(self):
+        is_dirty = False  # Is there unflushed data?
+        t_flush = 0  # Time of the next periodic flush
+
+        while True:
+            with self._cv:
+                while not self._queue:
+                    if not is_dirty:
+                        self._cv.wait()
+                        continue
+
+                    timeout = t_flush - time.monotonic()
+                    if timeout <= 0 or not self._cv.wait(timeout):
+                        break
+
+                items = list(self._queue)
+                self._queue.clear()
+                self._N_pending_writes = 0
+
+            batch = []
+            for item in items:
+                if item[0] == "write":
+                    batch.append(item[1])
+                    continue
+
+                # Preserve the order of writes with respect to other requests
+                is_dirty |= self._write_batch(batch)
+                batch = []
+
+                if item[0] == "open":
+                    self._close_file()
+                    self._open_file(*item[1:])
+                elif item[0] == "flush":
+                    self._flush_file()
+                elif item[0] == "close":
+                    self._close_file()
+                elif item[0] == "quit":
+                    self._close_file()
+                    return
+
+                is_dirty = False
+
+            if self._write_batch(batch) and not is_dirty:
+                is_dirty = True
+                t_flush = time.monotonic() + self.flush_interval
+
+            if is_dirty and time.monotonic() >= t_flush:
+                self._flush_file()
+                is_dirty = False
+
+    def _write_batch(self, batch) -> bool:
+        if not batch or self._filehandle is None:
+            return False
+
+        try:
+            if isinstance(batch[0], str):
+                data = "".join(batch)
+                self._segment_bytes += len(data.encode(self._encoding))
+            else:
+                data = b"".join(batch)
+                self._segment_bytes += len(data)
+            self._filehandle.write(data)
+        except Exception as err:  # pylint: disable=broad-except
+            pft(err, 3)
+            return False
+
+        if self._compressor is not None and self._is_due_for_rotation():
+            self._rotate()
+
+        return True
+
+    def _open_file(self, filepath, mode, encoding):
+        self._base_path = Path(filepath)
+        self._mode = mode
+        self._encoding = encoding
+        self._segment_idx = 1
+        self._open_segment(self._base_path)
+
+    def _open_segment(self, segment_path: Path):
+        try:
+            self._filehandle = open(
+                segment_path,
+                self._mode,
+                encoding=None if "b" in self._mode else self._encoding,
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            pft(err, 3)
+            self._filehandle = None
+            return
+
+        self._segment_path = segment_path
+        self._segment_bytes = 0
+        self._segment_t0 = time.monotonic()
+        if self._compressor is not None:
+            self._compressor.add_segment(self._base_path, segment_path)
+
+    def _is_due_for_rotation(self) -> bool:
+        if self.rotate_size is not None:
+            if self._segment_bytes >= self.rotate_size:
+                return True
+        if self.rotate_interval is not None:
+            if time.monotonic() - self._segment_t0 >= self.rotate_interval:
+                return True
+        return False
+
+    def _rotate(self):
+        closed_path = self._segment_path
+        self._close_file()
+        self._compressor.compress(self._base_path, closed_path)
+
+        self._segment_idx += 1
+        self._open_segment(
+            self._base_path.with_name(
+                "%s.%03d%s"
+                % (
+                    self._base_path.stem,
+                    self._segment_idx,
+                    self._base_path.suffix,
+                )
+            )
+        )
+        self.N_rotations += 1
+
+    def _flush_file(self):
+        if self._filehandle is None:
+            return
+
+        try:
+            self._filehandle.flush()
+            if self.fsync:
+                os.fsync(self._filehandle.fileno())
+        except Exception as err:  # pylint: disable=broad-except
+            pft(err, 3)
+
+        self.N_flushes += 1
+
+    def _close_file(self):
+        if self._filehandle is None:
+            return
+
+        self._flush_file()
+        try:
+            self._filehandle.close()
+        except Exception as err:  # pylint: disable=broad-except
+            pft(err, 3)
+
+        self._filehandle = None
+
+
+# ------------------------------------------------------------------------------
+#   ThreadedFileLogger
+# ------------------------------------------------------------------------------
+
+
+class ThreadedFileLogger(FileLogger):
+    """``FileLogger`` that hands all its file operations over to a
+    ``BackgroundFileWriter``. The state machine, signals and the elapsed timer
+    remain those of ``FileLogger``, so ``update()`` is still to be called from
+    the DAQ thread, but it will no longer block on the filesystem.
+
+    Args:
+        write_header_function (Callable, optional):
+            See ``FileLogger``.
+
+        write_data_function (Callable, optional):
+            See ``FileLogger``.
+
+        encoding (str, optional):
+            Encoding of the log file.
+
+        **kwargs:
+            Passed onto ``BackgroundFileWriter``.
+    """
+
+    def __init__(
+        self,
+        write_header_function=None,
+        write_data_function=None,
+        encoding="utf-8",
+        **kwargs,
+    ):
+        super().__init__(
+            write_header_function=write_header_function,
+            write_data_function=write_data_function,
+        )
+        self._encoding = encoding
+        self.writer = BackgroundFileWriter(name="FileLogger", **kwargs)
+
+    def is_about_to_record(self) -> bool:
+        """Will the next call to ``update()`` start a new recording?"""
+        return self._start
+
+    def _create_log(self) -> bool:
+        self.writer.open(self._filepath, self._mode, self._encoding)
+        return True
+
+    def write(self, data) -> bool:
+        return self.writer.write(data)
+
+    def np_savetxt(self, *args, **kwargs) -> bool:
+        buffer = io.StringIO()
+        try:
+            np.savetxt(buffer, *args, **kwargs)
+        except Exception as err:  # pylint: disable=broad-except
+            pft(err, 3)
+            return False
+
+        return self.writer.write(buffer.getvalue())
+
+    def flush(self):
+        self.writer.flush()
+
+    def close(self):
+        if self._is_recording:
+            self.writer.close()
+
+        super().close()
+
+    def quit(self):
+        """Close the log and wait for all pending data to be written out."""
+        self.close()
+        self.writer.quit()
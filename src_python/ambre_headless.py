@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Headless acquisition and logging of the Ambre chamber, e.g. on a server
+without a display.
+
+Runs an ``AmbreCore`` per chamber inside a bare ``QCoreApplication`` and starts
+recording to file right away. The status gets reported to the console
+periodically. None of ``QtWidgets``, ``QtGui``, pyqtgraph or OpenGL gets
+imported. Stop with Ctrl+C or SIGTERM, upon which the log gets flushed to disk.
+Send SIGUSR1 to enable, or dump, the hot-path profiler.
+
+Usage: ``python main.py --headless [--sim] [--comments TEXT] ...``
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+
+import os
+import sys
+import signal
+
+import numpy as np
+from PyQt5 import QtCore
+
+from ambre_core import create_cores, raise_process_priority
+from ambre_metrics import MetricsServer
+from ambre_profiler import PROFILE_FILE, dump, request_dump
+from ambre_startup import StartupProfiler
+
+# Interval at which the Python interpreter gets a chance to handle Ctrl+C and
+# SIGTERM while the Qt event loop is running
+SIGNAL_POLL_INTERVAL_MS = 200  # [ms]
+
+
+class HeadlessRunner(QtCore.QObject):
+    """Drives the ``AmbreCore``s from the Qt event loop and reports their
+    status.
+
+    Args:
+        cores (list of AmbreCore):
+            Connected and set up cores, one per chamber.
+
+        status_interval_ms (int):
+            Interval at which to print the status to the console [ms].
+
+        startup (StartupProfiler, optional):
+            Gets reported on at the first sample.
+
+    Attributes:
+        exit_code (int):
+            0 on a regular stop, 1 when the connection to all of the Arduinos
+            got lost for good, i.e. when replaying or with ``--no-reconnect``.
+    """
+
+    def __init__(self, cores, status_interval_ms, startup=None):
+        super().__init__()
+        self.cores = cores
+        self.startup = startup
+        self.exit_code = 0
+
+        self._timer_status = QtCore.QTimer()
+        self._timer_status.setInterval(max(int(status_interval_ms), 1))
+        self._timer_status.timeout.connect(self.print_status)
+
+        # Python signal handlers only run in between Python bytecodes
+        self._timer_signals = QtCore.QTimer()
+        self._timer_signals.setInterval(SIGNAL_POLL_INTERVAL_MS)
+        self._timer_signals.timeout.connect(lambda: None)
+
+        for core in cores:
+            # Mind the late binding of `core` inside the lambda
+            core.qdev.signal_connection_lost.connect(
+                lambda core=core: self.notify_connection_lost(core)
+            )
+            if startup is not None:
+                core.qdev.signal_DAQ_updated.connect(self.notify_first_sample)
+            core.log.signal_recording_started.connect(
+                lambda filepath: print("Recording to file: %s\n" % filepath)
+            )
+
+    def start(self):
+        for core in self.cores:
+            core.log.record(True)
+            core.start()
+        self._timer_status.start()
+        self._timer_signals.start()
+
+    def stop(self):
+        self._timer_status.stop()
+        self._timer_signals.stop()
+        for core in self.cores:
+            core.stop()
+
+    def request_quit(self, *_):
+        """Leave the event loop. Can be used as a Python signal handler."""
+        QtCore.QCoreApplication.quit()
+
+    @QtCore.pyqtSlot()
+    def print_status(self):
+        for core in self.cores:
+            if core.is_running():
+                print(self.format_status(core))
+
+        if self.cores[0].is_replay_finished():
+            print("\nReplay finished.")
+            self.request_quit()
+
+    def format_status(self, core) -> str:
+        state = core.state
+        log = core.log
+
+        line = (
+            "%s %s  #%i  %5.1f Hz ± %4.1f ms  %5.1f °C  %5.1f °C  %5.1f %%  "
+            "valve %i"
+            % (
+                core.clock.date_str(),
+                core.clock.time_str(),
+                core.qdev.update_counter_DAQ,
+                core.qdev.obtained_DAQ_rate_Hz,
+                core.DAQ_jitter_ms(),
+                state.ds18b20_temp,
+                state.dht22_temp,
+                state.dht22_humi,
+                state.is_valve_open,
+            )
+        )
+        if len(self.cores) > 1:
+            line = "[%s] %s" % (core.device_id, line)
+        if log.is_recording():
+            line += "  rec %s" % log.pretty_elapsed()
+            if log.writer.N_dropped:
+                line += " (dropped %i)" % log.writer.N_dropped
+
+        reconnector = core.reconnector
+        if reconnector is not None and reconnector.is_in_outage():
+            line += "  LOST %.0f s, attempt %i" % (
+                reconnector.outage_duration(),
+                reconnector.N_attempts_outage(),
+            )
+        elif reconnector is not None and reconnector.N_outages:
+            line += "  outages %i (last %.1f s, recovered in %.1f s)" % (
+                reconnector.N_outages,
+                reconnector.last_outage_duration,
+                reconnector.last_time_to_recover,
+            )
+        return line
+
+    @QtCore.pyqtSlot()
+    def notify_first_sample(self):
+        if self.startup.time_to_first_sample is not None:
+            return  # Already noted, via a signal queued before disconnecting
+        if all(np.isnan(core.state.time) for core in self.cores):
+            return  # No reading yet
+
+        for core in self.cores:
+            core.qdev.signal_DAQ_updated.disconnect(self.notify_first_sample)
+        self.startup.first_sample()
+        print("\n%s\n" % self.startup.report())
+
+        args = self.cores[0].args
+        if args.startup_log is not None:
+            self.startup.save(
+                args.startup_log, mode="headless", N_devices=len(self.cores)
+            )
+
+    def notify_connection_lost(self, core):
+        core.stop()
+        print(
+            "\nCRITICAL ERROR @ %s %s\nLost connection to Arduino `%s`."
+            % (core.clock.date_str(), core.clock.time_str(), core.device_id)
+        )
+
+        # Keep acquiring from the other chambers, if any
+        if not any(x.is_running() for x in self.cores):
+            self.exit_code = 1
+            self.request_quit()
+
+
+def run_headless(args, startup=None) -> int:
+    """Acquire and record until stopped. Returns the exit code.
+
+    Args:
+        args (argparse.Namespace):
+            Parsed command line, see ``ambre_core.build_arg_parser()``.
+
+        startup (StartupProfiler, optional):
+            Profiler to continue timing the startup sequence with.
+    """
+    if startup is None:
+        startup = StartupProfiler()
+
+    print("PID: %s\n" % os.getpid())
+    raise_process_priority()
+
+    cores = create_cores(args)
+    for core in cores:
+        if not core.connect():
+            print("\nCheck connection and try resetting the Arduino.")
+            print("Exiting...\n")
+            return 0
+    if cores[0].port_finder is not None:
+        startup.add_span("port discovery", *cores[0].port_finder.span)
+    startup.mark("connect to Arduino")
+
+    QtCore.QThread.currentThread().setObjectName("MAIN")  # For DEBUG info
+    app = QtCore.QCoreApplication(sys.argv)
+
+    for core in cores:
+        core.setup()
+    runner = HeadlessRunner(cores, args.status_every * 1e3, startup)
+
+    signal.signal(signal.SIGINT, runner.request_quit)
+    signal.signal(signal.SIGTERM, runner.request_quit)
+
+    # Enable, or dump, the hot-path profilers on demand
+    profilers = {core.name: core.profiler for core in cores}
+    profile_file = args.profile if args.profile is not None else PROFILE_FILE
+    if hasattr(signal, "SIGUSR1"):  # Not on Windows
+        signal.signal(
+            signal.SIGUSR1,
+            lambda *_: request_dump(profilers, profile_file),
+        )
+
+    runner.start()
+    startup.mark("DAQ start")
+
+    # Optional Prometheus metrics
+    metrics = None
+    if args.metrics_port is not None:
+        metrics = MetricsServer(cores, args.metrics_port, args.metrics_host)
+        metrics.start()
+
+    app.exec_()
+
+    print("\nAbout to quit")
+    runner.stop()
+    if metrics is not None:
+        metrics.quit()
+    for core in cores:
+        core.quit()
+
+    if any(profiler.enabled for profiler in profilers.values()):
+        dump(profilers, profile_file)
+    return runner.exit_code
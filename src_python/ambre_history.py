@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Single authoritative history of the Ambre chamber readings, shared by the
+charts and any other consumer that needs to look back in time.
+
+``TieredHistory`` extends the raw history with coarser tiers of min/mean/max
+aggregates, rolled up on ingest, to look back days or weeks at bounded memory.
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+
+import numpy as np
+from PyQt5 import QtCore
+
+# fmt: off
+HISTORY_DTYPE = np.dtype([
+    ("time"         , "f8"),  # [s]
+    ("ds18b20_temp" , "f4"),  # ['C]
+    ("dht22_temp"   , "f4"),  # ['C]
+    ("dht22_humi"   , "f4"),  # [%]
+    ("is_valve_open", "u1"),
+])
+# fmt: on
+
+
+class HistoryBuffer(object):
+    """Preallocated columnar ring buffer, stored as a structured NumPy array
+    with a write cursor. New samples are placed at the end, pushing out the
+    oldest samples when the buffer has reached its capacity (FIFO).
+
+    Every sample is written twice, at the cursor and at the cursor plus the
+    capacity. That way the samples in chronological order always form a
+    contiguous slice, so that ``view()`` never has to copy or unwrap.
+
+    The buffer gets written to by the DAQ thread and read from by others. Hold
+    ``mutex`` for as long as you are using a view.
+
+    Args:
+        capacity (int):
+            Maximum number of samples to hold.
+
+        dtype (numpy.dtype, optional):
+            Structured dtype of a single sample.
+
+    Attributes:
+        N_written (int):
+            Total number of samples ever appended. Serves as generation
+            counter: When it has not changed, neither has the content.
+    """
+
+    def __init__(self, capacity: int, dtype=HISTORY_DTYPE):
+        self.capacity = int(capacity)
+        self.dtype = np.dtype(dtype)
+        self.mutex = QtCore.QMutex()
+        self.N_written = 0
+
+        self._data = np.zeros(2 * self.capacity, dtype=self.dtype)
+        self._cursor = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, *values):
+        """Append a single sample, given as values for each field in order of
+        the dtype."""
+        locker = QtCore.QMutexLocker(self.mutex)
+        c = self._cursor
+        self._data[c] = values
+        self._data[c + self.capacity] = values
+
+        self._cursor = (c + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self.N_written += 1
+        locker.unlock()
+
+    def extend(self, **columns):
+        """Append a batch of samples, given as an array for each field by
+        keyword. Fields that are left out are set to zero."""
+        N = len(next(iter(columns.values())))
+        if N == 0:
+            return
+
+        # Only the most recent `capacity` samples can survive
+        skip = max(N - self.capacity, 0)
+
+        locker = QtCore.QMutexLocker(self.mutex)
+        idx = (self._cursor + skip + np.arange(N - skip)) % self.capacity
+        rows = np.zeros(N - skip, dtype=self.dtype)
+        for name, values in columns.items():
+            rows[name] = values[skip:]
+        self._data[idx] = rows
+        self._data[idx + self.capacity] = rows
+
+        self._cursor = (self._cursor + N) % self.capacity
+        self._size = min(self._size + N, self.capacity)
+        self.N_written += N
+        locker.unlock()
+
+    def view(self) -> np.ndarray:
+        """Zero-copy view of all samples in chronological order. Hold
+        ``mutex`` while using it."""
+        stop = self._cursor + self.capacity
+        return self._data[stop - self._size : stop]
+
+    def clear(self):
+        locker = QtCore.QMutexLocker(self.mutex)
+        self._cursor = 0
+        self._size = 0
+        self.N_written += 1  # Content has changed
+        locker.unlock()
+
+
+# ------------------------------------------------------------------------------
+#   AggregateTier
+# ------------------------------------------------------------------------------
+
+
+def aggregate_dtype(dtype=HISTORY_DTYPE) -> np.dtype:
+    """Structured dtype holding the `time` of each bucket, followed by the
+    `<field>_min`, `<field>_mean` and `<field>_max` of every other field."""
+    fields = [("time", "f8")]
+    for name in np.dtype(dtype).names:
+        if name != "time":
+            fields.extend(
+                (name + suffix, "f4") for suffix in ("_min", "_mean", "_max")
+            )
+    return np.dtype(fields)
+
+
+class AggregateTier(object):
+    """History of aggregates over fixed time buckets of raw samples. The bucket
+    currently being filled is kept apart and gets appended to ``buffer`` once
+    a sample of a later bucket arrives. NaN readings are left out of the
+    aggregates.
+
+    Args:
+        period (float):
+            Duration of a bucket [s].
+
+        retention (float):
+            Duration of the history to hold [s].
+
+        dtype (numpy.dtype, optional):
+            Structured dtype of the raw samples.
+
+    Attributes:
+        buffer (HistoryBuffer):
+            Completed buckets of ``aggregate_dtype()``. The `time` field holds
+            the center of each bucket.
+    """
+
+    def __init__(self, period: float, retention: float, dtype=HISTORY_DTYPE):
+        self.period = period
+        self.retention = retention
+        self.fields = [x for x in np.dtype(dtype).names if x != "time"]
+        self.buffer = HistoryBuffer(
+            capacity=int(np.ceil(retention / period)),
+            dtype=aggregate_dtype(dtype),
+        )
+
+        # Open bucket: Its number and per field [min, max, sum, count]
+        self._bucket = None
+        self._acc = {}
+
+    def clear(self):
+        self._bucket = None
+        self._acc = {}
+        self.buffer.clear()
+
+    def ingest(self, t, **columns):
+        """Roll up a batch of raw samples in chronological order, given as an
+        array of times and an array for each field by keyword."""
+        t = np.asarray(t, dtype=np.float64)
+        if len(t) == 0:
+            return
+
+        # Split the batch into runs of samples falling into the same bucket
+        buckets = np.floor(t / self.period).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        buckets = buckets[starts]
+
+        aggs = {}
+        for name in self.fields:
+            values = np.asarray(
+                columns.get(name, np.zeros(len(t))), dtype=np.float64
+            )
+            is_valid = ~np.isnan(values)
+            aggs[name] = np.stack(
+                (
+                    np.fmin.reduceat(values, starts),
+                    np.fmax.reduceat(values, starts),
+                    np.add.reduceat(np.where(is_valid, values, 0), starts),
+                    np.add.reduceat(is_valid, starts),
+                )
+            )
+
+        # Merge the first run into the open bucket, or close the open bucket
+        if buckets[0] == self._bucket:
+            for name in self.fields:
+                acc, agg = self._acc[name], aggs[name][:, 0]
+                agg[0] = np.fmin(acc[0], agg[0])
+                agg[1] = np.fmax(acc[1], agg[1])
+                agg[2:] += acc[2:]
+        elif self._bucket is not None:
+            buckets = np.r_[self._bucket, buckets]
+            for name in self.fields:
+                aggs[name] = np.column_stack((self._acc[name], aggs[name]))
+
+        # All runs but the last one are complete buckets
+        self._bucket = buckets[-1]
+        self._acc = {name: aggs[name][:, -1].copy() for name in self.fields}
+        if len(buckets) == 1:
+            return
+
+        rows = {"time": (buckets[:-1] + 0.5) * self.period}
+        for name in self.fields:
+            v_min, v_max, v_sum, N = aggs[name][:, :-1]
+            rows[name + "_min"] = v_min
+            with np.errstate(invalid="ignore", divide="ignore"):
+                rows[name + "_mean"] = np.where(N > 0, v_sum / N, np.nan)
+            rows[name + "_max"] = v_max
+        self.buffer.extend(**rows)
+
+
+# ------------------------------------------------------------------------------
+#   TieredHistory
+# ------------------------------------------------------------------------------
+
+
+class TieredHistory(HistoryBuffer):
+    """``HistoryBuffer`` of raw samples that additionally rolls every ingested
+    sample up into a number of ``AggregateTier`` histories, going from fine to
+    coarse.
+
+    Args:
+        capacity (int):
+            Number of raw samples to hold.
+
+        tiers (list of tuples (period, retention)):
+            Bucket duration and history duration [s] of each tier.
+
+        dtype (numpy.dtype, optional):
+            Structured dtype of a single raw sample.
+
+    ``mutex`` is held across the update of the raw samples and of the tiers,
+    so that a ``clear()`` from another thread can not interleave with an
+    ingest.
+    """
+
+    def __init__(self, capacity: int, tiers=(), dtype=HISTORY_DTYPE):
+        super().__init__(capacity, dtype=dtype)
+        self.mutex = QtCore.QMutex(QtCore.QMutex.Recursive)
+        self.tiers = [
+            AggregateTier(period, retention, dtype=dtype)
+            for period, retention in tiers
+        ]
+
+    def append(self, *values):
+        locker = QtCore.QMutexLocker(self.mutex)
+        super().append(*values)
+        columns = dict(zip(self.dtype.names, ([x] for x in values)))
+        t = columns.pop("time")
+        for tier in self.tiers:
+            tier.ingest(t, **columns)
+        locker.unlock()
+
+    def extend(self, **columns):
+        locker = QtCore.QMutexLocker(self.mutex)
+        super().extend(**columns)
+        columns = dict(columns)
+        t = columns.pop("time")
+        for tier in self.tiers:
+            tier.ingest(t, **columns)
+        locker.unlock()
+
+    def clear(self):
+        locker = QtCore.QMutexLocker(self.mutex)
+        super().clear()
+        for tier in self.tiers:
+            tier.clear()
+        locker.unlock()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Fast loader of the text log files of the Ambre chamber.
+
+A log file looks like ::
+
+    [HEADER]
+    <comments>
+    [DATA]
+    time	DS18B20 temp.	DHT22 temp.	DHT22 humi.	valve
+    [s]	[±0.5 °C]	[±0.5 °C]	[±3 pct]	[0/1]
+    0.0	20.0	20.5	60.0	1
+    ...
+
+The file gets memory-mapped and the rows below the column headers are parsed
+into NumPy arrays in vectorized chunks. Because the rows are in chronological
+order, a time range is located by bisecting on byte offsets, without parsing
+the rows outside of it.
+
+Logs that got rotated into several, possibly compressed, segments are loaded
+as a whole by passing the path of the first segment, as long as its
+`.segments.json` manifest is present.
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+
+import gzip
+import lzma
+import json
+import mmap
+from pathlib import Path
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from ambre_history import HISTORY_DTYPE
+
+# Same fields as the history, except that `time` denotes the elapsed time since
+# the start of the recording
+LOG_DTYPE = HISTORY_DTYPE
+
+_DATA_MARKER = b"[DATA]"
+_HEADER_MARKER = b"[HEADER]"
+_N_COLUMN_HEADER_ROWS = 2
+
+
+def load_log(filepath, t_start=None, t_stop=None, chunk_size=1 << 24):
+    """Load a text log file.
+
+    Args:
+        filepath (str | pathlib.Path):
+            Log file to load. In case of a rotated log: The first segment.
+
+        t_start (float | None, optional):
+            Only return rows with `time` >= ``t_start`` [s].
+
+        t_stop (float | None, optional):
+            Only return rows with `time` <= ``t_stop`` [s].
+
+        chunk_size (int, optional):
+            Number of bytes to parse in one go. Bounds the temporary memory.
+
+    Returns:
+        Tuple (comments, data), where comments is the text of the [HEADER]
+        section and data is a structured array of ``LOG_DTYPE``.
+    """
+    comments = ""
+    chunks = []
+
+    for idx, segment in enumerate(_list_segments(Path(filepath))):
+        with _open_buffer(segment) as buf:
+            start = 0
+            if idx == 0:
+                comments, start = _parse_header(buf, segment)
+
+            # Ignore a partially written last row, e.g. after a crash
+            stop = buf.rfind(b"\n", start) + 1
+            if t_start is not None:
+                start = _bisect_rows(buf, start, stop, t_start, strict=False)
+            if t_stop is not None:
+                stop = _bisect_rows(buf, start, stop, t_stop, strict=True)
+
+            chunks.extend(_parse_rows(buf, start, stop, chunk_size, segment))
+
+    if not chunks:
+        return comments, np.zeros(0, dtype=LOG_DTYPE)
+    return comments, np.concatenate(chunks)
+
+
+# ------------------------------------------------------------------------------
+#   Helpers
+# ------------------------------------------------------------------------------
+
+
+def _list_segments(filepath: Path):
+    manifest = filepath.with_name(filepath.stem + ".segments.json")
+    if not manifest.exists():
+        return [filepath]
+
+    with open(manifest, "r", encoding="utf-8") as f:
+        segments = json.load(f)["segments"]
+    return [filepath.with_name(name) for name in segments]
+
+
+@contextmanager
+def _open_buffer(filepath: Path):
+    """Memory-map an uncompressed file, or decompress a compressed one."""
+    suffix = filepath.suffix
+    if suffix in (".gz", ".xz", ".zst"):
+        if suffix == ".gz":
+            opener = gzip.open
+        elif suffix == ".xz":
+            opener = lzma.open
+        elif zstandard is None:
+            raise ImportError(
+                "Package `zstandard` is needed to load %s" % filepath
+            )
+        else:
+            opener = zstandard.open
+
+        with opener(filepath, "rb") as f:
+            yield f.read()
+        return
+
+    with open(filepath, "rb") as f:
+        if f.seek(0, 2) == 0:  # Empty files can't be memory-mapped
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield buf
+
+
+def _parse_header(buf, filepath):
+    """Returns the header comments and the offset of the first data row."""
+    idx = buf.find(_DATA_MARKER)
+    if idx < 0:
+        raise ValueError("No [DATA] section found in %s" % filepath)
+
+    comments = bytes(buf[:idx])
+    if comments.startswith(_HEADER_MARKER):
+        comments = comments[len(_HEADER_MARKER) :]
+    comments = comments.decode("utf-8").strip()
+
+    # Skip the [DATA] marker and the column headers
+    pos = idx
+    for _ in range(1 + _N_COLUMN_HEADER_ROWS):
+        pos = buf.find(b"\n", pos) + 1
+        if pos == 0:
+            return comments, len(buf)
+
+    return comments, pos
+
+
+def _row_time(buf, pos):
+    return float(buf[pos : buf.find(b"\t", pos)])
+
+
+def _bisect_rows(buf, start, stop, t, strict):
+    """Offset of the first row in [start, stop) with a time >= ``t``, or with
+    a time > ``t`` when ``strict``. Only the rows visited get parsed."""
+    lo, hi = start, stop
+    while lo < hi:
+        # Row start at or after the middle offset
+        mid = (lo + hi) // 2
+        row = buf.rfind(b"\n", lo, mid) + 1
+        if row <= lo:
+            row = lo
+
+        t_row = _row_time(buf, row)
+        if t_row > t or (not strict and t_row == t):
+            hi = row
+        else:
+            lo = buf.find(b"\n", row, stop) + 1
+
+    return lo
+
+
+def _parse_rows(buf, start, stop, chunk_size, filepath):
+    N_cols = len(LOG_DTYPE.names)
+    pos = start
+    while pos < stop:
+        end = min(pos + chunk_size, stop)
+        if end < stop:
+            end = buf.rfind(b"\n", pos, end) + 1
+            if end == 0:  # Row longer than the chunk size
+                end = buf.find(b"\n", pos, stop) + 1
+
+        values = np.fromstring(buf[pos:end], sep=" ")
+        if values.size % N_cols:
+            raise ValueError(
+                "Malformed data between byte %i and %i in %s"
+                % (pos, end, filepath)
+            )
+
+        values = values.reshape(-1, N_cols)
+        rows = np.empty(len(values), dtype=LOG_DTYPE)
+        for col, name in enumerate(LOG_DTYPE.names):
+            rows[name] = values[:, col]
+        yield rows
+
+        pos = end
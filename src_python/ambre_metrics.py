@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Prometheus metrics of the Ambre chamber, served over a local HTTP endpoint.
+
+The readings, the valve state and the health of the DAQ, the logging and the
+connection of each chamber get served in the Prometheus text format at
+``http://HOST:PORT/metrics``, to be scraped by a central monitoring system.
+
+The metrics get rendered from what the cores already hold in memory, never by
+querying the Arduino. The rendered text is cached for ``CACHE_TTL`` seconds and
+shared by all scrapers, so that any number of them cost about the same as one.
+The HTTP server runs in a thread of its own, away from the DAQ and the GUI.
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+
+import math
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dvg_debug_functions import print_fancy_traceback as pft
+
+# Default address to serve the metrics at. Local only, unless overridden.
+METRICS_HOST = "127.0.0.1"
+
+# Maximum age of the rendered metrics served to a scrape
+CACHE_TTL = 1.0  # [s]
+
+# Metric families: name -> (type, help)
+# fmt: off
+METRICS = {
+    "ambre_temperature_celsius"         : ("gauge",   "Temperature reading"),
+    "ambre_humidity_percent"            : ("gauge",   "Humidity reading"),
+    "ambre_humidity_threshold_percent"  : ("gauge",   "Humidity threshold of the valve control"),
+    "ambre_valve_open"                  : ("gauge",   "Is the valve open?"),
+    "ambre_valve_open_when_super_humi"  : ("gauge",   "Does the valve open above the humidity threshold, instead of below?"),
+    "ambre_reading_age_seconds"         : ("gauge",   "Time since the most recent reading"),
+    "ambre_daq_updates_total"           : ("counter", "Number of DAQ updates"),
+    "ambre_daq_rate_hertz"              : ("gauge",   "Obtained DAQ rate"),
+    "ambre_daq_jitter_seconds"          : ("gauge",   "Standard deviation of the DAQ interval"),
+    "ambre_daq_timing_seconds"          : ("gauge",   "Percentiles of the DAQ tick timing over the most recent ticks"),
+    "ambre_daq_ticks_skipped_total"     : ("counter", "Number of DAQ ticks skipped by falling behind the schedule"),
+    "ambre_log_recording"               : ("gauge",   "Is the log recording?"),
+    "ambre_log_queue_depth"             : ("gauge",   "Number of writes waiting in the queue of the log writer"),
+    "ambre_log_dropped_writes_total"    : ("counter", "Number of writes dropped by the log writer"),
+    "ambre_connected"                   : ("gauge",   "Is the Arduino connected, i.e. not in an outage?"),
+    "ambre_outages_total"               : ("counter", "Number of outages of the connection"),
+    "ambre_reconnect_attempts_total"    : ("counter", "Number of attempts to reconnect"),
+    "ambre_outage_duration_seconds"     : ("gauge",   "Duration of the current outage so far"),
+    "ambre_last_outage_duration_seconds": ("gauge",   "Duration of the most recent ended outage"),
+    "ambre_last_time_to_recover_seconds": ("gauge",   "Time to reconnect after the most recent ended outage"),
+    "ambre_outage_seconds_total"        : ("counter", "Summed duration of all ended outages"),
+}
+# fmt: on
+
+# Quantile label of the percentiles of `DAQTiming.percentiles()`
+TIMING_QUANTILES = ("0.5", "0.99", "1")
+
+
+def collect(core) -> list:
+    """Samples of the metrics of a single ``AmbreCore``, as a list of tuples
+    (name, labels, value). Only reads what the core holds in memory."""
+    state = core.state
+    device = {"device": core.device_id}
+
+    # The row of NaNs marking an outage does not count as a reading
+    if core.reconnector is not None and core.reconnector.is_in_outage():
+        reading_age = core.reconnector.outage_duration()
+    else:
+        # Streamed readings can be timestamped slightly ahead of the clock
+        reading_age = max(core.clock.monotonic() - state.time, 0.0)
+
+    samples = [
+        ("ambre_temperature_celsius", dict(device, sensor="ds18b20"), state.ds18b20_temp),
+        ("ambre_temperature_celsius", dict(device, sensor="dht22"), state.dht22_temp),
+        ("ambre_humidity_percent", dict(device, sensor="dht22"), state.dht22_humi),
+        ("ambre_humidity_threshold_percent", device, state.humi_threshold),
+        ("ambre_valve_open", device, state.is_valve_open),
+        ("ambre_valve_open_when_super_humi", device, state.open_valve_when_super_humi),
+        ("ambre_reading_age_seconds", device, reading_age),
+    ]  # fmt: skip
+
+    if core.qdev is not None:
+        samples += [
+            ("ambre_daq_updates_total", device, core.qdev.update_counter_DAQ),
+            ("ambre_daq_rate_hertz", device, core.qdev.obtained_DAQ_rate_Hz),
+            ("ambre_daq_jitter_seconds", device, core.DAQ_jitter_ms() / 1e3),
+        ]
+
+    timing = core.timing
+    if timing is not None:
+        for field, stats in timing.percentiles().items():
+            for quantile, value in zip(TIMING_QUANTILES, stats):
+                samples.append(
+                    (
+                        "ambre_daq_timing_seconds",
+                        dict(device, field=field, quantile=quantile),
+                        value / 1e3,
+                    )
+                )
+        samples.append(
+            ("ambre_daq_ticks_skipped_total", device, timing.N_skipped)
+        )
+
+    log = core.log
+    if log is not None:
+        samples += [
+            ("ambre_log_recording", device, log.is_recording()),
+            ("ambre_log_queue_depth", device, log.writer.queue_depth),
+            ("ambre_log_dropped_writes_total", device, log.writer.N_dropped),
+        ]
+
+    if core.reconnector is not None:
+        metrics = core.reconnector.metrics()
+        samples += [
+            ("ambre_connected", device, not metrics["is_in_outage"]),
+            ("ambre_outages_total", device, metrics["N_outages"]),
+            ("ambre_reconnect_attempts_total", device, metrics["N_attempts"]),
+            ("ambre_outage_duration_seconds", device, metrics["outage_duration"]),
+            ("ambre_last_outage_duration_seconds", device, metrics["last_outage_duration"]),
+            ("ambre_last_time_to_recover_seconds", device, metrics["last_time_to_recover"]),
+            ("ambre_outage_seconds_total", device, metrics["total_outage_duration"]),
+        ]  # fmt: skip
+
+    return samples
+
+
+def render(cores) -> str:
+    """Metrics of all ``cores`` in the Prometheus text format."""
+    samples = [sample for core in cores for sample in collect(core)]
+
+    lines = []
+    for name, (type_, help_) in METRICS.items():
+        family = [sample for sample in samples if sample[0] == name]
+        if not family:
+            continue
+
+        lines.append("# HELP %s %s" % (name, help_))
+        lines.append("# TYPE %s %s" % (name, type_))
+        for _, labels, value in family:
+            lines.append(
+                "%s{%s} %s"
+                % (name, _format_labels(labels), _format_value(value))
+            )
+    return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: dict) -> str:
+    return ",".join(
+        '%s="%s"'
+        % (
+            key,
+            str(value)
+            .replace("\\", "\\\\")
+            .replace('"', '\\"')
+            .replace("\n", "\\n"),
+        )
+        for key, value in labels.items()
+    )
+
+
+def _format_value(value) -> str:
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+# ------------------------------------------------------------------------------
+#   MetricsServer
+# ------------------------------------------------------------------------------
+
+
+class MetricsServer(object):
+    """Serves the metrics of the ``AmbreCore``s at ``/metrics`` from a thread
+    of its own. A scrape gets the cached metrics when they are younger than
+    ``CACHE_TTL``, and otherwise renders them anew. Concurrent scrapes wait
+    for a single render.
+
+    Args:
+        cores (list of AmbreCore):
+            Set up cores, one per chamber.
+
+        port (int):
+            TCP port to listen at.
+
+        host (str, optional):
+            Address to listen at.
+
+    Attributes:
+        N_scrapes (int):
+            Number of scrapes served.
+
+        N_renders (int):
+            Number of times the metrics got rendered.
+    """
+
+    def __init__(self, cores, port, host=METRICS_HOST):
+        self.cores = cores
+        self.port = port
+        self.host = host
+
+        self.N_scrapes = 0
+        self.N_renders = 0
+
+        self._cache = b""
+        self._t_cache = -math.inf
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def start(self) -> bool:
+        """Start serving. Returns False when the port could not be bound."""
+        try:
+            self._server = ThreadingHTTPServer(
+                (self.host, self.port), _make_handler(self)
+            )
+        except OSError as err:
+            pft(err, 3)
+            print("Could not serve the metrics at port %s.\n" % self.port)
+            return False
+
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="metrics", daemon=True
+        )
+        self._thread.start()
+        print(
+            "Serving metrics at http://%s:%i/metrics\n"
+            % (self.host, self._server.server_address[1])
+        )
+        return True
+
+    def quit(self):
+        if self._server is None:
+            return
+
+        print("Closing metrics server......... ", end="")
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        print("done.")
+
+    def get_metrics(self) -> bytes:
+        """Rendered metrics, at most ``CACHE_TTL`` seconds old."""
+        with self._lock:
+            self.N_scrapes += 1
+            t_now = time.perf_counter()
+            if t_now - self._t_cache >= CACHE_TTL:
+                self._cache = render(self.cores).encode("utf-8")
+                self._t_cache = t_now
+                self.N_renders += 1
+            return self._cache
+
+
+def _make_handler(metrics_server: MetricsServer):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            # pylint: disable=invalid-name
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+
+            try:
+                body = metrics_server.get_metrics()
+            except Exception as err:  # pylint: disable=broad-except
+                pft(err, 3)
+                self.send_error(500)
+                return
+
+            self.send_response(200)
+            self.send_header(
+                "Content-Type", "text/plain; version=0.0.4; charset=utf-8"
+            )
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass  # Not every scrape to the console
+
+    return MetricsHandler
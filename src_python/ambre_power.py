@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Power governor of the Ambre chamber GUI, for unattended runs lasting weeks.
+
+The refresh rate of the widgets and charts gets lowered when the main window is
+in the background, and the refresh gets suspended altogether when the window
+is minimized or otherwise not exposed. On restore, a single catch-up redraw
+takes place. Acquisition and logging run in their own threads and are not
+governed.
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+
+import psutil
+from PyQt5 import QtCore
+
+from dvg_debug_functions import print_fancy_traceback as pft
+
+# Window states
+ACTIVE = "active"  # Visible and having focus
+BACKGROUND = "background"  # Visible, but another window has focus
+HIDDEN = "hidden"  # Minimized, hidden or not exposed on screen
+
+
+class PowerGovernor(QtCore.QObject):
+    """Adjusts the refresh timers of the GUI to the state of the main window
+    and measures the CPU usage of this process in each state.
+
+    Args:
+        window (QtWidgets.QWidget):
+            Main window to watch.
+
+        poll_interval_ms (int, optional):
+            Interval at which to re-evaluate the window state and to sample the
+            CPU usage [ms]. Not all window managers notify when a window gets
+            covered, hence the polling.
+
+    Attributes:
+        state (str):
+            Current window state: ``ACTIVE``, ``BACKGROUND`` or ``HIDDEN``.
+
+        cpu_percent (dict):
+            Moving average of the CPU usage of this process in each state [%],
+            or None when the state has not been visited yet. Can exceed 100 %
+            on multi-core machines.
+    """
+
+    signal_state_changed = QtCore.pyqtSignal(str)
+
+    # Weight of a new CPU sample in the moving average
+    CPU_SMOOTHING = 0.2
+
+    def __init__(self, window, poll_interval_ms=1000):
+        super().__init__()
+        self.window = window
+        self.state = ACTIVE
+        self.cpu_percent = {ACTIVE: None, BACKGROUND: None, HIDDEN: None}
+
+        self._timers = []  # Tuples (timer, active ms, background ms)
+        self._signals = []  # Tuples (signal, slot), connected unless hidden
+        self._restore_slots = []
+        self._is_running = False
+
+        try:
+            self._proc = psutil.Process()
+            self._proc.cpu_percent(None)  # Start of the first measurement
+        except Exception as err:  # pylint: disable=broad-except
+            pft(err, 3)
+            self._proc = None
+
+        self._timer_poll = QtCore.QTimer()
+        self._timer_poll.setInterval(poll_interval_ms)
+        self._timer_poll.timeout.connect(self._poll)
+
+    def add_timer(self, timer, active_ms: int, background_ms: int):
+        """Govern a refresh timer: It runs at ``active_ms`` when the window is
+        active, at ``background_ms`` when in the background and is stopped when
+        hidden."""
+        self._timers.append((timer, active_ms, background_ms))
+
+    def add_signal(self, signal, slot):
+        """Keep ``slot`` connected to ``signal`` only while not hidden."""
+        self._signals.append((signal, slot))
+
+    def add_restore_slot(self, slot):
+        """Call ``slot`` once when the window returns from being hidden."""
+        self._restore_slots.append(slot)
+
+    def start(self):
+        """Connect the governed signals, start the governed timers at the rate
+        of the current window state and start watching the window."""
+        self._is_running = True
+        self.state = self.detect_state()
+        if self.state != HIDDEN:
+            for signal, slot in self._signals:
+                signal.connect(slot)
+        self._apply_timers()
+
+        self.window.installEventFilter(self)
+        self._timer_poll.start()
+
+    def stop(self):
+        """Stop the governed timers and stop watching the window."""
+        if not self._is_running:
+            return
+
+        self._is_running = False
+        self._timer_poll.stop()
+        self.window.removeEventFilter(self)
+        for timer, _, _ in self._timers:
+            timer.stop()
+
+    def detect_state(self) -> str:
+        w = self.window
+        handle = w.windowHandle()
+        if (
+            not w.isVisible()
+            or w.isMinimized()
+            or (handle is not None and not handle.isExposed())
+        ):
+            return HIDDEN
+        if not w.isActiveWindow():
+            return BACKGROUND
+        return ACTIVE
+
+    # --------------------------------------------------------------------------
+    #   Internals
+    # --------------------------------------------------------------------------
+
+    def eventFilter(self, obj, event):  # pylint: disable=invalid-name
+        if event.type() in (
+            QtCore.QEvent.WindowStateChange,
+            QtCore.QEvent.ActivationChange,
+            QtCore.QEvent.Show,
+            QtCore.QEvent.Hide,
+        ):
+            # Let the event settle first
+            QtCore.QTimer.singleShot(0, self._update_state)
+
+        return super().eventFilter(obj, event)
+
+    @QtCore.pyqtSlot()
+    def _poll(self):
+        self._sample_cpu()
+        self._update_state()
+
+    def _sample_cpu(self):
+        if self._proc is None:
+            return
+
+        try:
+            sample = self._proc.cpu_percent(None)
+        except Exception as err:  # pylint: disable=broad-except
+            pft(err, 3)
+            return
+
+        avg = self.cpu_percent[self.state]
+        self.cpu_percent[self.state] = (
+            sample if avg is None else avg + self.CPU_SMOOTHING * (sample - avg)
+        )
+
+    @QtCore.pyqtSlot()
+    def _update_state(self):
+        if not self._is_running:
+            return
+
+        new_state = self.detect_state()
+        if new_state == self.state:
+            return
+
+        # Attribute the CPU usage up till now to the old state
+        self._sample_cpu()
+        old_state, self.state = self.state, new_state
+
+        if new_state == HIDDEN:
+            for signal, slot in self._signals:
+                signal.disconnect(slot)
+        elif old_state == HIDDEN:
+            for signal, slot in self._signals:
+                signal.connect(slot)
+
+            # Catch up with a single redraw
+            for slot in self._restore_slots:
+                slot()
+
+        self._apply_timers()
+        self.signal_state_changed.emit(new_state)
+
+    def _apply_timers(self):
+        for timer, active_ms, background_ms in self._timers:
+            if self.state == HIDDEN:
+                timer.stop()
+            else:
+                timer.start(
+                    active_ms if self.state == ACTIVE else background_ms
+                )
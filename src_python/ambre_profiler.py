@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Hot-path profiler of the acquisition pipeline of the Ambre chamber.
+
+The DAQ functions are divided into stages, like the query, the parsing, the
+history and the logging, each timed by a ``lap()`` of a ``StageProfiler``. The
+laps are always in place, but cost no more than a call of an empty function
+while the profiler is disabled. Once enabled, the count, mean and maximum
+duration of each stage get aggregated, to be reported on demand as a table or
+saved as JSON.
+
+Enable from the start with ``--profile``, or while running by sending SIGUSR1
+or by pressing Ctrl+P in the GUI. Each next request dumps the profile.
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+
+import json
+import time
+import threading
+
+from dvg_debug_functions import print_fancy_traceback as pft
+
+# JSON file to dump the profile to, unless given on the command line
+PROFILE_FILE = "profile.json"
+
+
+def _noop(*args):
+    # pylint: disable=unused-argument
+    pass
+
+
+class StageProfiler(object):
+    """Aggregates the duration of the stages of a pipeline that runs over and
+    over in a single thread, e.g. the DAQ function of a single Arduino. Call
+    ``start()`` at the start of the pipeline and ``lap(stage)`` at the end of
+    each stage. Can be read from other threads.
+
+    Args:
+        enabled (bool, optional):
+            Start out enabled. Otherwise, ``start()`` and ``lap()`` do nothing.
+    """
+
+    def __init__(self, enabled=False):
+        self._stages = {}  # Stage name -> [count, total [s], max [s]]
+        self._t_lap = 0.0
+        self._lock = threading.Lock()
+        self.enabled = False
+        self.set_enabled(enabled)
+
+    def set_enabled(self, enabled: bool):
+        # Swap in the no-ops while disabled, to keep the hot path free of any
+        # checks
+        self.enabled = enabled
+        self.start = self._start if enabled else _noop
+        self.lap = self._lap if enabled else _noop
+
+    def _start(self):
+        self._t_lap = time.perf_counter()
+
+    def _lap(self, stage: str):
+        t_now = time.perf_counter()
+        dt = t_now - self._t_lap
+        self._t_lap = t_now
+
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                self._stages[stage] = [1, dt, dt]
+            else:
+                stats[0] += 1
+                stats[1] += dt
+                if dt > stats[2]:
+                    stats[2] = dt
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def stats(self) -> dict:
+        """Dict of ``count``, ``mean`` [s], ``max`` [s] and ``total`` [s] per
+        stage, in order of first appearance."""
+        with self._lock:
+            return {
+                stage: {
+                    "count": count,
+                    "mean": total / count,
+                    "max": max_,
+                    "total": total,
+                }
+                for stage, (count, total, max_) in self._stages.items()
+            }
+
+
+# ------------------------------------------------------------------------------
+#   Reporting
+# ------------------------------------------------------------------------------
+
+
+def report(profilers: dict) -> str:
+    """Table of the stages of each of the ``profilers``, given as a dict of
+    name -> ``StageProfiler``."""
+    lines = ["Hot-path profile [µs]:"]
+    for name, profiler in profilers.items():
+        stats = profiler.stats()
+        grand_total = sum(x["total"] for x in stats.values())
+        lines.append(
+            "  %-16s %9s %9s %9s %7s"
+            % ("`%s`" % name, "count", "mean", "max", "share")
+        )
+        if not stats:
+            lines.append("    %-14s" % "(no samples)")
+        for stage, x in stats.items():
+            lines.append(
+                "    %-14s %9i %9.1f %9.1f %6.1f%%"
+                % (
+                    stage,
+                    x["count"],
+                    x["mean"] * 1e6,
+                    x["max"] * 1e6,
+                    x["total"] / grand_total * 100 if grand_total else 0,
+                )
+            )
+    return "\n".join(lines)
+
+
+def save(profilers: dict, filepath):
+    """Save the stages of each of the ``profilers`` as JSON to ``filepath``,
+    overwriting it."""
+    record = {
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "units": "s",
+        "profiles": {
+            name: profiler.stats() for name, profiler in profilers.items()
+        },
+    }
+
+    try:
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+    except OSError as err:
+        pft(err, 3)
+
+
+def dump(profilers: dict, filepath=PROFILE_FILE):
+    """Print the table and save the JSON."""
+    print("\n%s\n" % report(profilers))
+    save(profilers, filepath)
+    print("Saved profile to `%s`.\n" % filepath)
+
+
+def request_dump(profilers: dict, filepath=PROFILE_FILE):
+    """Enable the ``profilers`` on the first request, dump them on later
+    requests."""
+    if all(profiler.enabled for profiler in profilers.values()):
+        dump(profilers, filepath)
+        return
+
+    for profiler in profilers.values():
+        profiler.set_enabled(True)
+    print("\nHot-path profiler enabled. Request again to dump.\n")
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Recovery of a lost connection to an Ambre chamber Arduino.
+
+A missed reply, e.g. due to a USB hiccup, used to end the acquisition for
+good. Instead, the ``Reconnector`` now declares an outage and has the core
+retry to reconnect, with an exponentially growing pause in between the
+attempts. It also keeps track of the outages, so that they can be reported.
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+
+import time
+import threading
+
+from dvg_debug_functions import print_fancy_traceback as pft
+
+# Pause in between the reconnect attempts, doubling after each failed attempt
+# fmt: off
+BACKOFF_MIN = 1   # [s]
+BACKOFF_MAX = 60  # [s]
+# fmt: on
+
+
+class Reconnector(object):
+    """Schedules the reconnect attempts of a single Arduino with exponential
+    backoff, and measures the outages.
+
+    The DAQ reports each reading with ``notify_success()`` or
+    ``notify_failure()``. The first failure starts an outage, after which the
+    DAQ should call ``attempt()`` once ``time_until_attempt()`` has run out,
+    instead of querying the Arduino. The outage ends at the first successful
+    reading after a successful attempt.
+
+    Args:
+        name (str):
+            Name of the Arduino, as printed to the console.
+
+        reconnect_function (Callable):
+            Tries to reconnect to the Arduino. Returns True when successful.
+
+        backoff_min (float, optional):
+            Pause after the first failed attempt [s]. The very first attempt
+            takes place right away.
+
+        backoff_max (float, optional):
+            Maximum pause in between two attempts [s].
+
+    Attributes:
+        N_outages (int):
+            Number of outages so far, including a current one.
+
+        N_attempts (int):
+            Number of reconnect attempts so far, over all outages.
+
+        last_outage_duration (float):
+            Duration of the most recent ended outage, from the last reading
+            before up to the first reading after it [s]. I.e. the gap in the
+            recorded data.
+
+        last_time_to_recover (float):
+            Time from the detection of the most recent ended outage up to the
+            successful reconnect attempt [s].
+
+        total_outage_duration (float):
+            Summed duration of all ended outages [s].
+    """
+
+    def __init__(
+        self,
+        name,
+        reconnect_function,
+        backoff_min=BACKOFF_MIN,
+        backoff_max=BACKOFF_MAX,
+    ):
+        self.name = name
+        self.reconnect_function = reconnect_function
+        self.backoff_min = backoff_min
+        self.backoff_max = max(backoff_max, backoff_min)
+
+        self.N_outages = 0
+        self.N_attempts = 0
+        self.last_outage_duration = float("nan")
+        self.last_time_to_recover = float("nan")
+        self.total_outage_duration = 0.0
+
+        self._is_in_outage = False
+        self._is_reconnected = False  # Awaiting the first reading
+        self._t_last_success = None
+        self._t_detected = None
+        self._t_next_attempt = None
+        self._backoff = 0.0
+        self._N_attempts_outage = 0
+
+        # The metrics get read from the GUI or status thread
+        self._lock = threading.Lock()
+
+    def is_in_outage(self) -> bool:
+        return self._is_in_outage
+
+    def needs_attempt(self) -> bool:
+        """Should the DAQ try to reconnect, instead of querying the Arduino?"""
+        return self._is_in_outage and not self._is_reconnected
+
+    def time_until_attempt(self) -> float:
+        """Time left until the next reconnect attempt is due [s]."""
+        return max(self._t_next_attempt - time.perf_counter(), 0.0)
+
+    def outage_duration(self) -> float:
+        """Duration of the current outage so far [s], or 0 when connected."""
+        if not self._is_in_outage:
+            return 0.0
+        return time.perf_counter() - self._t_last_success
+
+    def N_attempts_outage(self) -> int:
+        """Number of reconnect attempts during the current outage."""
+        return self._N_attempts_outage if self._is_in_outage else 0
+
+    def notify_success(self):
+        """Report a successful reading."""
+        t_now = time.perf_counter()
+        if self._is_in_outage:
+            with self._lock:
+                self.last_outage_duration = t_now - self._t_last_success
+                self.total_outage_duration += self.last_outage_duration
+                self._is_in_outage = False
+                self._is_reconnected = False
+
+            print(
+                "Recovered `%s` after an outage of %.1f s: %i attempt(s), "
+                "reconnected in %.1f s.\n"
+                % (
+                    self.name,
+                    self.last_outage_duration,
+                    self._N_attempts_outage,
+                    self.last_time_to_recover,
+                )
+            )
+        self._t_last_success = t_now
+
+    def notify_failure(self) -> bool:
+        """Report a failed reading. Returns True when it starts a new outage,
+        upon which the DAQ should mark the gap in the data."""
+        t_now = time.perf_counter()
+        if self._is_in_outage:
+            if self._is_reconnected:
+                # Reconnected, but still no readings: Keep on trying
+                self._is_reconnected = False
+                self._schedule_next_attempt(t_now)
+            return False
+
+        with self._lock:
+            self.N_outages += 1
+            self._is_in_outage = True
+            self._is_reconnected = False
+            self._N_attempts_outage = 0
+            self._t_detected = t_now
+            if self._t_last_success is None:
+                self._t_last_success = t_now
+            self._t_next_attempt = t_now
+            self._backoff = 0.0
+
+        print(
+            "\nLost connection to `%s` @ %s. Reconnecting...\n"
+            % (self.name, time.strftime("%d-%m-%Y %H:%M:%S"))
+        )
+        return True
+
+    def attempt(self) -> bool:
+        """Try to reconnect. Returns True when successful."""
+        with self._lock:
+            self.N_attempts += 1
+            self._N_attempts_outage += 1
+
+        try:
+            success = self.reconnect_function()
+        except Exception as err:  # pylint: disable=broad-except
+            pft(err, 3)
+            success = False
+
+        t_now = time.perf_counter()
+        if success:
+            self._is_reconnected = True
+            self.last_time_to_recover = t_now - self._t_detected
+        else:
+            self._schedule_next_attempt(t_now)
+            print(
+                "Reconnecting to `%s` failed, attempt %i. Retrying in %.0f s.\n"
+                % (self.name, self._N_attempts_outage, self._backoff)
+            )
+        return success
+
+    def metrics(self) -> dict:
+        """Snapshot of the outage metrics."""
+        with self._lock:
+            return {
+                "is_in_outage": self._is_in_outage,
+                "outage_duration": self.outage_duration(),
+                "N_outages": self.N_outages,
+                "N_attempts": self.N_attempts,
+                "last_outage_duration": self.last_outage_duration,
+                "last_time_to_recover": self.last_time_to_recover,
+                "total_outage_duration": self.total_outage_duration,
+            }
+
+    def _schedule_next_attempt(self, t_now):
+        self._backoff = min(
+            max(self._backoff * 2, self.backoff_min), self.backoff_max
+        )
+        self._t_next_attempt = t_now + self._backoff
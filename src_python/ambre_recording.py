@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Append-only binary recording format of the Ambre chamber, written alongside
+the text log. Loading it back is a matter of memory-mapping the file.
+
+File layout ::
+
+    offset  size  content
+    ------  ----  ------------------------------------------------------------
+         0     8  magic b"AMBREREC"
+         8     2  uint16, format version
+        10     4  uint32, offset of the first record
+        14     N  UTF-8 JSON metadata: dtype, header comments, start time, ...
+                  Padded with spaces up to the offset of the first record
+     .....   ...  fixed-size records of ``RECORD_DTYPE``, little-endian
+
+The number of records follows from the file size. A partially written last
+record, e.g. after a crash, is ignored by the loader.
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from ambre_history import HISTORY_DTYPE
+from ambre_filelogger import BackgroundFileWriter
+
+MAGIC = b"AMBREREC"
+FORMAT_VERSION = 1
+FILE_SUFFIX = ".ambre"
+
+# Same fields as the history, except that `time` denotes the elapsed time since
+# the start of the recording
+RECORD_DTYPE = HISTORY_DTYPE.newbyteorder("<")
+
+_PREAMBLE = struct.Struct("<8sHI")
+_ALIGNMENT = 64  # Records start at a multiple of this offset
+
+
+class BinaryRecorder(object):
+    """Writes fixed-size binary records to an append-only file. The file I/O
+    takes place in a ``BackgroundFileWriter`` thread.
+
+    Args:
+        dtype (numpy.dtype, optional):
+            Structured dtype of a single record.
+
+        **kwargs:
+            Passed onto ``BackgroundFileWriter``.
+    """
+
+    def __init__(self, dtype=RECORD_DTYPE, **kwargs):
+        self.dtype = np.dtype(dtype)
+        self.writer = BackgroundFileWriter(name="BinaryRecorder", **kwargs)
+        self._is_open = False
+        self._row = np.zeros(1, dtype=self.dtype)
+
+    def open(self, filepath, comments: str = "", **metadata) -> bool:
+        """Create the file and write the metadata header.
+
+        Args:
+            filepath (str | pathlib.Path):
+                File to create. Will be overwritten when it exists.
+
+            comments (str, optional):
+                Free-form comments, i.e. the [HEADER] section of the text log.
+
+            **metadata:
+                Additional JSON-serializable entries to store in the header.
+
+        Returns:
+            True if the request got queued, False otherwise.
+        """
+        header = dict(
+            dtype=self.dtype.descr,
+            comments=comments,
+            **metadata,
+        )
+        header = json.dumps(header).encode("utf-8")
+        offset = _PREAMBLE.size + len(header)
+        offset = -(-offset // _ALIGNMENT) * _ALIGNMENT
+        header = header.ljust(offset - _PREAMBLE.size, b" ")
+
+        self.writer.open(filepath, "wb")
+        self._is_open = self.writer.write(
+            _PREAMBLE.pack(MAGIC, FORMAT_VERSION, offset) + header
+        )
+        return self._is_open
+
+    def is_open(self) -> bool:
+        return self._is_open
+
+    def write(self, *values) -> bool:
+        """Append a single record, given as values for each field in order of
+        the dtype."""
+        if not self._is_open:
+            return False
+
+        self._row[0] = values
+        return self.writer.write(self._row.tobytes())
+
+    def write_records(self, records: np.ndarray) -> bool:
+        """Append a batch of records, given as structured array of the
+        dtype."""
+        if not self._is_open:
+            return False
+
+        return self.writer.write(
+            np.ascontiguousarray(records, dtype=self.dtype).tobytes()
+        )
+
+    def close(self):
+        if self._is_open:
+            self.writer.close()
+            self._is_open = False
+
+    def quit(self):
+        """Close the file and wait for all pending data to be written out."""
+        self.close()
+        self.writer.quit()
+
+
+def load_recording(filepath):
+    """Memory-map a binary recording.
+
+    Returns:
+        Tuple (metadata, records), where metadata is a dict holding the header
+        entries and records is a read-only structured ``numpy.memmap``.
+    """
+    filepath = Path(filepath)
+    with open(filepath, "rb") as f:
+        magic, version, offset = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError("Not an Ambre recording: %s" % filepath)
+        if version > FORMAT_VERSION:
+            raise ValueError(
+                "Unsupported recording format version %i: %s"
+                % (version, filepath)
+            )
+        metadata = json.loads(f.read(offset - _PREAMBLE.size).decode("utf-8"))
+
+    dtype = np.dtype([tuple(field) for field in metadata["dtype"]])
+    N_records = (filepath.stat().st_size - offset) // dtype.itemsize
+    if N_records == 0:
+        return metadata, np.zeros(0, dtype=dtype)
+
+    records = np.memmap(
+        filepath, dtype=dtype, mode="r", offset=offset, shape=(N_records,)
+    )
+    return metadata, records
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Replay of a recorded Ambre chamber log through the live pipeline.
+
+The recording is served by ``ReplayFirmwareModel``, which takes the place of
+the simulated firmware behind a ``SimulatedArduino``. It streams out the
+recorded readings as telemetry frames, paced by a replay clock running at a
+multiple of real time, or as fast as possible. From there on the samples take
+the exact same path as when acquired live: DAQ, state, history, charts, GUI and
+file logger.
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+# pylint: disable=missing-function-docstring
+
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ambre_simulator import AmbreFirmwareModel
+from ambre_recording import load_recording, FILE_SUFFIX
+from ambre_logfile import load_log
+
+
+def load_replay(filepath):
+    """Load a text log or a binary ``.ambre`` recording.
+
+    Returns:
+        Tuple (comments, data), where data is a structured array holding at
+        least the fields of ``LOG_DTYPE``.
+    """
+    filepath = Path(filepath)
+    if filepath.suffix == FILE_SUFFIX:
+        metadata, data = load_recording(filepath)
+        return metadata.get("comments", ""), data
+
+    return load_log(filepath)
+
+
+class ReplayFirmwareModel(AmbreFirmwareModel):
+    """Firmware model that plays back recorded readings instead of simulating
+    them. Replies to `?` and `?b` with the most recent reading according to
+    the replay clock, and streams out every recorded reading exactly once.
+
+    The replay clock starts at the first `?`, `?b` or `stream on` command.
+    The valve state is taken from the recording. Changing the valve control
+    settings is accepted, but has no effect on the playback.
+
+    Args:
+        data (numpy.ndarray):
+            Structured array as returned by ``load_replay()``.
+
+        speed (float, optional):
+            Replay speed as a multiple of real time. Pass ``numpy.inf`` to
+            replay as fast as possible.
+
+    Attributes:
+        is_finished (bool):
+            Have all readings been played back?
+    """
+
+    # Maximum number of frames per stream tick when replaying as fast as
+    # possible
+    MAX_FRAMES_PER_TICK = 1000
+
+    def __init__(self, data, speed=1.0, ID="Ambre chamber"):
+        super().__init__(ID=ID)
+        self.data = data
+        self.speed = speed
+        self.is_finished = len(data) == 0
+
+        # Recorded time since the first reading [s]
+        self._t = np.asarray(data["time"], dtype=np.float64)
+        if len(self._t):
+            self._t = self._t - self._t[0]
+        self._cursor = 0  # Index of the next reading to play back
+        self._t_start = None  # Start of the replay clock
+
+    def replay_time(self) -> float:
+        """Position of the replay clock in recorded time [s]."""
+        if self._t_start is None:
+            return 0.0
+        return (time.perf_counter() - self._t_start) * self.speed
+
+    def millis(self) -> int:
+        return self._ds18_tick
+
+    def _due(self, N_max=1) -> int:
+        """Index up to which the readings are due to be played back."""
+        if np.isinf(self.speed):
+            return min(self._cursor + N_max, len(self._t))
+        return int(np.searchsorted(self._t, self.replay_time(), "right"))
+
+    def _set_readings(self, idx):
+        row = self.data[idx]
+        self._ds18_tick = int(round(self._t[idx] * 1e3))
+        self.ds18_temp = float(row["ds18b20_temp"])
+        self.dht22_temp = float(row["dht22_temp"])
+        self.dht22_humi = float(row["dht22_humi"])
+        self.is_valve_open = bool(row["is_valve_open"])
+
+    def process(self, cmd: str):
+        if self._t_start is None and cmd in ("?", "?b"):
+            self._t_start = time.perf_counter()
+
+        reply = super().process(cmd)
+
+        if self._t_start is None and cmd == "stream on":
+            self._t_start = time.perf_counter()
+
+        return reply
+
+    def update(self):
+        if self._t_start is None or self.is_streaming:
+            return  # Readings are advanced by `stream_frames()` instead
+
+        stop = self._due()
+        if stop > self._cursor:
+            self._set_readings(stop - 1)
+            self._cursor = stop
+            self.is_finished = stop == len(self._t)
+
+    def stream_frames(self) -> bytes:
+        stop = self._due(self.MAX_FRAMES_PER_TICK)
+        frames = []
+        for idx in range(self._cursor, stop):
+            self._set_readings(idx)
+            frames.append(self.telemetry_frame(self._ds18_tick))
+
+        if stop > self._cursor:
+            self._cursor = stop
+            self.is_finished = stop == len(self._t)
+
+        return b"".join(frames)
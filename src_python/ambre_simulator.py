@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Simulated Ambre chamber Arduino, for running the application without the
+actual hardware attached.
+
+The simulation takes place at the level of the serial port. Class
+``SimulatedSerial`` mimics the parts of ``serial.Serial`` that are used by
+``dvg_devices``, and passes each received command on to
+``AmbreFirmwareModel``, which is a Python port of the command handling and
+valve logic of ``src_mcu/src/main.cpp``. Hence, the regular ``Arduino`` code
+paths (``query()``, ``query_ascii_values()``, etc.) are exercised exactly as
+they would be with a real Feather M4 attached.
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+# pylint: disable=missing-function-docstring
+
+import time
+import threading
+from collections import deque
+
+import numpy as np
+
+from dvg_devices.Arduino_protocol_serial import Arduino
+
+from ambre_telemetry import encode_frame
+
+# Same update periods as the firmware
+UPDATE_PERIOD_DS18B20 = 1000  # [ms]
+UPDATE_PERIOD_DHT22 = 2000  # [ms]
+
+
+# ------------------------------------------------------------------------------
+#   AmbreFirmwareModel
+# ------------------------------------------------------------------------------
+
+
+class AmbreFirmwareModel(object):
+    """Python port of the firmware running on the Feather M4, including a
+    crude physical model of the chamber: The humidity relaxes towards ambient
+    when the valve is closed, and towards the humidity of the connected gas
+    line when the valve is open.
+
+    Args:
+        ID (str):
+            Specific identity to reply to the `id?` query.
+
+        seed (int, optional):
+            Seed of the random sensor noise, for reproducible runs.
+    """
+
+    # fmt: off
+    AMBIENT_HUMI    = 60.0  # [%]
+    DRY_LINE_HUMI   = 5.0   # [%] N2 gas line, when opening at super humi
+    HUMID_LINE_HUMI = 95.0  # [%] Humid air line, when opening at sub humi
+    TAU_HUMI        = 60.0  # [s] Time constant of the humidity response
+    # fmt: on
+
+    def __init__(self, ID="Ambre chamber", seed=None):
+        self.ID = ID
+        self._rng = np.random.default_rng(seed)
+        self._t0 = time.perf_counter()
+
+        self.ds18_temp = 20.0  # ['C]
+        self.dht22_temp = 20.5  # ['C]
+        self.dht22_humi = self.AMBIENT_HUMI  # [%]
+        self.is_valve_open = False
+
+        self.humi_threshold = 50.0  # [%]
+        self.open_valve_when_super_humi = True
+
+        self.is_streaming = False
+        self.stream_period = 1000  # [ms]
+
+        self._ds18_tick = 0  # [ms]
+        self._dht22_tick = 0  # [ms]
+        self._humi = self.AMBIENT_HUMI  # True humidity, noiseless [%]
+
+    def millis(self) -> int:
+        return int((time.perf_counter() - self._t0) * 1e3)
+
+    def update(self):
+        """Equivalent of the firmware's `loop()`, minus the serial command
+        handling. Gets called just before each command is processed."""
+        now = self.millis()
+
+        if now - self._dht22_tick >= UPDATE_PERIOD_DHT22:
+            dt = (now - self._dht22_tick) / 1e3
+            self._dht22_tick = now
+
+            if self.is_valve_open:
+                target = (
+                    self.DRY_LINE_HUMI
+                    if self.open_valve_when_super_humi
+                    else self.HUMID_LINE_HUMI
+                )
+            else:
+                target = self.AMBIENT_HUMI
+            self._humi += (target - self._humi) * (
+                1 - np.exp(-dt / self.TAU_HUMI)
+            )
+
+            self.dht22_humi = self._humi + self._rng.normal(0, 0.3)
+            self.dht22_temp = 20.5 + self._rng.normal(0, 0.1)
+
+        if now - self._ds18_tick >= UPDATE_PERIOD_DS18B20:
+            self._ds18_tick = now
+            self.ds18_temp = 20.0 + self._rng.normal(0, 0.05)
+
+        # Automatic control of the valve depending on the humidity
+        if np.isnan(self.dht22_humi):
+            self.is_valve_open = False
+        else:
+            self.is_valve_open = bool(
+                (
+                    (self.dht22_humi > self.humi_threshold)
+                    and self.open_valve_when_super_humi
+                )
+                or (
+                    (self.dht22_humi < self.humi_threshold)
+                    and not self.open_valve_when_super_humi
+                )
+            )
+
+    def telemetry_frame(self, tick) -> bytes:
+        return encode_frame(
+            tick,
+            self.ds18_temp,
+            self.dht22_temp,
+            self.dht22_humi,
+            self.is_valve_open,
+        )
+
+    def stream_frames(self) -> bytes:
+        """Frames to push out at each tick of the stream period."""
+        self.update()
+        return self.telemetry_frame(self.millis())
+
+    def process(self, cmd: str):
+        """Process a single command as sent by the host.
+
+        Returns:
+            The reply as ASCII string, a binary frame as bytes, or None when
+            the command does not generate a reply.
+        """
+        self.update()
+
+        if cmd == "?b":
+            return self.telemetry_frame(self._ds18_tick)
+
+        if cmd == "bin?":
+            return "1"
+
+        if cmd == "stream on":
+            self.is_streaming = True
+            return None
+
+        if cmd == "stream off":
+            self.is_streaming = False
+            return None
+
+        if cmd.startswith("stream period"):
+            try:
+                self.stream_period = max(int(float(cmd[13:])), 1)
+            except ValueError:
+                self.stream_period = 1
+            return None
+
+        if cmd == "id?":
+            return "Arduino, %s" % self.ID
+
+        if cmd == "th?":
+            return "%.0f" % self.humi_threshold
+
+        if cmd.startswith("th"):
+            try:
+                value = float(cmd[2:])
+            except ValueError:
+                value = 0  # Mimics `parseFloatInString()`
+            self.humi_threshold = float(np.clip(value, 0, 100))
+            return None
+
+        if cmd == "open when super humi?":
+            return "%i" % self.open_valve_when_super_humi
+
+        if cmd == "open when super humi":
+            self.open_valve_when_super_humi = True
+            return None
+
+        if cmd == "open when sub humi":
+            self.open_valve_when_super_humi = False
+            return None
+
+        return "%i\t%.1f\t%.1f\t%.1f\t%i" % (
+            self._ds18_tick,
+            self.ds18_temp,
+            self.dht22_temp,
+            self.dht22_humi,
+            self.is_valve_open,
+        )
+
+
+# ------------------------------------------------------------------------------
+#   SimulatedSerial
+# ------------------------------------------------------------------------------
+
+
+class SimulatedSerial(object):
+    """Stand-in for ``serial.Serial``, connected to an ``AmbreFirmwareModel``
+    instead of to a physical port.
+
+    Args:
+        firmware (AmbreFirmwareModel):
+            The simulated device on the other end of the line.
+
+        reply_latency (float, optional):
+            Time in seconds between the host sending a command and the reply
+            becoming available in the input buffer of the host.
+
+        timeout (float, optional):
+            Read timeout in seconds, like ``serial.Serial``.
+
+    Attributes:
+        on_reply_queued (Callable | None):
+            Gets called with the ``time.perf_counter()`` value at which a
+            queued reply becomes available, from whichever thread queued it.
+            Takes the place of waiting on a file descriptor, which a simulated
+            port does not have.
+    """
+
+    def __init__(self, firmware, reply_latency=0.0, timeout=2, port="SIM"):
+        self.firmware = firmware
+        self.reply_latency = reply_latency
+        self.timeout = timeout
+        self.write_timeout = timeout
+        self.port = port
+        self.portstr = port
+        self.is_open = True
+
+        self._cv = threading.Condition()
+        self._rx = bytearray()  # Bytes ready to be read by the host
+        self._pending = deque()  # Replies in flight: (t_ready, bytes)
+        self._tx = bytearray()  # Incomplete command received from the host
+        self.on_reply_queued = None
+
+        # Pushes out telemetry frames while the firmware is streaming
+        self._streamer = None
+        self._stop_streamer = threading.Event()
+
+    # --------------------------------------------------------------------------
+    #   Host -> device
+    # --------------------------------------------------------------------------
+
+    def write(self, data) -> int:
+        with self._cv:
+            self._tx.extend(data)
+            while b"\n" in self._tx:
+                cmd, _, rest = self._tx.partition(b"\n")
+                self._tx = bytearray(rest)
+                reply = self.firmware.process(cmd.decode().strip())
+                if isinstance(reply, str):
+                    self._queue_reply((reply + "\r\n").encode())
+                elif reply is not None:
+                    self._queue_reply(reply)
+
+            self._cv.notify_all()
+
+        if self.firmware.is_streaming and self._streamer is None:
+            self._streamer = threading.Thread(
+                target=self._stream, name="SimulatedSerial_stream", daemon=True
+            )
+            self._streamer.start()
+
+        return len(data)
+
+    def _queue_reply(self, data: bytes):
+        t_ready = time.perf_counter() + self.reply_latency
+        self._pending.append((t_ready, data))
+        if self.on_reply_queued is not None:
+            self.on_reply_queued(t_ready)
+
+    def _stream(self):
+        t_next = time.perf_counter()
+        while not self._stop_streamer.is_set():
+            if self.firmware.is_streaming:
+                with self._cv:
+                    frames = self.firmware.stream_frames()
+                    if frames:
+                        self._queue_reply(frames)
+                        self._cv.notify_all()
+
+                # Keep to a fixed schedule, unless we fell behind too much
+                t_next += self.firmware.stream_period / 1e3
+                wait = t_next - time.perf_counter()
+                if wait < -1:
+                    t_next = time.perf_counter()
+            else:
+                t_next = time.perf_counter() + 0.05
+                wait = 0.05
+
+            self._stop_streamer.wait(max(wait, 0))
+
+    # --------------------------------------------------------------------------
+    #   Device -> host
+    # --------------------------------------------------------------------------
+
+    def _promote_pending(self):
+        now = time.perf_counter()
+        while self._pending and self._pending[0][0] <= now:
+            self._rx.extend(self._pending.popleft()[1])
+
+    def _wait(self, is_satisfied) -> None:
+        """Block until `is_satisfied()` or until the read timeout expires.
+        Must be called with `self._cv` acquired."""
+        deadline = (
+            None if self.timeout is None else time.perf_counter() + self.timeout
+        )
+        while True:
+            self._promote_pending()
+            if is_satisfied():
+                return
+
+            now = time.perf_counter()
+            if deadline is not None and now >= deadline:
+                return
+
+            wait = None if deadline is None else deadline - now
+            if self._pending:
+                t_next = self._pending[0][0] - now
+                wait = t_next if wait is None else min(wait, t_next)
+            self._cv.wait(wait)
+
+    @property
+    def in_waiting(self) -> int:
+        with self._cv:
+            self._promote_pending()
+            return len(self._rx)
+
+    def read(self, size=1) -> bytes:
+        with self._cv:
+            self._wait(lambda: len(self._rx) >= size)
+            data = bytes(self._rx[:size])
+            del self._rx[:size]
+            return data
+
+    def read_until(self, expected=b"\n", size=None) -> bytes:
+        with self._cv:
+
+            def is_satisfied():
+                if size is not None and len(self._rx) >= size:
+                    return True
+                return expected in self._rx
+
+            self._wait(is_satisfied)
+            idx = self._rx.find(expected)
+            if idx >= 0:
+                n = idx + len(expected)
+            else:
+                n = len(self._rx)
+            if size is not None:
+                n = min(n, size)
+
+            data = bytes(self._rx[:n])
+            del self._rx[:n]
+            return data
+
+    def readline(self, size=None) -> bytes:
+        return self.read_until(b"\n", size)
+
+    # --------------------------------------------------------------------------
+    #   Housekeeping
+    # --------------------------------------------------------------------------
+
+    def flush(self):
+        pass
+
+    def reset_input_buffer(self):
+        with self._cv:
+            self._rx.clear()
+            self._pending.clear()
+
+    def reset_output_buffer(self):
+        pass
+
+    def cancel_read(self):
+        pass
+
+    def cancel_write(self):
+        pass
+
+    def close(self):
+        self._stop_streamer.set()
+        self.is_open = False
+
+
+# ------------------------------------------------------------------------------
+#   SimulatedArduino
+# ------------------------------------------------------------------------------
+
+
+class SimulatedArduino(Arduino):
+    """Drop-in replacement of ``Arduino`` that connects to a simulated Ambre
+    chamber instead of scanning the serial ports.
+
+    Args:
+        reply_latency (float, optional):
+            Simulated serial round-trip latency in seconds.
+
+        firmware (AmbreFirmwareModel, optional):
+            Simulated device to connect to. Defaults to a new
+            ``AmbreFirmwareModel``.
+    """
+
+    def __init__(
+        self,
+        name="Ard",
+        long_name="Simulated Arduino",
+        connect_to_specific_ID="Ambre chamber",
+        reply_latency=0.0,
+        firmware=None,
+    ):
+        super().__init__(
+            name=name,
+            long_name=long_name,
+            connect_to_specific_ID=connect_to_specific_ID,
+        )
+        self.reply_latency = reply_latency
+        if firmware is None:
+            firmware = AmbreFirmwareModel(ID=connect_to_specific_ID)
+        self.firmware = firmware
+
+    def connect_at_port(self, port="SIM", verbose=True) -> bool:
+        if verbose:
+            print("Connecting to: %s `%s`" % (self.long_name, self.firmware.ID))
+
+        self.ser = SimulatedSerial(
+            self.firmware,
+            reply_latency=self.reply_latency,
+            timeout=self.serial_settings["timeout"],
+            port=port,
+        )
+        self.is_alive = True
+
+        success, reply = self.query("id?")
+        if success and reply.split(",")[-1].strip() == self.firmware.ID:
+            if verbose:
+                print("  @ %-11s Found `%s`\n" % (port, self.firmware.ID))
+            return True
+
+        self.close()
+        return False
+
+    def scan_ports(self, verbose=True) -> bool:
+        return self.connect_at_port(verbose=verbose)
+
+    def auto_connect(self, *args, **kwargs) -> bool:
+        # pylint: disable=unused-argument
+        return self.connect_at_port()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Startup profiler of the Ambre chamber.
+
+Times the startup sequence phase by phase, from the very first line of
+``main.py`` up to the arrival of the first sample from the Arduino. Phases run
+one after the other in the main thread and are closed with ``mark()``. Work
+running concurrently, like connecting to the Arduino in the background, is
+recorded as a span instead.
+
+Free of Qt and NumPy, also indirectly, so it can be imported before anything
+else. The start-up of the interpreter itself is not included, as the creation
+time of the process is only known to the operating system with a coarse
+resolution.
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+
+import json
+import time
+import threading
+import traceback
+
+
+class StartupProfiler(object):
+    """Per-phase timing of the startup sequence. All times are relative to the
+    creation of the profiler.
+
+    Attributes:
+        phases (list of tuple):
+            Sequential phases (name, start [s], stop [s]) of the main thread.
+
+        spans (list of tuple):
+            Concurrent spans (name, start [s], stop [s]).
+
+        time_to_first_sample (float | None):
+            Time from the creation of the profiler up to the first sample [s].
+    """
+
+    def __init__(self):
+        self._t0 = time.perf_counter()
+        self._t_mark = self._t0
+        self._lock = threading.Lock()
+        self.phases = []
+        self.spans = []
+        self.time_to_first_sample = None
+
+    def now(self) -> float:
+        """Time since the creation of the profiler [s]."""
+        return time.perf_counter() - self._t0
+
+    def mark(self, name: str):
+        """Close the current phase of the main thread under ``name``."""
+        t_now = time.perf_counter()
+        with self._lock:
+            self.phases.append(
+                (name, self._t_mark - self._t0, t_now - self._t0)
+            )
+            self._t_mark = t_now
+
+    def add_span(self, name: str, t_start: float, t_stop: float):
+        """Record concurrent work between ``time.perf_counter()`` values
+        ``t_start`` and ``t_stop``."""
+        with self._lock:
+            self.spans.append((name, t_start - self._t0, t_stop - self._t0))
+
+    def first_sample(self):
+        """Close the current phase at the arrival of the first sample."""
+        if self.time_to_first_sample is None:
+            self.mark("first sample")
+            self.time_to_first_sample = self.phases[-1][2]
+
+    def report(self) -> str:
+        with self._lock:
+            phases = list(self.phases)
+            spans = list(self.spans)
+
+        lines = ["Startup timing [ms]:"]
+        for name, t_start, t_stop in phases:
+            lines.append("  %-22s %8.1f" % (name, (t_stop - t_start) * 1e3))
+        for name, t_start, t_stop in spans:
+            lines.append(
+                "  %-22s %8.1f  (concurrent, %.1f - %.1f)"
+                % (name, (t_stop - t_start) * 1e3, t_start * 1e3, t_stop * 1e3)
+            )
+        if self.time_to_first_sample is not None:
+            lines.append(
+                "  %-22s %8.1f"
+                % ("time to first sample", self.time_to_first_sample * 1e3)
+            )
+        return "\n".join(lines)
+
+    def save(self, filepath, **extra):
+        """Append the timing as a single JSON line to ``filepath``, to track
+        it across runs. Keyword arguments get stored alongside."""
+        with self._lock:
+            record = {
+                "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "time_to_first_sample": self.time_to_first_sample,
+                "phases": {x[0]: x[2] - x[1] for x in self.phases},
+                "spans": {x[0]: x[2] - x[1] for x in self.spans},
+            }
+        record.update(extra)
+
+        try:
+            with open(filepath, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError:
+            traceback.print_exc()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Binary telemetry frames of the Ambre chamber, as an alternative to the
+tab-delimited ASCII reply to the `?` query.
+
+The firmware replies to the `?b` query with a single fixed-size little-endian
+frame ::
+
+    offset  type      field
+    ------  --------  -------------
+         0  uint16    sync word 0xA55A
+         2  uint8     payload length (17)
+         3  uint32    millis        [ms]
+         7  float32   ds18b20_temp  ['C]
+        11  float32   dht22_temp    ['C]
+        15  float32   dht22_humi    [%]
+        19  uint8     is_valve_open
+        20  uint16    CRC-16/CCITT-FALSE over bytes 2 to 19
+
+Whether the firmware supports binary frames is negotiated by the `bin?` query.
+Firmware predating binary frames replies to it with the ASCII readings instead
+of with `1`.
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+
+import struct
+import binascii
+
+import numpy as np
+
+from dvg_debug_functions import print_fancy_traceback as pft
+
+SYNC_WORD = 0xA55A
+
+# fmt: off
+FRAME_DTYPE = np.dtype([
+    ("sync"         , "<u2"),
+    ("length"       , "u1"),
+    ("millis"       , "<u4"),
+    ("ds18b20_temp" , "<f4"),
+    ("dht22_temp"   , "<f4"),
+    ("dht22_humi"   , "<f4"),
+    ("is_valve_open", "u1"),
+    ("crc"          , "<u2"),
+])
+# fmt: on
+FRAME_STRUCT = struct.Struct("<HBIfffBH")
+FRAME_SIZE = FRAME_STRUCT.size  # 22 bytes
+PAYLOAD_LENGTH = FRAME_SIZE - 5  # Without sync word, length byte and CRC
+
+_SYNC_BYTES = SYNC_WORD.to_bytes(2, "little")
+
+assert FRAME_DTYPE.itemsize == FRAME_SIZE
+
+
+def crc16(data: bytes) -> int:
+    """CRC-16/CCITT-FALSE: polynomial 0x1021, initial value 0xFFFF."""
+    return binascii.crc_hqx(data, 0xFFFF)
+
+
+def encode_frame(
+    millis, ds18b20_temp, dht22_temp, dht22_humi, is_valve_open
+) -> bytes:
+    """Pack the readings into a frame. Mirrors `send_telemetry_frame()` of
+    the firmware and is used by the simulated Arduino."""
+    frame = bytearray(
+        FRAME_STRUCT.pack(
+            SYNC_WORD,
+            PAYLOAD_LENGTH,
+            millis,
+            ds18b20_temp,
+            dht22_temp,
+            dht22_humi,
+            is_valve_open,
+            0,
+        )
+    )
+    struct.pack_into("<H", frame, FRAME_SIZE - 2, crc16(frame[2:-2]))
+    return bytes(frame)
+
+
+def decode_frame(frame: bytes):
+    """Validate and unpack a single frame.
+
+    Returns:
+        List ``[millis, ds18b20_temp, dht22_temp, dht22_humi, is_valve_open]``
+        ordered like the ASCII reply, or None when the frame is corrupt.
+    """
+    if len(frame) != FRAME_SIZE or frame[:2] != _SYNC_BYTES:
+        return None
+
+    values = FRAME_STRUCT.unpack(frame)
+    if values[1] != PAYLOAD_LENGTH or values[-1] != crc16(frame[2:-2]):
+        return None
+
+    return list(values[2:-1])
+
+
+def supports_binary_telemetry(ard) -> bool:
+    """Negotiate binary telemetry with the Arduino."""
+    success, reply = ard.query("bin?")
+    return success and reply == "1"
+
+
+def query_binary_state(ard):
+    """Binary equivalent of ``ard.query_ascii_values("?", delimiter="\\t")``.
+
+    Returns:
+        Tuple (success, readings), where readings is ordered like the ASCII
+        reply.
+    """
+    if not ard.write("?b"):
+        return False, []
+
+    try:
+        frame = ard.ser.read(FRAME_SIZE)
+    except Exception as err:  # pylint: disable=broad-except
+        pft(err, 3)
+        return False, []
+
+    readings = decode_frame(frame)
+    if readings is None:
+        # Out of sync or timed out. Drop whatever is left over so that the
+        # next query starts at a frame boundary again.
+        pft("Received corrupt telemetry frame.", 3)
+        ard.ser.reset_input_buffer()
+        return False, []
+
+    return True, readings
+
+
+# ------------------------------------------------------------------------------
+#   TelemetryStreamReader
+# ------------------------------------------------------------------------------
+
+
+class TelemetryStreamReader(object):
+    """Pulls complete binary frames in bulk out of the serial input buffer,
+    when the Arduino is pushing frames on its own schedule after having
+    received the `stream on` command.
+
+    Partial frames are kept until the next read. Corrupt frames are skipped by
+    resynchronising on the next sync word.
+
+    Args:
+        ser (serial.Serial):
+            Opened serial port of the Arduino.
+
+    Attributes:
+        N_corrupt (int):
+            Number of times the stream had to be resynchronised.
+    """
+
+    def __init__(self, ser):
+        self._ser = ser
+        self._buffer = bytearray()
+        self.N_corrupt = 0
+
+    def reset(self):
+        self._buffer.clear()
+
+    def bytes_needed(self) -> int:
+        """Number of bytes still missing to complete the next frame."""
+        return FRAME_SIZE - len(self._buffer)
+
+    def read(self):
+        """Block until at least one complete frame has been received or until
+        the serial read timeout expires, and return all complete frames that
+        are waiting.
+
+        Returns:
+            Structured array of ``FRAME_DTYPE``, possibly empty, or None when
+            the serial port raised an exception.
+        """
+        try:
+            N_bytes = max(self._ser.in_waiting, FRAME_SIZE - len(self._buffer))
+            self._buffer.extend(self._ser.read(N_bytes))
+        except Exception as err:  # pylint: disable=broad-except
+            pft(err, 3)
+            return None
+
+        return self._extract_frames()
+
+    def _extract_frames(self):
+        chunks = []
+        buf = self._buffer
+        pos = 0
+
+        while len(buf) - pos >= FRAME_SIZE:
+            if buf[pos : pos + 2] != _SYNC_BYTES:
+                # Lost sync: Skip ahead to the next sync word
+                self.N_corrupt += 1
+                idx = buf.find(_SYNC_BYTES, pos + 1)
+                pos = len(buf) - 1 if idx < 0 else idx
+                continue
+
+            # Interpret all whole frames in one go. Validate the sync words and
+            # lengths vectorized, and the CRCs frame by frame.
+            N_frames = (len(buf) - pos) // FRAME_SIZE
+            frames = np.frombuffer(
+                buf, FRAME_DTYPE, count=N_frames, offset=pos
+            )
+            is_valid = (frames["sync"] == SYNC_WORD) & (
+                frames["length"] == PAYLOAD_LENGTH
+            )
+            view = memoryview(buf)
+            for idx in np.flatnonzero(is_valid):
+                start = pos + idx * FRAME_SIZE
+                is_valid[idx] = frames["crc"][idx] == crc16(
+                    view[start + 2 : start + FRAME_SIZE - 2]
+                )
+            view.release()
+
+            N_good = N_frames if is_valid.all() else int(np.argmin(is_valid))
+            if N_good > 0:
+                chunks.append(frames[:N_good].copy())
+            del frames
+
+            pos += N_good * FRAME_SIZE
+            if N_good < N_frames:
+                # Corrupt frame: Resynchronise past its sync word
+                self.N_corrupt += 1
+                idx = buf.find(_SYNC_BYTES, pos + 1)
+                pos = len(buf) - 1 if idx < 0 else idx
+
+        del buf[:pos]
+
+        if not chunks:
+            return np.empty(0, FRAME_DTYPE)
+        if len(chunks) == 1:
+            return chunks[0]
+        return np.concatenate(chunks)
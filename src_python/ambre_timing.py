@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Timing instrumentation of the DAQ of the Ambre chamber.
+
+Every DAQ tick gets timed: How late it started with respect to its intended
+start, how long the round trip of the `?` query to the Arduino took and how
+long the DAQ function took in total. The most recent ticks are kept in a
+fixed-size ring buffer, to be summarized into percentiles and histograms, and
+can be recorded to a binary ``.timing.ambre`` file next to the text log. That
+way, timing regressions and a slow USB connection become visible.
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+
+import threading
+
+import numpy as np
+
+# Number of most recent DAQ ticks to keep
+N_TIMING_TICKS = 1000
+
+# Timed quantities of a tick [ms] and their descriptions
+TIMING_FIELDS = {
+    "lateness": "tick lateness",
+    "rtt": "query round trip",
+    "duration": "DAQ duration",
+}
+
+# A single tick, as recorded to file. The `time` is that of the most recent
+# reading, relative to the start of the recording like in the text log [s], the
+# timed quantities are in [ms].
+TIMING_DTYPE = np.dtype(
+    [("time", "<f8")] + [(name, "<f4") for name in TIMING_FIELDS]
+)
+
+# Suffix of the timing recording, in front of `ambre_recording.FILE_SUFFIX`
+TIMING_SUFFIX = ".timing"
+
+
+class DAQTiming(object):
+    """Ring buffer of the timing of the most recent DAQ ticks. Gets appended
+    to by the DAQ and read from by the GUI.
+
+    The intended start of a tick follows from a fixed schedule at the DAQ
+    interval. Like a ``QTimer``, a tick starting more than an interval late
+    skips the missed ticks and restarts the schedule from there.
+
+    Args:
+        interval_ms (float):
+            DAQ interval [ms]. With 0, e.g. when acquiring continuously or
+            streaming, the ticks have no intended start and their lateness is
+            NaN.
+
+        capacity (int, optional):
+            Number of most recent ticks to keep.
+
+    Attributes:
+        N_ticks (int):
+            Number of ticks timed so far.
+
+        N_skipped (int):
+            Number of ticks skipped so far by falling behind the schedule.
+    """
+
+    def __init__(self, interval_ms, capacity=N_TIMING_TICKS):
+        self.interval = interval_ms / 1e3
+        self.capacity = capacity
+        self.N_ticks = 0
+        self.N_skipped = 0
+
+        # Columns `lateness`, `rtt` and `duration` [ms]
+        self._buffer = np.full((capacity, len(TIMING_FIELDS)), np.nan)
+        self._t_next = None  # Intended start of the next tick
+        self._lock = threading.Lock()
+
+    def restart_schedule(self):
+        """Let the next tick start the schedule anew, e.g. after an outage."""
+        self._t_next = None
+
+    def record(self, t_start, rtt, duration) -> tuple:
+        """Add a tick.
+
+        Args:
+            t_start (float):
+                Actual start of the tick, as ``time.perf_counter()`` [s].
+
+            rtt (float):
+                Round trip of the query [s], NaN when not applicable.
+
+            duration (float):
+                Duration of the DAQ function [s].
+
+        Returns:
+            Tuple (lateness, rtt, duration) [ms].
+        """
+        lateness = np.nan
+        if self.interval > 0:
+            if self._t_next is None:
+                self._t_next = t_start
+            lateness = t_start - self._t_next
+            if lateness >= self.interval:
+                self.N_skipped += int(lateness // self.interval)
+                self._t_next = t_start
+            self._t_next += self.interval
+
+        row = (lateness * 1e3, rtt * 1e3, duration * 1e3)
+        with self._lock:
+            self._buffer[self.N_ticks % self.capacity] = row
+            self.N_ticks += 1
+        return row
+
+    def snapshot(self) -> dict:
+        """Timed quantities of the ticks in the buffer [ms], as an array per
+        field of ``TIMING_FIELDS``, in no particular order."""
+        with self._lock:
+            values = self._buffer[: min(self.N_ticks, self.capacity)].copy()
+        return {name: values[:, idx] for idx, name in enumerate(TIMING_FIELDS)}
+
+    def percentiles(self) -> dict:
+        """Tuple (p50, p99, max) [ms] per field of ``TIMING_FIELDS``, over the
+        ticks in the buffer. NaN when not applicable."""
+        stats = {}
+        for name, values in self.snapshot().items():
+            values = values[np.isfinite(values)]
+            if len(values) == 0:
+                stats[name] = (np.nan, np.nan, np.nan)
+            else:
+                p50, p99 = np.percentile(values, (50, 99))
+                stats[name] = (float(p50), float(p99), float(values.max()))
+        return stats
+
+    def histogram(self, name, bins=40) -> tuple:
+        """Histogram of field ``name`` of ``TIMING_FIELDS`` over the ticks in
+        the buffer.
+
+        Returns:
+            Tuple (counts, bin_edges [ms]), like ``numpy.histogram()``, or None
+            when there are no values.
+        """
+        values = self.snapshot()[name]
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return None
+        return np.histogram(values, bins=bins)
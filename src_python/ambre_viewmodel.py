@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""View-model layer between the Ambre chamber state and the widgets of the
+main window.
+
+Each widget gets bound to a function formatting the value it displays. A
+refresh only re-formats the bindings of which the state fields have changed,
+and only touches a widget when its formatted value differs from what it is
+already showing. Refresh requests arriving in a burst, e.g. from the DAQ
+thread and the GUI timer at once, are coalesced into a single refresh per
+frame.
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+
+import time
+
+import numpy as np
+from PyQt5 import QtCore
+
+from dvg_debug_functions import print_fancy_traceback as pft
+
+
+class _Binding(object):
+    # pylint: disable=too-few-public-methods
+    def __init__(self, setter, formatter, fields):
+        self.setter = setter
+        self.formatter = formatter
+        self.fields = None if fields is None else frozenset(fields)
+        self.value = None  # Value currently shown by the widget
+
+
+class ViewModel(QtCore.QObject):
+    """Dirty-tracked and coalesced refresh of widgets.
+
+    Args:
+        state (object | None):
+            Object holding the state fields as attributes, e.g. ``State``. Can
+            be None when none of the bindings depend on state fields.
+
+        frame_interval_ms (int, optional):
+            Minimum time in between two refreshes [ms].
+
+    Attributes:
+        N_requests (int):
+            Number of refresh requests received.
+
+        N_refreshes (int):
+            Number of refreshes performed.
+
+        N_widget_updates (int):
+            Number of times a widget got touched.
+
+        widget_updates_per_sec (float):
+            Rate of widget updates, evaluated every second.
+    """
+
+    def __init__(self, state, frame_interval_ms=16):
+        super().__init__()
+        self.state = state
+        self.frame_interval_ms = frame_interval_ms
+
+        self.N_requests = 0
+        self.N_refreshes = 0
+        self.N_widget_updates = 0
+        self.widget_updates_per_sec = np.nan
+
+        self._bindings = []
+        self._fields = set()  # All state fields that are bound to
+        self._snapshot = {}  # State fields at the previous refresh
+        self._is_scheduled = False
+        self._t_refresh = 0  # Time of the previous refresh [s]
+
+        self._rate_t0 = time.perf_counter()
+        self._rate_N0 = 0
+
+    def bind(self, setter, formatter, fields=None):
+        """Bind a widget.
+
+        Args:
+            setter (Callable):
+                Gets passed the formatted value to display, e.g.
+                ``qlabel.setText``.
+
+            formatter (Callable):
+                Returns the value to display. Returning None leaves the widget
+                untouched.
+
+            fields (list of str, optional):
+                State fields the formatted value depends on. When given, the
+                formatter is only called when any of these fields have changed.
+                When None, the formatter is called at every refresh.
+        """
+        self._bindings.append(_Binding(setter, formatter, fields))
+        if fields is not None:
+            self._fields.update(fields)
+
+    @QtCore.pyqtSlot()
+    def request_update(self):
+        """Schedule a refresh, coalescing it with any pending request."""
+        self.N_requests += 1
+        if self._is_scheduled:
+            return
+
+        self._is_scheduled = True
+        wait_ms = self.frame_interval_ms - 1e3 * (
+            time.perf_counter() - self._t_refresh
+        )
+        QtCore.QTimer.singleShot(max(int(wait_ms), 0), self.refresh)
+
+    @QtCore.pyqtSlot()
+    def refresh(self):
+        """Refresh the widgets right away."""
+        self._is_scheduled = False
+        self._t_refresh = time.perf_counter()
+        self.N_refreshes += 1
+
+        # Determine which of the bound state fields have changed
+        changed = set()
+        for name in self._fields:
+            value = getattr(self.state, name)
+            old = self._snapshot.get(name, self)  # `self` as 'not yet seen'
+            if old is self or not (
+                value == old or (value != value and old != old)  # NaN == NaN
+            ):
+                changed.add(name)
+                self._snapshot[name] = value
+
+        for binding in self._bindings:
+            if binding.fields is not None and not binding.fields & changed:
+                continue
+
+            try:
+                value = binding.formatter()
+            except Exception as err:  # pylint: disable=broad-except
+                pft(err, 3)
+                continue
+
+            if value is None or value == binding.value:
+                continue
+
+            binding.setter(value)
+            binding.value = value
+            self.N_widget_updates += 1
+
+        now = time.perf_counter()
+        if now - self._rate_t0 >= 1:
+            self.widget_updates_per_sec = (
+                self.N_widget_updates - self._rate_N0
+            ) / (now - self._rate_t0)
+            self._rate_t0 = now
+            self._rate_N0 = self.N_widget_updates
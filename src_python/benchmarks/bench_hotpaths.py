@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Benchmarks of the acquisition, logging and charting hot paths of the Ambre
+chamber, using pytest-benchmark on a simulated Arduino and an offscreen Qt
+platform.
+
+Measures the parsing of the reply to the `?` query, ``DAQ_function()`` end to
+end per sample, ``write_data_to_log()`` in rows/s, appending to the history
+plus ``update_chart()`` at several history capacities, and the refresh of the
+widgets behind ``update_GUI()``.
+
+Not collected by a plain ``pytest`` run. Every run gets saved as JSON in
+``.benchmarks/``, to compare successive versions on the same machine: ::
+
+    python -m pytest benchmarks
+    python -m pytest benchmarks --benchmark-compare
+
+Requires ``pytest-benchmark``, see ``requirements-dev.txt``.
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+import pytest
+from PyQt5 import QtWidgets as QtWid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# pylint: disable=wrong-import-position, redefined-outer-name
+import main
+from ambre_core import create_cores, parse_args
+from ambre_power import PowerGovernor
+from ambre_simulator import AmbreFirmwareModel
+from ambre_telemetry import decode_frame
+
+# Rows to write per round of the logging benchmark. Stays well below the
+# maximum queue size of the log writer, so that no rows get dropped.
+N_LOG_ROWS = 1000
+
+# DAQ intervals to benchmark the charts at. The raw history always spans
+# `main.CHART_HISTORY_TIME`, i.e. 3600, 36000 and 360000 samples.
+CHART_INTERVALS_MS = [1000, 100, 10]
+
+# Chart preset showing the full raw history, see `ChamberPanel`
+PRESET_FULL_HISTORY = 4
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtWid.QApplication.instance() or QtWid.QApplication(sys.argv[:1])
+
+
+def create_sim_core(*argv):
+    """Connected and set up core of a simulated Arduino without any reply
+    latency. The DAQ worker does not get started."""
+    args = parse_args(["--sim", "--latency", "0"] + list(argv))
+    core = create_cores(args)[0]
+    if not core.connect():
+        pytest.fail("Could not connect to the simulated Arduino")
+    return core
+
+
+@pytest.fixture
+def core(qapp):
+    # pylint: disable=unused-argument
+    core = create_sim_core()
+    core.setup()
+    core.DAQ_function()  # Fill in the state
+    yield core
+    core.quit()
+
+
+def prefill_history(core):
+    """Fill the history up to its capacity, like after an hour of running."""
+    history = core.history
+    N = history.capacity
+    dt = core.DAQ_interval_ms / 1e3
+    rng = np.random.default_rng(0)
+    history.extend(
+        time=core.clock.monotonic() + dt * np.arange(-N + 1, 1),
+        ds18b20_temp=20 + np.cumsum(rng.normal(0, 0.01, N)),
+        dht22_temp=20.5 + rng.normal(0, 0.1, N),
+        dht22_humi=50 + np.cumsum(rng.normal(0, 0.05, N)),
+        is_valve_open=rng.random(N) < 0.5,
+    )
+
+
+# ------------------------------------------------------------------------------
+#   Acquisition
+# ------------------------------------------------------------------------------
+
+
+def test_parse_binary_reply(benchmark):
+    frame = AmbreFirmwareModel(seed=0).process("?b")
+    readings = benchmark(decode_frame, frame)
+    assert readings is not None
+
+
+def test_parse_ascii_reply(benchmark):
+    reply = AmbreFirmwareModel(seed=0).process("?")
+
+    # As done by `Arduino.query_ascii_values()`
+    readings = benchmark(lambda: list(map(float, reply.split("\t"))))
+    assert len(readings) == 5
+
+
+@pytest.mark.parametrize("telemetry", ["binary", "ascii"])
+def test_DAQ_function(benchmark, qapp, telemetry):
+    # pylint: disable=unused-argument
+    core = create_sim_core(*(["--ascii"] if telemetry == "ascii" else []))
+    core.setup_history(main.CHART_HISTORY_TIME, main.CHART_TIERS)
+    core.setup()
+    try:
+        assert benchmark(core.DAQ_function)
+    finally:
+        core.quit()
+
+
+# ------------------------------------------------------------------------------
+#   Logging
+# ------------------------------------------------------------------------------
+
+
+def test_write_data_to_log(benchmark, core, tmp_path):
+    log = core.log
+    log.record(True)
+    log.update(filepath=str(tmp_path / "bench.txt"), mode="w")
+    state = core.state
+
+    def write_rows():
+        for _ in range(N_LOG_ROWS):
+            core.history.append(
+                state.time,
+                state.ds18b20_temp,
+                state.dht22_temp,
+                state.dht22_humi,
+                state.is_valve_open,
+            )
+            core.write_data_to_log()
+
+        # Include the writer thread catching up
+        while log.writer.queue_depth:
+            time.sleep(1e-4)
+
+    benchmark.pedantic(write_rows, rounds=20, warmup_rounds=1)
+    if benchmark.stats is not None:  # None with `--benchmark-disable`
+        benchmark.extra_info["rows_per_s"] = (
+            N_LOG_ROWS / benchmark.stats["mean"]
+        )
+    assert log.writer.N_dropped == 0
+
+
+# ------------------------------------------------------------------------------
+#   Charting and GUI
+# ------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("interval_ms", CHART_INTERVALS_MS)
+def test_append_and_update_chart(benchmark, qapp, interval_ms):
+    core = create_sim_core("--interval", str(interval_ms))
+    core.setup_history(main.CHART_HISTORY_TIME, main.CHART_TIERS)
+    core.setup()
+    prefill_history(core)
+
+    panel = main.ChamberPanel(core)
+    panel.resize(960, 800)
+    panel.show()
+    panel.plot_manager.perform_preset(PRESET_FULL_HISTORY)
+    qapp.processEvents()
+
+    history = core.history
+    dt = interval_ms / 1e3
+    sample = list(history.view()[-1])
+
+    def append_and_update():
+        sample[0] += dt
+        history.append(*sample)
+        panel.update_chart()
+
+    try:
+        benchmark(append_and_update)
+        benchmark.extra_info["capacity"] = history.capacity
+        assert all(tscurve.N_redraws > 0 for tscurve in panel.tscurves)
+    finally:
+        panel.close()
+        core.quit()
+
+
+def test_update_GUI(benchmark, qapp, core):
+    core.setup_history(main.CHART_HISTORY_TIME, main.CHART_TIERS)
+
+    window = main.MainWindow([core])
+    main.clock = core.clock
+    main.governor = PowerGovernor(window)
+    window.show()
+    qapp.processEvents()
+
+    def new_reading():
+        # In between the refreshes, like when running
+        core.DAQ_function()
+
+    def refresh():
+        # What the coalesced `update_GUI()` requests amount to, excluding the
+        # repaint
+        window.view_model.refresh()
+        for panel in window.panels:
+            panel.view_model.refresh()
+
+    try:
+        benchmark.pedantic(refresh, setup=new_reading, rounds=1000)
+    finally:
+        window.close()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compares the DAQ engines of the Ambre chamber, ``QDeviceIO`` with two
+threads per Arduino versus a single asyncio event loop, on a number of
+simulated Arduinos.
+
+Reports per engine and number of Arduinos: The number of OS threads of the
+process, its CPU usage, the obtained DAQ rate and jitter, and the latency from
+the start of a query up to its reading having been processed.
+
+Usage: ``python benchmarks/compare_engines.py [--devices 1 10 30] ...``
+"""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import psutil
+from PyQt5 import QtCore
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# pylint: disable=wrong-import-position
+from ambre_core import create_cores, parse_args
+
+ENGINES = ("qdeviceio", "asyncio")
+
+
+def run(engine, N_devices, interval_ms, latency_ms, duration):
+    """Acquire from ``N_devices`` simulated Arduinos for ``duration`` seconds.
+    Returns a dict of results."""
+    args = parse_args(
+        [
+            "--sim",
+            "--engine", engine,
+            "--interval", str(interval_ms),
+            "--latency", str(latency_ms),
+            "--devices",
+        ]
+        + ["Bench %i" % idx for idx in range(N_devices)]
+    )  # fmt: skip
+
+    cores = create_cores(args)
+    latencies = []
+
+    for core in cores:
+        if not core.connect():
+            sys.exit("Could not connect to `%s`" % core.device_id)
+        core.setup()
+
+        # Time from the start of the query up to the processed reading
+        def process_reading(t_wall, *args_, _process=core.process_reading):
+            success = _process(t_wall, *args_)
+            latencies.append(time.time() - t_wall)
+            return success
+
+        core.process_reading = process_reading
+
+    proc = psutil.Process()
+    N_threads_before = proc.num_threads()
+    for core in cores:
+        core.start()
+
+    # Skip the start-up transients
+    app = QtCore.QCoreApplication.instance()
+    QtCore.QTimer.singleShot(1000, app.quit)
+    app.exec_()
+
+    latencies.clear()
+    N_updates_start = [core.qdev.update_counter_DAQ for core in cores]
+    cpu_start = proc.cpu_times()
+    t_start = time.perf_counter()
+
+    QtCore.QTimer.singleShot(int(duration * 1e3), app.quit)
+    app.exec_()
+
+    t_elapsed = time.perf_counter() - t_start
+    cpu_stop = proc.cpu_times()
+    N_threads = proc.num_threads()
+    N_updates = sum(
+        core.qdev.update_counter_DAQ - N
+        for core, N in zip(cores, N_updates_start)
+    )
+    latency = np.asarray(latencies) * 1e3
+
+    for core in cores:
+        core.stop()
+        core.quit()
+
+    return {
+        "engine": engine,
+        "N_devices": N_devices,
+        "N_threads_DAQ": N_threads - N_threads_before,
+        "N_threads": N_threads,
+        "CPU_percent": (
+            (
+                cpu_stop.user
+                + cpu_stop.system
+                - cpu_start.user
+                - cpu_start.system
+            )
+            / t_elapsed
+            * 100
+        ),
+        "DAQ_rate_Hz": N_updates / t_elapsed / N_devices,
+        "jitter_ms": float(
+            np.nanmean([core.DAQ_jitter_ms() for core in cores])
+        ),
+        "latency_p50_ms": float(np.percentile(latency, 50)),
+        "latency_p99_ms": float(np.percentile(latency, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--devices",
+        type=int,
+        nargs="+",
+        default=[1, 10, 30],
+        metavar="N",
+        help="numbers of simulated Arduinos to compare at (default: 1 10 30)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=100,
+        metavar="MS",
+        help="DAQ interval [ms] (default: 100)",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=5,
+        metavar="MS",
+        help="reply latency of the simulated Arduinos [ms] (default: 5)",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=10,
+        metavar="S",
+        help="duration of each run [s] (default: 10)",
+    )
+    parser.add_argument(
+        "--json", metavar="FILE", help="also save the results to FILE"
+    )
+    args = parser.parse_args()
+
+    app = QtCore.QCoreApplication(sys.argv)  # pylint: disable=unused-variable
+    results = []
+    for N_devices in args.devices:
+        for engine in ENGINES:
+            print("\n--- %s, %i Arduino(s)\n" % (engine, N_devices))
+            results.append(
+                run(
+                    engine,
+                    N_devices,
+                    args.interval,
+                    args.latency,
+                    args.duration,
+                )
+            )
+
+    print(
+        "\n%-10s %7s %9s %7s %9s %9s %9s %9s"
+        % (
+            "engine",
+            "devices",
+            "threads",
+            "CPU %",
+            "rate Hz",
+            "jitter",
+            "p50 ms",
+            "p99 ms",
+        )
+    )
+    for r in results:
+        print(
+            "%-10s %7i %4i (+%2i) %7.1f %9.2f %9.2f %9.2f %9.2f"
+            % (
+                r["engine"],
+                r["N_devices"],
+                r["N_threads"],
+                r["N_threads_DAQ"],
+                r["CPU_percent"],
+                r["DAQ_rate_Hz"],
+                r["jitter_ms"],
+                r["latency_p50_ms"],
+                r["latency_p99_ms"],
+            )
+        )
+
+    if args.json is not None:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "interval_ms": args.interval,
+                    "latency_ms": args.latency,
+                    "duration": args.duration,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -12,45 +12,65 @@ __version__ = "2.0"
 import os
 import sys
 import time
+import signal
+
+from ambre_startup import StartupProfiler
+
+startup = StartupProfiler()
+
+# pylint: disable=wrong-import-position
+from ambre_core import create_cores, parse_args, raise_process_priority
+
+startup.mark("core imports")
+
+# Show debug info in terminal? Warning: Slow! Do not leave on unintentionally.
+DEBUG = False
+
+# Dispatch to the headless mode before any of the GUI stack gets imported
+if __name__ == "__main__":
+    args = parse_args()
+    if args.headless:
+        from ambre_headless import run_headless
+
+        sys.exit(run_headless(args, startup))
+
+    print("PID: %s\n" % os.getpid())
+    raise_process_priority()
+
+    # Connect to the Arduinos in the background, while the GUI stack gets
+    # imported and the main window gets built
+    cores = create_cores(args, debug=DEBUG)
+    for core in cores:
+        core.prepare()
+        core.start_connecting()
+    startup.mark("prepare")
 
 import numpy as np
-import psutil
 
 from PyQt5 import QtCore, QtGui
 from PyQt5 import QtWidgets as QtWid
-from PyQt5.QtCore import QDateTime
 import pyqtgraph as pg
 
-from dvg_debug_functions import tprint, dprint, print_fancy_traceback as pft
+from dvg_debug_functions import tprint
 from dvg_pyqt_controls import (
     create_LED_indicator,
     create_Toggle_button,
     SS_TEXTBOX_READ_ONLY,
     SS_GROUP,
 )
-from dvg_pyqt_filelogger import FileLogger
-from dvg_pyqtgraph_threadsafe import (
-    HistoryChartCurve,
-    LegendSelect,
-    PlotManager,
-)
+from dvg_pyqtgraph_threadsafe import LegendSelect, PlotManager
 
-from dvg_devices.Arduino_protocol_serial import Arduino
-from dvg_qdeviceio import QDeviceIO
+from ambre_charts import HistoryBufferCurve
+from ambre_metrics import MetricsServer
+from ambre_power import PowerGovernor, ACTIVE, BACKGROUND, HIDDEN
+from ambre_profiler import PROFILE_FILE, dump, request_dump
+from ambre_timing import TIMING_FIELDS
+from ambre_viewmodel import ViewModel
 
+startup.mark("GUI imports")
 
+# Probed once the charts are first shown
 TRY_USING_OPENGL = True
-if TRY_USING_OPENGL:
-    try:
-        import OpenGL.GL as gl  # pylint: disable=unused-import
-    except:
-        print("OpenGL acceleration: Disabled")
-        print("To install: `conda install pyopengl` or `pip install pyopengl`")
-    else:
-        print("OpenGL acceleration: Enabled")
-        pg.setConfigOptions(useOpenGL=True)
-        pg.setConfigOptions(antialias=True)
-        pg.setConfigOptions(enableExperimental=True)
 
 # Global pyqtgraph configuration
 # pg.setConfigOptions(leftButtonPan=False)
@@ -58,113 +78,68 @@ pg.setConfigOption("foreground", "#EEE")
 
 # Constants
 # fmt: off
-DAQ_INTERVAL_MS    = 1000  # [ms]
 CHART_INTERVAL_MS  = 500   # [ms]
+GUI_INTERVAL_MS    = 100   # [ms]
 CHART_HISTORY_TIME = 3600  # [s]
-# fmt: on
-
-# Show debug info in terminal? Warning: Slow! Do not leave on unintentionally.
-DEBUG = False
 
+# Slower refresh when the window is in the background. When minimized or not
+# exposed, the refresh is suspended altogether.
+CHART_INTERVAL_BACKGROUND_MS = 2000  # [ms]
+GUI_INTERVAL_BACKGROUND_MS   = 1000  # [ms]
+# fmt: on
 
-def get_current_date_time():
-    cur_date_time = QDateTime.currentDateTime()
-    return (
-        cur_date_time.toString("dd-MM-yyyy"),  # Date
-        cur_date_time.toString("HH:mm:ss"),  # Time
-        cur_date_time.toString("yyMMdd_HHmmss"),  # Reverse notation date-time
-    )
+# Tiers of min/mean/max aggregates backing the charts beyond the raw history
+# fmt: off
+CHART_TIERS = [
+    # (period [s], retention [s])
+    (10, 86400),       # 10 s buckets for the last day
+    (60, 30 * 86400),  # 1 min buckets for the last month
+]
+# fmt: on
 
 
 # ------------------------------------------------------------------------------
-#   Arduino state
+#   ChamberPanel
 # ------------------------------------------------------------------------------
 
 
-class State(object):
-    """Reflects the actual readings, parsed into separate variables, of the
-    Arduino. There should only be one instance of the State class.
-    """
-
-    def __init__(self):
-        self.time = np.nan  # [s]
-        self.ds18b20_temp = np.nan  # ['C]
-        self.dht22_temp = np.nan  # ['C]
-        self.dht22_humi = np.nan  # [%]
-        self.is_valve_open = False
-
-        # Automatic valve control
-        self.humi_threshold = np.nan  # [%]
-        self.open_valve_when_super_humi = np.nan
-
-
-state = State()
-
-# ------------------------------------------------------------------------------
-#   MainWindow
-# ------------------------------------------------------------------------------
+class ChamberPanel(QtWid.QWidget):
+    """Charts, readings and controls of a single Ambre chamber.
 
+    Args:
+        core (AmbreCore):
+            Core of the chamber, with its history set up.
+    """
 
-class MainWindow(QtWid.QWidget):
-    def __init__(self, parent=None, **kwargs):
+    def __init__(self, core, parent=None, **kwargs):
         super().__init__(parent, **kwargs)
-
-        self.setWindowTitle("Ambre chamber")
-        self.setGeometry(350, 50, 960, 800)
-        self.setStyleSheet(SS_TEXTBOX_READ_ONLY + SS_GROUP)
+        self.core = core
 
         # -------------------------
         #   Top frame
         # -------------------------
 
-        # Left box
-        self.qlbl_update_counter = QtWid.QLabel("0")
-        self.qlbl_DAQ_rate = QtWid.QLabel("DAQ: nan Hz")
-        self.qlbl_DAQ_rate.setStyleSheet("QLabel {min-width: 7em}")
-
-        vbox_left = QtWid.QVBoxLayout()
-        vbox_left.addWidget(self.qlbl_update_counter, stretch=0)
-        vbox_left.addStretch(1)
-        vbox_left.addWidget(self.qlbl_DAQ_rate, stretch=0)
-
-        # Middle box
         self.qlbl_title = QtWid.QLabel(
-            "Ambre chamber",
-            font=QtGui.QFont("Palatino", 14, weight=QtGui.QFont.Bold),
+            core.device_id,
+            font=QtGui.QFont("Palatino", 12, weight=QtGui.QFont.Bold),
         )
-        self.qlbl_title.setAlignment(QtCore.Qt.AlignCenter)
-        self.qlbl_cur_date_time = QtWid.QLabel("00-00-0000    00:00:00")
-        self.qlbl_cur_date_time.setAlignment(QtCore.Qt.AlignCenter)
         self.qpbt_record = create_Toggle_button(
             "Click to start recording to file", minimumWidth=300
         )
         # fmt: off
-        self.qpbt_record.clicked.connect(lambda state: log.record(state)) # pylint: disable=unnecessary-lambda
+        self.qpbt_record.clicked.connect(lambda state: self.core.log.record(state)) # pylint: disable=unnecessary-lambda
         # fmt: on
-
-        vbox_middle = QtWid.QVBoxLayout()
-        vbox_middle.addWidget(self.qlbl_title)
-        vbox_middle.addWidget(self.qlbl_cur_date_time)
-        vbox_middle.addWidget(self.qpbt_record)
-
-        # Right box
-        self.qpbt_exit = QtWid.QPushButton("Exit")
-        self.qpbt_exit.clicked.connect(self.close)
-        self.qpbt_exit.setMinimumHeight(30)
         self.qlbl_recording_time = QtWid.QLabel(alignment=QtCore.Qt.AlignRight)
+        self.qlbl_connection = QtWid.QLabel()
 
-        vbox_right = QtWid.QVBoxLayout()
-        vbox_right.addWidget(self.qpbt_exit, stretch=0)
-        vbox_right.addStretch(1)
-        vbox_right.addWidget(self.qlbl_recording_time, stretch=0)
-
-        # Round up top frame
         hbox_top = QtWid.QHBoxLayout()
-        hbox_top.addLayout(vbox_left, stretch=0)
+        hbox_top.addWidget(self.qlbl_title, stretch=0)
+        hbox_top.addSpacing(20)
+        hbox_top.addWidget(self.qlbl_connection, stretch=0)
         hbox_top.addStretch(1)
-        hbox_top.addLayout(vbox_middle, stretch=0)
+        hbox_top.addWidget(self.qpbt_record, stretch=0)
         hbox_top.addStretch(1)
-        hbox_top.addLayout(vbox_right, stretch=0)
+        hbox_top.addWidget(self.qlbl_recording_time, stretch=0)
 
         # -------------------------
         #   Bottom frame
@@ -204,24 +179,26 @@ class MainWindow(QtWid.QWidget):
             plot.setRange(xRange=[-CHART_HISTORY_TIME, 0])
 
         # Curves
-        capacity = round(CHART_HISTORY_TIME * 1e3 / DAQ_INTERVAL_MS)
         PEN_01 = pg.mkPen(color=[255, 255, 0], width=3)
         PEN_02 = pg.mkPen(color=[0, 255, 255], width=3)
 
-        self.tscurve_ds18b20_temp = HistoryChartCurve(
-            capacity=capacity,
+        self.tscurve_ds18b20_temp = HistoryBufferCurve(
+            history=core.history,
+            field="ds18b20_temp",
             linked_curve=self.pi_ds18b20_temp.plot(
                 pen=PEN_01, name="DS18B20 temp."
             ),
         )
-        self.tscurve_dht22_temp = HistoryChartCurve(
-            capacity=capacity,
+        self.tscurve_dht22_temp = HistoryBufferCurve(
+            history=core.history,
+            field="dht22_temp",
             linked_curve=self.pi_dht22_temp.plot(
                 pen=PEN_01, name="DHT22 temp."
             ),
         )
-        self.tscurve_dht22_humi = HistoryChartCurve(
-            capacity=capacity,
+        self.tscurve_dht22_humi = HistoryBufferCurve(
+            history=core.history,
+            field="dht22_humi",
             linked_curve=self.pi_dht22_humi.plot(
                 pen=PEN_02, name="DHT22 humi."
             ),
@@ -310,6 +287,18 @@ class MainWindow(QtWid.QWidget):
                     "x_axis_divisor": 60,
                     "x_axis_range": (-60, 0),
                 },
+                {
+                    "button_label": "24 h",
+                    "x_axis_label": "history (h)",
+                    "x_axis_divisor": 3600,
+                    "x_axis_range": (-24, 0),
+                },
+                {
+                    "button_label": "7 d",
+                    "x_axis_label": "history (day)",
+                    "x_axis_divisor": 86400,
+                    "x_axis_range": (-7, 0),
+                },
             ],
         )
         self.plot_manager.add_clear_button(linked_curves=self.tscurves)
@@ -321,9 +310,9 @@ class MainWindow(QtWid.QWidget):
         #  Group 'Valve control'
         # -------------------------
 
+        # Filled in by `show_valve_control()` once connected to the Arduino
         self.LED_is_valve_open = create_LED_indicator()
         self.qlin_humi_threshold = QtWid.QLineEdit(
-            "%d" % state.humi_threshold,
             alignment=QtCore.Qt.AlignRight,
             maximumWidth=36,
         )
@@ -331,13 +320,8 @@ class MainWindow(QtWid.QWidget):
             self.process_qlin_humi_threshold
         )
         self.qpbt_open_when_super_humi = QtWid.QPushButton(
-            (
-                "humidity > threshold"
-                if state.open_valve_when_super_humi
-                else "humidity < threshold"
-            ),
+            "humidity < threshold",
             checkable=True,
-            checked=state.open_valve_when_super_humi,
         )
         self.qpbt_open_when_super_humi.clicked.connect(
             self.process_qpbt_open_when_super_humi
@@ -358,11 +342,60 @@ class MainWindow(QtWid.QWidget):
         qgrp_valve = QtWid.QGroupBox("Valve control")
         qgrp_valve.setLayout(grid)
 
+        #  Group 'DAQ timing'
+        # -------------------------
+
+        # Percentiles over the most recent DAQ ticks
+        grid = QtWid.QGridLayout()
+        grid.setHorizontalSpacing(12)
+        for col, text in enumerate(("p50", "p99", "max")):
+            grid.addWidget(
+                QtWid.QLabel(text, alignment=QtCore.Qt.AlignRight), 0, col + 1
+            )
+        self.qlbls_timing = {}
+        for row, (name, description) in enumerate(TIMING_FIELDS.items()):
+            grid.addWidget(QtWid.QLabel(description), row + 1, 0)
+            self.qlbls_timing[name] = [
+                QtWid.QLabel(alignment=QtCore.Qt.AlignRight) for _ in range(3)
+            ]
+            for col, qlbl in enumerate(self.qlbls_timing[name]):
+                grid.addWidget(qlbl, row + 1, col + 1)
+
+        # Histogram of one of the timed quantities
+        self.qcbx_timing = QtWid.QComboBox()
+        self.qcbx_timing.addItems(TIMING_FIELDS.values())
+        self.qcbx_timing.currentIndexChanged.connect(self.update_timing)
+        self.qlbl_timing_ticks = QtWid.QLabel(alignment=QtCore.Qt.AlignRight)
+
+        self.pw_timing = pg.PlotWidget()
+        self.pw_timing.setFixedHeight(120)
+        self.pw_timing.setMouseEnabled(x=False, y=False)
+        self.pw_timing.hideButtons()
+        self.pw_timing.hideAxis("left")
+        self.pw_timing.setLabel("bottom", text="ms")
+        # Bin edges as x, one more than the counts as y. Note: pyqtgraph 0.11
+        # takes `stepMode=True`, later versions `stepMode="center"`.
+        self.curve_timing = self.pw_timing.plot(
+            stepMode=True,
+            fillLevel=0,
+            pen=PEN_02,
+            brush=(0, 255, 255, 80),
+        )
+
+        row = len(TIMING_FIELDS) + 1
+        grid.addWidget(self.qcbx_timing, row, 0)
+        grid.addWidget(self.qlbl_timing_ticks, row, 1, 1, 3)
+        grid.addWidget(self.pw_timing, row + 1, 0, 1, 4)
+
+        qgrp_timing = QtWid.QGroupBox("DAQ timing (ms)")
+        qgrp_timing.setLayout(grid)
+
         # Round up right frame
         vbox = QtWid.QVBoxLayout()
         vbox.addWidget(qgrp_readings)
         vbox.addWidget(qgrp_comments)
         vbox.addWidget(qgrp_valve)  # , alignment=QtCore.Qt.AlignLeft)
+        vbox.addWidget(qgrp_timing)
         vbox.addWidget(qgrp_chart, alignment=QtCore.Qt.AlignLeft)
         vbox.addStretch()
 
@@ -372,20 +405,142 @@ class MainWindow(QtWid.QWidget):
         hbox_bot.addLayout(vbox, 0)
 
         # -------------------------
-        #   Round up full window
+        #   Round up panel
         # -------------------------
 
         vbox = QtWid.QVBoxLayout(self)
+        vbox.setContentsMargins(0, 0, 0, 0)
         vbox.addLayout(hbox_top, stretch=0)
         vbox.addSpacerItem(QtWid.QSpacerItem(0, 10))
         vbox.addLayout(hbox_bot, stretch=1)
 
+        # -------------------------
+        #   View model
+        # -------------------------
+
+        self.view_model = ViewModel(core.state)
+        self._bind_widgets()
+
+    def connect_log_signals(self):
+        """Reflect the recording on the record button. Call once the core is
+        set up."""
+        self.core.log.signal_recording_started.connect(
+            lambda filepath: self.qpbt_record.setText(
+                "Recording to file: %s" % filepath
+            )
+        )
+        self.core.log.signal_recording_stopped.connect(
+            lambda: self.qpbt_record.setText("Click to start recording to file")
+        )
+
+    def show_valve_control(self):
+        """Show the valve control settings as read from the Arduino."""
+        state = self.core.state
+        if not np.isnan(state.humi_threshold):
+            self.qlin_humi_threshold.setText("%.0f" % state.humi_threshold)
+
+        is_super_humi = state.open_valve_when_super_humi is True
+        self.qpbt_open_when_super_humi.setChecked(is_super_humi)
+        self.qpbt_open_when_super_humi.setText(
+            "humidity > threshold" if is_super_humi else "humidity < threshold"
+        )
+
+    def use_OpenGL(self):
+        """Switch over the already existing charts to OpenGL."""
+        self.gw.useOpenGL(True)
+        for tscurve in self.tscurves:
+            tscurve.curve.opts["antialias"] = True
+            tscurve.curve.updateItems()
+
+    def _bind_widgets(self):
+        vm = self.view_model
+        state = self.core.state
+
+        vm.bind(self.qlbl_recording_time.setText, self._format_recording_time)
+        vm.bind(self._set_connection_status, self._format_connection_status)
+        vm.bind(
+            self.qlin_ds18b20_temp.setText,
+            lambda: "%.1f" % state.ds18b20_temp,
+            fields=["ds18b20_temp"],
+        )
+        vm.bind(
+            self.qlin_dht22_temp.setText,
+            lambda: "%.1f" % state.dht22_temp,
+            fields=["dht22_temp"],
+        )
+        vm.bind(
+            self.qlin_dht22_humi.setText,
+            lambda: "%.1f" % state.dht22_humi,
+            fields=["dht22_humi"],
+        )
+        vm.bind(
+            self.qlbl_title.setText,
+            lambda: "Interior:  %.1f °C,  %.1f %%"
+            % (state.dht22_temp, state.dht22_humi),
+            fields=["dht22_temp", "dht22_humi"],
+        )
+        vm.bind(
+            self._set_LED_is_valve_open,
+            lambda: bool(state.is_valve_open),
+            fields=["is_valve_open"],
+        )
+
+    def _format_recording_time(self):
+        log = self.core.log
+        if log is None or not log.is_recording():
+            return None  # Keep showing the last recording time
+
+        if log.writer.N_dropped:
+            return "%s  (dropped %i)" % (
+                log.pretty_elapsed(),
+                log.writer.N_dropped,
+            )
+        return log.pretty_elapsed()
+
+    def _format_connection_status(self):
+        reconnector = self.core.reconnector
+        if reconnector is None:
+            return "", False
+
+        if reconnector.is_in_outage():
+            return (
+                "Lost connection for %.0f s, reconnect attempt %i"
+                % (
+                    reconnector.outage_duration(),
+                    reconnector.N_attempts_outage(),
+                ),
+                True,
+            )
+        if reconnector.N_outages:
+            return (
+                "Outages: %i, last %.1f s, recovered in %.1f s"
+                % (
+                    reconnector.N_outages,
+                    reconnector.last_outage_duration,
+                    reconnector.last_time_to_recover,
+                ),
+                False,
+            )
+        return "", False
+
+    def _set_connection_status(self, status: tuple):
+        text, is_in_outage = status
+        self.qlbl_connection.setText(text)
+        self.qlbl_connection.setStyleSheet(
+            "QLabel {color: red; font-weight: bold}" if is_in_outage else ""
+        )
+
+    def _set_LED_is_valve_open(self, is_open: bool):
+        self.LED_is_valve_open.setText("1" if is_open else "0")
+        self.LED_is_valve_open.setChecked(is_open)
+
     # --------------------------------------------------------------------------
     #   Handle controls
     # --------------------------------------------------------------------------
 
     @QtCore.pyqtSlot()
     def process_qlin_humi_threshold(self):
+        state = self.core.state
         try:
             humi_threshold = float(self.qlin_humi_threshold.text())
         except (TypeError, ValueError):
@@ -395,55 +550,353 @@ class MainWindow(QtWid.QWidget):
 
         state.humi_threshold = np.clip(humi_threshold, 0, 100)
         self.qlin_humi_threshold.setText("%.0f" % state.humi_threshold)
-        qdev_ard.send(ard.write, "th%.0f" % state.humi_threshold)
+        self.core.qdev.send(
+            self.core.ard.write, "th%.0f" % state.humi_threshold
+        )
 
     @QtCore.pyqtSlot()
     def process_qpbt_open_when_super_humi(self):
+        state = self.core.state
         if self.qpbt_open_when_super_humi.isChecked():
             state.open_valve_when_super_humi = True
             self.qpbt_open_when_super_humi.setText("humidity > threshold")
-            qdev_ard.send(ard.write, "open when super humi")
+            self.core.qdev.send(self.core.ard.write, "open when super humi")
 
         else:
             state.open_valve_when_super_humi = False
             self.qpbt_open_when_super_humi.setText("humidity < threshold")
-            qdev_ard.send(ard.write, "open when sub humi")
+            self.core.qdev.send(self.core.ard.write, "open when sub humi")
 
     @QtCore.pyqtSlot()
     def update_GUI(self):
-        str_cur_date, str_cur_time, _ = get_current_date_time()
-        self.qlbl_cur_date_time.setText(
-            "%s    %s" % (str_cur_date, str_cur_time)
+        # Coalesced with other requests into a single refresh per frame
+        self.view_model.request_update()
+
+    @QtCore.pyqtSlot()
+    def update_chart(self):
+        for tscurve in self.tscurves:
+            tscurve.update()
+        self.update_timing()
+
+    @QtCore.pyqtSlot()
+    def update_timing(self):
+        timing = self.core.timing
+        if timing is None:
+            return  # Not set up yet
+
+        for name, stats in timing.percentiles().items():
+            for qlbl, value in zip(self.qlbls_timing[name], stats):
+                qlbl.setText("-" if np.isnan(value) else "%.2f" % value)
+        self.qlbl_timing_ticks.setText(
+            "%i ticks, %i skipped"
+            % (min(timing.N_ticks, timing.capacity), timing.N_skipped)
+        )
+
+        hist = timing.histogram(
+            list(TIMING_FIELDS)[self.qcbx_timing.currentIndex()]
         )
-        self.qlbl_update_counter.setText("%i" % qdev_ard.update_counter_DAQ)
-        self.qlbl_DAQ_rate.setText(
-            "DAQ: %.1f Hz" % qdev_ard.obtained_DAQ_rate_Hz
+        if hist is None:
+            self.curve_timing.clear()
+        else:
+            counts, bin_edges = hist
+            self.curve_timing.setData(bin_edges, counts)
+
+    @QtCore.pyqtSlot()
+    def notify_connection_lost(self):
+        self.core.stop()
+
+        self.qlbl_title.setText("! ! !    LOST CONNECTION    ! ! !")
+        str_msg = "%s %s\nLost connection to Arduino `%s`." % (
+            self.core.clock.date_str(),
+            self.core.clock.time_str(),
+            self.core.device_id,
+        )
+        print("\nCRITICAL ERROR @ %s" % str_msg)
+
+        # Keep acquiring from the other chambers, if any
+        if not any(core.is_running() for core in cores):
+            stop_running()
+
+        reply_ = QtWid.QMessageBox.warning(
+            self, "CRITICAL ERROR", str_msg, QtWid.QMessageBox.Ok
+        )
+
+        if reply_ == QtWid.QMessageBox.Ok:
+            pass  # Leave the GUI open for read-only inspection by the user
+
+
+# ------------------------------------------------------------------------------
+#   MainWindow
+# ------------------------------------------------------------------------------
+
+
+class MainWindow(QtWid.QWidget):
+    """Main window holding a ``ChamberPanel`` for each of the cores. Several
+    chambers get a tab each.
+
+    Args:
+        cores (list of AmbreCore):
+            Cores of the chambers, with their history set up.
+    """
+
+    def __init__(self, cores, parent=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.cores = cores
+
+        self.setWindowTitle("Ambre chamber")
+        self.setGeometry(350, 50, 960, 800)
+        self.setStyleSheet(SS_TEXTBOX_READ_ONLY + SS_GROUP)
+
+        # -------------------------
+        #   Top frame
+        # -------------------------
+
+        # Left box: Per chamber the update counter, DAQ rate and DAQ jitter
+        grid_DAQ = QtWid.QGridLayout()
+        grid_DAQ.setHorizontalSpacing(12)
+        self.qlbls_update_counter = []
+        self.qlbls_DAQ_rate = []
+        self.qlbls_DAQ_jitter = []
+        for row, core in enumerate(cores):
+            qlbl_update_counter = QtWid.QLabel("0")
+            qlbl_DAQ_rate = QtWid.QLabel("DAQ: nan Hz")
+            qlbl_DAQ_rate.setStyleSheet("QLabel {min-width: 7em}")
+            qlbl_DAQ_jitter = QtWid.QLabel("± nan ms")
+            qlbl_DAQ_jitter.setToolTip(
+                "Jitter: Standard deviation of the DAQ interval"
+            )
+
+            if len(cores) > 1:
+                grid_DAQ.addWidget(QtWid.QLabel(core.device_id), row, 0)
+            grid_DAQ.addWidget(qlbl_update_counter, row, 1)
+            grid_DAQ.addWidget(qlbl_DAQ_rate, row, 2)
+            grid_DAQ.addWidget(qlbl_DAQ_jitter, row, 3)
+
+            self.qlbls_update_counter.append(qlbl_update_counter)
+            self.qlbls_DAQ_rate.append(qlbl_DAQ_rate)
+            self.qlbls_DAQ_jitter.append(qlbl_DAQ_jitter)
+
+        self.qlbl_GUI_rate = QtWid.QLabel("GUI: nan upd/s")
+        self.qlbl_GUI_rate.setToolTip("Widget updates per second")
+        self.qlbl_CPU = QtWid.QLabel("CPU: nan %")
+        self.qlbl_CPU.setToolTip(
+            "CPU usage of this process when the window is active / in the "
+            "background / minimized"
         )
-        if log.is_recording():
-            self.qlbl_recording_time.setText(log.pretty_elapsed())
 
-        self.qlin_ds18b20_temp.setText("%.1f" % state.ds18b20_temp)
-        self.qlin_dht22_temp.setText("%.1f" % state.dht22_temp)
-        self.qlin_dht22_humi.setText("%.1f" % state.dht22_humi)
-        self.qlbl_title.setText(
-            "Interior:  %.1f °C,  %.1f %%"
-            % (state.dht22_temp, state.dht22_humi)
+        vbox_left = QtWid.QVBoxLayout()
+        vbox_left.addLayout(grid_DAQ, stretch=0)
+        vbox_left.addStretch(1)
+        vbox_left.addWidget(self.qlbl_GUI_rate, stretch=0)
+        vbox_left.addWidget(self.qlbl_CPU, stretch=0)
+
+        # Middle box
+        self.qlbl_title = QtWid.QLabel(
+            "Ambre chamber",
+            font=QtGui.QFont("Palatino", 14, weight=QtGui.QFont.Bold),
         )
+        self.qlbl_title.setAlignment(QtCore.Qt.AlignCenter)
+        self.qlbl_cur_date_time = QtWid.QLabel("00-00-0000    00:00:00")
+        self.qlbl_cur_date_time.setAlignment(QtCore.Qt.AlignCenter)
+
+        vbox_middle = QtWid.QVBoxLayout()
+        vbox_middle.addWidget(self.qlbl_title)
+        vbox_middle.addWidget(self.qlbl_cur_date_time)
+        vbox_middle.addStretch(1)
+
+        # Right box
+        self.qpbt_exit = QtWid.QPushButton("Exit")
+        self.qpbt_exit.clicked.connect(self.close)
+        self.qpbt_exit.setMinimumHeight(30)
+
+        vbox_right = QtWid.QVBoxLayout()
+        vbox_right.addWidget(self.qpbt_exit, stretch=0)
+        vbox_right.addStretch(1)
+
+        # Round up top frame
+        hbox_top = QtWid.QHBoxLayout()
+        hbox_top.addLayout(vbox_left, stretch=0)
+        hbox_top.addStretch(1)
+        hbox_top.addLayout(vbox_middle, stretch=0)
+        hbox_top.addStretch(1)
+        hbox_top.addLayout(vbox_right, stretch=0)
 
-        if state.is_valve_open:
-            self.LED_is_valve_open.setText("1")
-            self.LED_is_valve_open.setChecked(True)
+        # -------------------------
+        #   Bottom frame
+        # -------------------------
+
+        self.panels = [ChamberPanel(core) for core in cores]
+
+        if len(self.panels) == 1:
+            w_bot = self.panels[0]
         else:
-            self.LED_is_valve_open.setText("0")
-            self.LED_is_valve_open.setChecked(False)
+            w_bot = QtWid.QTabWidget()
+            for panel in self.panels:
+                w_bot.addTab(panel, panel.core.device_id)
+
+            # Charts of hidden tabs don't get refreshed, so catch up at once
+            w_bot.currentChanged.connect(self.update_GUI)
+            w_bot.currentChanged.connect(self.update_chart)
+
+        # -------------------------
+        #   Round up full window
+        # -------------------------
+
+        vbox = QtWid.QVBoxLayout(self)
+        vbox.addLayout(hbox_top, stretch=0)
+        vbox.addSpacerItem(QtWid.QSpacerItem(0, 10))
+        vbox.addWidget(w_bot, stretch=1)
+
+        # -------------------------
+        #   View model
+        # -------------------------
+
+        # Not depending on the state of any single chamber
+        self.view_model = ViewModel(None)
+        self._bind_widgets()
+
+        self._is_OpenGL_probed = False
+
+    def showEvent(self, event):  # pylint: disable=invalid-name
+        super().showEvent(event)
+        if not self._is_OpenGL_probed:
+            # Importing OpenGL is slow, so wait till the charts are on screen
+            self._is_OpenGL_probed = True
+            QtCore.QTimer.singleShot(0, self.probe_OpenGL)
+
+    @QtCore.pyqtSlot()
+    def probe_OpenGL(self):
+        if not TRY_USING_OPENGL:
+            return
+
+        t_start = time.perf_counter()
+        try:
+            # pylint: disable=unused-import, import-outside-toplevel
+            import OpenGL.GL as gl
+        except:
+            print("OpenGL acceleration: Disabled")
+            print(
+                "To install: `conda install pyopengl` or `pip install pyopengl`"
+            )
+        else:
+            print("OpenGL acceleration: Enabled")
+            pg.setConfigOptions(useOpenGL=True)
+            pg.setConfigOptions(antialias=True)
+            pg.setConfigOptions(enableExperimental=True)
+
+            for panel in self.panels:
+                panel.use_OpenGL()
+
+        startup.add_span("OpenGL probe", t_start, time.perf_counter())
+
+    def _bind_widgets(self):
+        vm = self.view_model
+
+        vm.bind(
+            self.qlbl_cur_date_time.setText,
+            lambda: "%s    %s" % (clock.date_str(), clock.time_str()),
+        )
+        for idx, core in enumerate(self.cores):
+            # Mind the late binding of `core` inside the lambdas
+            vm.bind(
+                self.qlbls_update_counter[idx].setText,
+                lambda core=core: "%i" % core.qdev.update_counter_DAQ,
+            )
+            vm.bind(
+                self.qlbls_DAQ_rate[idx].setText,
+                lambda core=core: "DAQ: %.1f Hz"
+                % core.qdev.obtained_DAQ_rate_Hz,
+            )
+            vm.bind(
+                self.qlbls_DAQ_jitter[idx].setText,
+                lambda core=core: "± %.1f ms" % core.DAQ_jitter_ms(),
+            )
+        vm.bind(
+            self.qlbl_GUI_rate.setText,
+            lambda: "GUI: %.0f upd/s"
+            % np.nansum(
+                [vm.widget_updates_per_sec]
+                + [
+                    panel.view_model.widget_updates_per_sec
+                    for panel in self.panels
+                ]
+            ),
+        )
+        vm.bind(
+            self.qlbl_CPU.setText,
+            lambda: "CPU: %s %%"
+            % " / ".join(
+                "-" if x is None else "%.1f" % x
+                for x in (
+                    governor.cpu_percent[ACTIVE],
+                    governor.cpu_percent[BACKGROUND],
+                    governor.cpu_percent[HIDDEN],
+                )
+            ),
+        )
+
+    @QtCore.pyqtSlot()
+    def update_GUI(self):
+        # Coalesced with other requests into a single refresh per frame
+        self.view_model.request_update()
+        for panel in self.panels:
+            if panel.isVisible():
+                panel.update_GUI()
 
     @QtCore.pyqtSlot()
     def update_chart(self):
         if DEBUG:
             tprint("update_chart")
 
-        for tscurve in self.tscurves:
-            tscurve.update()
+        # Only the chamber on screen
+        panels = [panel for panel in self.panels if panel.isVisible()]
+        for panel in panels:
+            panel.update_chart()
+
+        if DEBUG:
+            tscurves = [x for panel in panels for x in panel.tscurves]
+            tprint(
+                "update_chart: %i redraws, %i skipped"
+                % (
+                    sum(x.N_redraws for x in tscurves),
+                    sum(x.N_skipped for x in tscurves),
+                )
+            )
+
+
+# ------------------------------------------------------------------------------
+#   Startup profiling
+# ------------------------------------------------------------------------------
+
+
+@QtCore.pyqtSlot()
+def notify_first_sample():
+    if startup.time_to_first_sample is not None:
+        return  # Already noted, via a signal queued before disconnecting
+    if all(np.isnan(core.state.time) for core in cores):
+        return  # No reading yet
+
+    for core in cores:
+        core.qdev.signal_DAQ_updated.disconnect(notify_first_sample)
+    startup.first_sample()
+    print("\n%s\n" % startup.report())
+    if args.startup_log is not None:
+        startup.save(args.startup_log, mode="GUI", N_devices=len(cores))
+
+
+# ------------------------------------------------------------------------------
+#   Hot-path profiling
+# ------------------------------------------------------------------------------
+
+
+def profile_file() -> str:
+    return args.profile if args.profile is not None else PROFILE_FILE
+
+
+def request_profile_dump(*_):
+    """Enable the profilers, or dump them when already enabled. Can be used as
+    a Python signal handler."""
+    request_dump(profilers, profile_file())
 
 
 # ------------------------------------------------------------------------------
@@ -453,112 +906,27 @@ class MainWindow(QtWid.QWidget):
 
 def stop_running():
     app.processEvents()
-    qdev_ard.quit()
-    log.close()
+    for core in cores:
+        core.stop()
 
     print("Stopping timers................ ", end="")
+    governor.stop()
     timer_GUI.stop()
     timer_charts.stop()
     print("done.")
 
 
-@QtCore.pyqtSlot()
-def notify_connection_lost():
-    stop_running()
-
-    window.qlbl_title.setText("! ! !    LOST CONNECTION    ! ! !")
-    str_cur_date, str_cur_time, _ = get_current_date_time()
-    str_msg = "%s %s\nLost connection to Arduino." % (
-        str_cur_date,
-        str_cur_time,
-    )
-    print("\nCRITICAL ERROR @ %s" % str_msg)
-    reply_ = QtWid.QMessageBox.warning(
-        window, "CRITICAL ERROR", str_msg, QtWid.QMessageBox.Ok
-    )
-
-    if reply_ == QtWid.QMessageBox.Ok:
-        pass  # Leave the GUI open for read-only inspection by the user
-
-
 @QtCore.pyqtSlot()
 def about_to_quit():
     print("\nAbout to quit")
     stop_running()
-    ard.close()
-
-
-# ------------------------------------------------------------------------------
-#   Your Arduino update function
-# ------------------------------------------------------------------------------
-
+    if metrics is not None:
+        metrics.quit()
+    for core in cores:
+        core.quit()
 
-def DAQ_function():
-    # Date-time keeping
-    str_cur_date, str_cur_time, str_cur_datetime = get_current_date_time()
-
-    # Query the Arduino for its state
-    success_, tmp_state = ard.query_ascii_values("?", delimiter="\t")
-    if not (success_):
-        dprint(
-            "'%s' reports IOError @ %s %s"
-            % (ard.name, str_cur_date, str_cur_time)
-        )
-        return False
-
-    # Parse readings into separate state variables
-    try:
-        (
-            state.time,
-            state.ds18b20_temp,
-            state.dht22_temp,
-            state.dht22_humi,
-            state.is_valve_open,
-        ) = tmp_state
-        state.time /= 1000  # Arduino time, [msec] to [s]
-        state.is_valve_open = bool(state.is_valve_open)
-    except Exception as err:
-        pft(err, 3)
-        dprint(
-            "'%s' reports IOError @ %s %s"
-            % (ard.name, str_cur_date, str_cur_time)
-        )
-        return False
-
-    # We will use PC time instead
-    state.time = time.perf_counter()
-
-    # Add readings to chart histories
-    window.tscurve_ds18b20_temp.appendData(state.time, state.ds18b20_temp)
-    window.tscurve_dht22_temp.appendData(state.time, state.dht22_temp)
-    window.tscurve_dht22_humi.appendData(state.time, state.dht22_humi)
-
-    # Logging to file
-    log.update(filepath=str_cur_datetime + ".txt", mode="w")
-
-    # Return success
-    return True
-
-
-def write_header_to_log():
-    log.write("[HEADER]\n")
-    log.write(window.qtxt_comments.toPlainText())
-    log.write("\n\n[DATA]\n")
-    log.write("time\tDS18B20 temp.\tDHT22 temp.\tDHT22 humi.\tvalve\n")
-    log.write("[s]\t[±0.5 °C]\t[±0.5 °C]\t[±3 pct]\t[0/1]\n")
-
-
-def write_data_to_log():
-    log.write(
-        "%.1f\t%.1f\t%.1f\t%.1f\t%i\n"
-        % (
-            log.elapsed(),
-            state.ds18b20_temp,
-            state.dht22_temp,
-            state.dht22_humi,
-            state.is_valve_open,
-        )
-    )
+    if any(profiler.enabled for profiler in profilers.values()):
+        dump(profilers, profile_file())
 
 
 # ------------------------------------------------------------------------------
@@ -566,38 +934,9 @@ def write_data_to_log():
 # ------------------------------------------------------------------------------
 
 if __name__ == "__main__":
-    # Set priority of this process to maximum in the operating system
-    print("PID: %s\n" % os.getpid())
-    try:
-        proc = psutil.Process(os.getpid())
-        if os.name == "nt":
-            proc.nice(psutil.REALTIME_PRIORITY_CLASS)  # Windows
-        else:
-            proc.nice(-20)  # Other
-    except:
-        print("Warning: Could not set process to maximum priority.\n")
-
-    # --------------------------------------------------------------------------
-    #   Connect to Arduino
-    # --------------------------------------------------------------------------
-
-    ard = Arduino(name="Ard", connect_to_specific_ID="Ambre chamber")
-    ard.serial_settings["baudrate"] = 115200
-    ard.auto_connect()
-
-    if not (ard.is_alive):
-        print("\nCheck connection and try resetting the Arduino.")
-        print("Exiting...\n")
-        sys.exit(0)
-
-    # Get the initial state of the valve control
-    success, reply = ard.query("th?")
-    if success:
-        state.humi_threshold = float(reply)
-
-    success, reply = ard.query("open when super humi?")
-    if success:
-        state.open_valve_when_super_humi = bool(int(reply))
+    # Shared by all chambers
+    clock = cores[0].clock
+    profilers = {core.name: core.profiler for core in cores}
 
     # --------------------------------------------------------------------------
     #   Create application and main window
@@ -606,50 +945,58 @@ if __name__ == "__main__":
 
     app = QtWid.QApplication(sys.argv)
     app.aboutToQuit.connect(about_to_quit)
-
-    window = MainWindow()
+    startup.mark("QApplication")
+
+    # A single history per chamber, shared by its DAQ and its charts
+    for core in cores:
+        core.setup_history(CHART_HISTORY_TIME, CHART_TIERS)
+
+    window = MainWindow(cores)
+    for core, panel in zip(cores, window.panels):
+        core.get_comments = panel.qtxt_comments.toPlainText
+    if cores[0].replay_file is not None:
+        window.setWindowTitle(
+            "Ambre chamber - Replay: %s" % cores[0].replay_file
+        )
+        window.panels[0].qtxt_comments.setPlainText(cores[0].replay_comments)
+    startup.mark("main window")
 
     # --------------------------------------------------------------------------
-    #   File logger
+    #   Finish connecting to the Arduinos
     # --------------------------------------------------------------------------
 
-    log = FileLogger(
-        write_header_function=write_header_to_log,
-        write_data_function=write_data_to_log,
-    )
-    log.signal_recording_started.connect(
-        lambda filepath: window.qpbt_record.setText(
-            "Recording to file: %s" % filepath
-        )
-    )
-    log.signal_recording_stopped.connect(
-        lambda: window.qpbt_record.setText("Click to start recording to file")
-    )
+    for core in cores:
+        if not core.finish_connecting():
+            print("\nCheck connection and try resetting the Arduino.")
+            print("Exiting...\n")
+            sys.exit(0)
+        name = "Arduino" if len(cores) == 1 else core.name
+        startup.add_span("connect to %s" % name, *core.connect_span)
+    if cores[0].port_finder is not None:
+        startup.add_span("port discovery", *cores[0].port_finder.span)
+    startup.mark("wait for Arduino")
+
+    for panel in window.panels:
+        panel.show_valve_control()
 
     # --------------------------------------------------------------------------
-    #   Set up multithreaded communication with the Arduino
+    #   File loggers and multithreaded communication with the Arduinos
     # --------------------------------------------------------------------------
 
-    # Create QDeviceIO
-    qdev_ard = QDeviceIO(ard)
-
-    # Create workers
-    # fmt: off
-    qdev_ard.create_worker_DAQ(
-        DAQ_function             = DAQ_function,
-        DAQ_interval_ms          = DAQ_INTERVAL_MS,
-        critical_not_alive_count = 1,
-        debug                    = DEBUG,
-    )
-    # fmt: on
-    qdev_ard.create_worker_jobs()
+    for core, panel in zip(cores, window.panels):
+        core.setup()
+        panel.connect_log_signals()
 
-    # Connect signals to slots
-    qdev_ard.signal_DAQ_updated.connect(window.update_GUI)
-    qdev_ard.signal_connection_lost.connect(notify_connection_lost)
+        core.qdev.signal_connection_lost.connect(panel.notify_connection_lost)
+        core.qdev.signal_DAQ_updated.connect(notify_first_sample)
+        core.start()
+    startup.mark("DAQ start")
 
-    # Start workers
-    qdev_ard.start(DAQ_priority=QtCore.QThread.TimeCriticalPriority)
+    # Optional Prometheus metrics
+    metrics = None
+    if args.metrics_port is not None:
+        metrics = MetricsServer(cores, args.metrics_port, args.metrics_host)
+        metrics.start()
 
     # --------------------------------------------------------------------------
     #   Timers
@@ -657,15 +1004,33 @@ if __name__ == "__main__":
 
     timer_GUI = QtCore.QTimer()
     timer_GUI.timeout.connect(window.update_GUI)
-    timer_GUI.start(100)
 
     timer_charts = QtCore.QTimer()
     timer_charts.timeout.connect(window.update_chart)
-    timer_charts.start(CHART_INTERVAL_MS)
+
+    # Lower or suspend the refresh of the GUI depending on the window state
+    governor = PowerGovernor(window)
+    governor.add_timer(timer_GUI, GUI_INTERVAL_MS, GUI_INTERVAL_BACKGROUND_MS)
+    governor.add_timer(
+        timer_charts, CHART_INTERVAL_MS, CHART_INTERVAL_BACKGROUND_MS
+    )
+    for core in cores:
+        governor.add_signal(core.qdev.signal_DAQ_updated, window.update_GUI)
+    governor.add_restore_slot(window.update_GUI)
+    governor.add_restore_slot(window.update_chart)
 
     # --------------------------------------------------------------------------
     #   Start the main GUI event loop
     # --------------------------------------------------------------------------
 
+    # Enable, or dump, the hot-path profilers on demand
+    QtWid.QShortcut(
+        QtGui.QKeySequence("Ctrl+P"), window, activated=request_profile_dump
+    )
+    if hasattr(signal, "SIGUSR1"):  # Not on Windows
+        signal.signal(signal.SIGUSR1, request_profile_dump)
+
     window.show()
+    governor.start()
+    startup.mark("show window")
     sys.exit(app.exec_())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the asyncio device engine, on a simulated Arduino."""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+# pylint: disable=missing-function-docstring, redefined-outer-name
+
+import asyncio
+import time
+
+import pytest
+from PyQt5 import QtCore
+
+from ambre_async import (
+    AsyncDeviceIO,
+    AsyncEngine,
+    AsyncSerialLink,
+    query_ascii_values,
+    query_binary_state,
+)
+from ambre_simulator import SimulatedArduino
+
+
+class PolledSerial(object):
+    """Serial port without a file descriptor, hence to be polled."""
+
+    def __init__(self, data=b""):
+        self.timeout = 1
+        self.data = bytearray(data)
+
+    @property
+    def in_waiting(self):
+        return len(self.data)
+
+    def read(self, size=1):
+        chunk = bytes(self.data[:size])
+        del self.data[:size]
+        return chunk
+
+    def reset_input_buffer(self):
+        self.data.clear()
+
+
+@pytest.fixture
+def engine():
+    engine = AsyncEngine()
+    engine.acquire()
+    yield engine
+    engine.release()
+
+
+@pytest.fixture
+def ard():
+    ard = SimulatedArduino(reply_latency=0.005)
+    assert ard.connect_at_port(verbose=False)
+    yield ard
+    ard.close()
+
+
+def test_queries_on_the_event_loop(engine, ard):
+    link = AsyncSerialLink(ard.ser, engine.loop)
+
+    async def queries():
+        link.attach()
+        try:
+            return (
+                await query_ascii_values(ard, link, "th?"),
+                await query_binary_state(ard, link),
+            )
+        finally:
+            link.detach()
+
+    ascii_reply, binary_reply = engine.submit(queries()).result(timeout=5)
+    ok_ascii, values = ascii_reply
+    ok_binary, readings = binary_reply
+    assert ok_ascii
+    assert values == [ard.firmware.humi_threshold]
+    assert ok_binary
+    assert len(readings) == 5
+
+
+def test_polled_read_times_out_with_fewer_bytes(engine):
+    ser = PolledSerial(b"abc\ndef")
+    link = AsyncSerialLink(ser, engine.loop)
+
+    async def reads():
+        link.attach()
+        try:
+            line = await link.read_until(b"\n", timeout=0.5)
+            t0 = time.perf_counter()
+            rest = await link.read_exactly(10, timeout=0.05)
+            return line, rest, time.perf_counter() - t0
+        finally:
+            link.detach()
+
+    line, rest, waited = engine.submit(reads()).result(timeout=5)
+    assert line == b"abc\n"
+    assert rest == b"def"
+    assert waited >= 0.04
+
+
+def test_device_io_runs_the_DAQ_and_jobs(engine, ard):
+    # pylint: disable=invalid-name
+    calls = []
+
+    async def DAQ_function():
+        calls.append(time.perf_counter())
+        return True
+
+    qdev = AsyncDeviceIO(engine, ard, DAQ_function, DAQ_interval_ms=10)
+    assert qdev.start()
+    qdev.send(ard.write, "th42")
+    time.sleep(0.2)
+    qdev.quit()
+
+    N_calls = len(calls)
+    assert N_calls >= 5
+    assert qdev.update_counter_DAQ == N_calls
+    assert qdev.not_alive_counter_DAQ == 0
+    assert ard.firmware.humi_threshold == 42
+
+    time.sleep(0.05)
+    assert len(calls) == N_calls  # Stopped for good
+
+
+def test_device_io_loses_connection(engine, ard):
+    # pylint: disable=invalid-name
+    lost = []
+
+    async def DAQ_function():
+        return False
+
+    qdev = AsyncDeviceIO(
+        engine,
+        ard,
+        DAQ_function,
+        DAQ_interval_ms=10,
+        critical_not_alive_count=3,
+    )
+    qdev.signal_connection_lost.connect(
+        lambda: lost.append(True), QtCore.Qt.DirectConnection
+    )
+    qdev.start()
+    time.sleep(0.2)
+    qdev.quit()
+
+    assert lost == [True]
+    assert qdev.update_counter_DAQ == 3
+    assert not ard.is_alive
+
+
+def test_engine_stops_after_the_last_device():
+    engine = AsyncEngine()
+    engine.acquire()
+    engine.acquire()
+    engine.release()
+    assert engine.submit(asyncio.sleep(0, "alive")).result(timeout=5) == "alive"
+
+    engine.release()
+    assert not engine.loop.is_running()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the min/max decimation of the chart curves against a brute-force
+reference."""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+# pylint: disable=missing-function-docstring, redefined-outer-name
+
+import numpy as np
+import pytest
+
+from ambre_charts import MinMaxDecimator
+
+
+def reference_decimate(x, y, index_end, N_buckets_max):
+    """Brute-force min/max decimation: Group the samples by the bucket of
+    their absolute index and keep the first minimum and first maximum of each
+    group, in chronological order, followed by the last sample."""
+    N = len(x)
+    if N <= 2 * N_buckets_max:
+        return x, y
+
+    B = 1
+    while N / B > N_buckets_max:
+        B *= 2
+
+    k = (index_end - N + np.arange(N)) // B
+    groups = [np.flatnonzero(k == bucket) for bucket in np.unique(k)]
+    if not any(len(group) == B for group in groups):
+        return x, y
+
+    idx = []
+    for group in groups:
+        values = y[group]
+        if np.isnan(values).all():
+            idx.extend((group[0], group[0]))
+        else:
+            idx.extend(
+                sorted(
+                    (group[np.nanargmin(values)], group[np.nanargmax(values)])
+                )
+            )
+    idx.append(N - 1)
+    return x[idx], y[idx]
+
+
+def assert_same_series(actual, expected):
+    np.testing.assert_array_equal(actual[0], expected[0])
+    np.testing.assert_array_equal(actual[1], expected[1])
+
+
+@pytest.fixture
+def series():
+    """Absolute sample index as x, a random walk with peaks and NaNs as y."""
+    rng = np.random.default_rng(0)
+    N = 50000
+    y = np.cumsum(rng.normal(0, 1, N))
+    y[rng.random(N) < 0.001] += 100  # Peaks
+    y[rng.random(N) < 0.01] = np.nan
+    y[1000:1100] = np.nan  # Gap
+    return np.arange(N, dtype=np.float64), y
+
+
+@pytest.mark.parametrize("N_buckets_max", [1, 7, 100, 1000])
+def test_decimate_matches_reference(series, N_buckets_max):
+    x, y = series
+    for N in (1, 2, 3, 10, 2000, 2001, 2048, 2049, 49999):
+        decimator = MinMaxDecimator()
+        assert_same_series(
+            decimator.decimate(x[-N:], y[-N:], len(x), N_buckets_max),
+            reference_decimate(x[-N:], y[-N:], len(x), N_buckets_max),
+        )
+
+
+def test_decimate_sliding_history(series):
+    # Like a full ring buffer of 8000 samples that keeps on receiving batches
+    # of new samples. The cached buckets must match a fresh decimation.
+    x, y = series
+    rng = np.random.default_rng(1)
+    capacity = 8000
+    decimator = MinMaxDecimator()
+
+    index_end = 500
+    while index_end < len(x):
+        i0 = max(index_end - capacity, 0)
+        N_buckets_max = 400 if index_end < 30000 else 150  # Zoomed out
+        assert_same_series(
+            decimator.decimate(
+                x[i0:index_end], y[i0:index_end], index_end, N_buckets_max
+            ),
+            reference_decimate(
+                x[i0:index_end], y[i0:index_end], index_end, N_buckets_max
+            ),
+        )
+        index_end += int(rng.integers(1, 700))
+
+
+def test_decimate_after_clear(series):
+    # A cleared history restarts from scratch, at a higher generation count
+    x, y = series
+    decimator = MinMaxDecimator()
+    decimator.decimate(x[:5000], y[:5000], 5000, 100)
+
+    x_new, y_new = x[:3000], y[:3000] * 2
+    assert_same_series(
+        decimator.decimate(x_new, y_new, 5001 + 3000, 100),
+        reference_decimate(x_new, y_new, 5001 + 3000, 100),
+    )
+
+
+def test_decimate_keeps_peaks_and_last_sample(series):
+    x, y = series
+    x_dec, y_dec = MinMaxDecimator().decimate(x, y, len(x), 500)
+
+    assert len(x_dec) <= 2 * 500 + 2 * 2 + 1  # Plus partial buckets and last
+    assert np.nanmax(y_dec) == np.nanmax(y)
+    assert np.nanmin(y_dec) == np.nanmin(y)
+    assert x_dec[-1] == x[-1]
+    assert np.all(np.diff(x_dec) >= 0)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the per-second format cache of the ``Clock`` and of stepping the
+``VirtualClock``."""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+# pylint: disable=missing-function-docstring, redefined-outer-name
+
+import time
+
+import pytest
+
+import ambre_clock
+from ambre_clock import FMT_DATETIME, FMT_TIME, Clock, VirtualClock
+
+T = 1760515574.25  # Some wall-clock time, a quarter past the second
+
+
+@pytest.fixture
+def localtime_calls(monkeypatch):
+    calls = []
+    original = time.localtime
+
+    def localtime(sec):
+        calls.append(sec)
+        return original(sec)
+
+    monkeypatch.setattr(ambre_clock.time, "localtime", localtime)
+    return calls
+
+
+def test_formats_like_strftime():
+    clock = Clock()
+    tm = time.localtime(T)
+    assert clock.date_str(T) == time.strftime("%d-%m-%Y", tm)
+    assert clock.time_str(T) == time.strftime("%H:%M:%S", tm)
+    assert clock.datetime_str(T) == time.strftime("%y%m%d_%H%M%S", tm)
+
+
+def test_cache_per_second(localtime_calls):
+    clock = Clock()
+    s1 = clock.time_str(T)
+    clock.datetime_str(T + 0.5)
+    assert clock.time_str(T + 0.7) is s1
+    assert len(localtime_calls) == 1
+
+    # The next second renews the cache
+    s2 = clock.time_str(T + 1)
+    assert s2 != s1
+    assert len(localtime_calls) == 2
+    assert clock.format(FMT_TIME, T + 1.5) is s2
+    assert clock.format(FMT_DATETIME, T + 1.5) == time.strftime(
+        FMT_DATETIME, time.localtime(T + 1)
+    )
+
+
+def test_virtual_clock_stepped_by_hand():
+    clock = VirtualClock(start=T, speed=0)
+    assert clock.now() == T
+    assert clock.monotonic() == 0
+
+    clock.advance(2.5)
+    assert clock.now() == T + 2.5
+    assert clock.monotonic() == 2.5
+    assert clock.time_str() == time.strftime(FMT_TIME, time.localtime(T + 2.5))
+
+    clock.set_time(T + 3600)
+    assert clock.now() == T + 3600
+    assert clock.monotonic() == 2.5
+
+
+def test_virtual_clock_runs_at_speed():
+    clock = VirtualClock(start=T, speed=100)
+    t0 = time.perf_counter()
+    time.sleep(0.05)
+    elapsed = time.perf_counter() - t0
+    assert clock.monotonic() >= 100 * elapsed
+    assert clock.monotonic() < 100 * (elapsed + 0.1)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the acquisition and logging of ``AmbreCore`` on a simulated
+Arduino.
+"""
+
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+# pylint: disable=missing-function-docstring, redefined-outer-name
+
+import time
+
+import numpy as np
+import pytest
+from PyQt5 import QtCore
+
+from ambre_core import create_cores, parse_args
+from ambre_logfile import load_log
+from ambre_recording import load_recording
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def create_core(*argv):
+    core = create_cores(parse_args(list(argv)))[0]
+    if not core.connect():
+        pytest.fail("Could not connect to the (simulated) Arduino")
+    core.setup()
+    return core
+
+
+def load_only_log(directory):
+    (filepath,) = directory.glob("*.txt")
+    return load_log(filepath)
+
+
+def test_stream_backlog_keeps_frame_times(qapp, tmp_path, monkeypatch):
+    # pylint: disable=unused-argument, protected-access
+    monkeypatch.chdir(tmp_path)
+    core = create_core("--sim", "--stream", "--interval", "10")
+    try:
+        # Let a backlog of frames pile up, to be processed in a single batch
+        core._start_streaming()
+        core.log.record(True)
+        time.sleep(0.3)
+        assert core.DAQ_function_stream()
+    finally:
+        core.quit()
+
+    _, data = load_only_log(tmp_path)
+    assert len(data) > 10
+    assert np.all(np.diff(data["time"]) > 0)
+    assert data["time"][0] == 0
+
+
+def test_clearing_the_history_keeps_the_log(qapp, tmp_path, monkeypatch):
+    # pylint: disable=unused-argument
+    monkeypatch.chdir(tmp_path)
+    core = create_core("--sim", "--interval", "10")
+    try:
+        core.log.record(True)
+        for idx in range(6):
+            if idx == 3:
+                core.history.clear()  # Like the Clear button of the charts
+            time.sleep(0.02)
+            assert core.DAQ_function()
+    finally:
+        core.quit()
+
+    _, data = load_only_log(tmp_path)
+    assert len(data) == 6
+    assert np.all(np.diff(data["time"]) > 0)
+
+
+def test_timing_log_shares_time_base(qapp, tmp_path, monkeypatch):
+    # pylint: disable=unused-argument, protected-access
+    monkeypatch.chdir(tmp_path)
+    core = create_core("--sim", "--stream", "--interval", "10", "--timing-log")
+    try:
+        core._start_streaming()
+        core.log.record(True)
+        for _ in range(3):
+            time.sleep(0.1)
+            assert core.DAQ_function_stream()
+    finally:
+        core.quit()
+
+    _, data = load_only_log(tmp_path)
+    (filepath,) = tmp_path.glob("*.timing.ambre")
+    _, ticks = load_recording(filepath)
+
+    # Each tick is stamped with the last frame of its batch, as logged
+    assert len(ticks) == 3
+    assert ticks["time"][-1] == pytest.approx(data["time"][-1], abs=1e-3)
+    for t_tick in ticks["time"]:
+        assert np.min(np.abs(data["time"] - t_tick)) < 1e-3
+
+
+def test_replay_reproduces_time_axis(qapp, tmp_path, monkeypatch):
+    # pylint: disable=unused-argument
+    rng = np.random.default_rng(0)
+    N = 500
+    t = np.round(np.cumsum(rng.uniform(0.05, 0.5, N)), 3)
+    t -= t[0]
+    humi = np.round(rng.uniform(40, 60, N), 1)
+
+    original = tmp_path / "original.txt"
+    with original.open("w", encoding="utf-8") as f:
+        f.write("[HEADER]\nRound trip\n\n[DATA]\n")
+        f.write("time\tDS18B20 temp.\tDHT22 temp.\tDHT22 humi.\tvalve\n")
+        f.write("[s]\t[±0.5 °C]\t[±0.5 °C]\t[±3 pct]\t[0/1]\n")
+        for idx in range(N):
+            f.write(
+                "%.3f\t20.0\t20.5\t%.1f\t%i\n" % (t[idx], humi[idx], idx % 2)
+            )
+
+    replayed = tmp_path / "replayed"
+    replayed.mkdir()
+    monkeypatch.chdir(replayed)
+    core = create_core("--replay", str(original), "--speed", "max")
+    try:
+        core.log.record(True)
+        core.start()
+        t_timeout = time.perf_counter() + 20
+        while not core.is_replay_finished():
+            assert time.perf_counter() < t_timeout, "Replay did not finish"
+            time.sleep(0.05)
+        core.stop()
+    finally:
+        core.quit()
+
+    _, data = load_only_log(replayed)
+    assert len(data) == N
+    np.testing.assert_allclose(data["time"], t, atol=1e-6)
+    np.testing.assert_allclose(data["dht22_humi"], humi, atol=1e-6)
+    np.testing.assert_array_equal(data["is_valve_open"], np.arange(N) % 2)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the port discovery of ``PortFinder``, on fake serial ports."""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+# pylint: disable=missing-function-docstring, redefined-outer-name
+
+from pathlib import Path
+
+import pytest
+
+import ambre_discovery
+from ambre_discovery import PortFinder
+
+
+class FakePortFinder(PortFinder):
+    """``PortFinder`` probing fake ports, given as dict port -> identity."""
+
+    def __init__(self, IDs, ports, cache_file):
+        super().__init__(IDs, cache_file=cache_file)
+        self.fake_ports = ports
+
+    def list_ports(self):
+        return list(self.fake_ports)
+
+    def _probe(self, ports):
+        return {port: self.fake_ports.get(port) for port in ports}
+
+
+@pytest.fixture
+def finder(tmp_path):
+    return FakePortFinder(
+        ["Ambre chamber"],
+        {"COM1": "Ambre chamber"},
+        cache_file=tmp_path / "ports.json",
+    )
+
+
+def test_find_reports_first_discovery(finder, capsys):
+    assert finder.find("Ambre chamber") == "COM1"
+    assert "`Ambre chamber` @ COM1" in capsys.readouterr().out
+
+    # Later calls reuse the first discovery
+    assert finder.find("Ambre chamber") == "COM1"
+    assert capsys.readouterr().out == ""
+
+
+def test_rediscover_reports_only_changes(finder, capsys):
+    finder.find("Ambre chamber")
+    capsys.readouterr()
+
+    # Found again at the same port
+    assert finder.rediscover("Ambre chamber") == "COM1"
+    assert capsys.readouterr().out == ""
+
+    # Unplugged: Reported once, not on every attempt to reconnect
+    finder.fake_ports = {}
+    assert finder.rediscover("Ambre chamber") is None
+    assert "not found" in capsys.readouterr().out
+    assert finder.rediscover("Ambre chamber") is None
+    assert capsys.readouterr().out == ""
+
+    # Plugged back in at another port
+    finder.fake_ports = {"COM2": "Ambre chamber"}
+    assert finder.rediscover("Ambre chamber") == "COM2"
+    assert "`Ambre chamber` @ COM2" in capsys.readouterr().out
+
+
+def test_cache_next_to_the_scripts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    finder = PortFinder(["Ambre chamber"])
+    scripts_dir = Path(ambre_discovery.__file__).parent
+    assert finder.cache_file == scripts_dir / "config" / "ports.json"
+    assert finder.cache_file.is_absolute()
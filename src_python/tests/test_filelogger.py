@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the rotation of the log files by the background file writer, and
+of the manifest of the segments."""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+# pylint: disable=missing-function-docstring, redefined-outer-name
+
+import gzip
+import json
+import lzma
+
+import pytest
+
+from ambre_filelogger import BackgroundFileWriter
+from ambre_logfile import load_log
+
+HEADER = (
+    "[HEADER]\n"
+    "Some comment\n"
+    "[DATA]\n"
+    "time\tDS18B20 temp.\tDHT22 temp.\tDHT22 humi.\tvalve\n"
+    "[s]\t[±0.5 °C]\t[±0.5 °C]\t[±3 pct]\t[0/1]\n"
+)
+
+ROTATE_SIZE = 1000  # [bytes]
+N_ROWS_PER_BATCH = 25
+
+
+def read_segment(path):
+    if path.suffix == ".gz":
+        opener = gzip.open
+    elif path.suffix == ".xz":
+        opener = lzma.open
+    else:
+        opener = open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return f.read()
+
+
+def write_rotated_log(filepath, compression, N_batches=10):
+    """Write a log through a rotating writer and return the written text.
+    Every flush ends a batch, after which the writer may rotate."""
+    writer = BackgroundFileWriter(
+        flush_interval=10,
+        fsync=False,
+        rotate_size=ROTATE_SIZE,
+        compression=compression,
+    )
+    writer.open(filepath)
+    text = HEADER
+    writer.write(HEADER)
+    for batch in range(N_batches):
+        for i in range(N_ROWS_PER_BATCH):
+            row = "%.3f\t20.0\t20.5\t50.0\t0\n" % (batch * N_ROWS_PER_BATCH + i)
+            writer.write(row)
+            text += row
+        writer.flush()
+    writer.quit()
+    return writer, text
+
+
+@pytest.mark.parametrize(
+    "compression, suffix", [("gzip", ".gz"), ("xz", ".xz"), (None, "")]
+)
+def test_rotation_and_manifest(tmp_path, compression, suffix):
+    filepath = tmp_path / "261015_080614.txt"
+    writer, text = write_rotated_log(filepath, compression)
+
+    with open(tmp_path / "261015_080614.segments.json", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    # The first segment keeps the requested name and stays uncompressed, the
+    # rotated-out ones get numbered and compressed, in order
+    segments = manifest["segments"]
+    assert manifest["base"] == "261015_080614.txt"
+    assert len(segments) == writer.N_rotations + 1 > 2
+    assert segments[0] == "261015_080614.txt" + suffix
+    assert segments[1:] == [
+        "261015_080614.%03d.txt%s"
+        % (idx, suffix if idx < len(segments) else "")
+        for idx in range(2, len(segments) + 1)
+    ]
+
+    # Nothing left over, besides the manifest
+    assert sorted(x.name for x in tmp_path.iterdir()) == sorted(
+        segments + ["261015_080614.segments.json"]
+    )
+
+    # Each rotated-out segment reached the rotation size. Only the first one
+    # holds the header.
+    contents = [read_segment(tmp_path / name) for name in segments]
+    assert "".join(contents) == text
+    assert all(len(x.encode()) >= ROTATE_SIZE for x in contents[:-1])
+    assert contents[0].startswith("[HEADER]")
+    assert not any("[HEADER]" in x for x in contents[1:])
+
+
+def test_rotated_log_loads_as_a_whole(tmp_path):
+    filepath = tmp_path / "log.txt"
+    write_rotated_log(filepath, "gzip")
+
+    comments, data = load_log(filepath)
+    assert comments == "Some comment"
+    assert data["time"].tolist() == list(range(10 * N_ROWS_PER_BATCH))
+
+
+def test_no_rotation(tmp_path):
+    filepath = tmp_path / "log.txt"
+    writer = BackgroundFileWriter(fsync=False)
+    writer.open(filepath)
+    writer.write(HEADER)
+    writer.quit()
+
+    assert writer.N_rotations == 0
+    assert [x.name for x in tmp_path.iterdir()] == ["log.txt"]
+    assert filepath.read_text(encoding="utf-8") == HEADER
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the ring buffer of the history: Wrap-around, zero-copy views and
+the generation counter. And of the tiers of aggregates, against a brute-force
+reference."""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+# pylint: disable=missing-function-docstring, redefined-outer-name
+
+import threading
+
+import numpy as np
+import pytest
+
+from ambre_history import AggregateTier, HistoryBuffer, TieredHistory
+
+FIELDS = ("ds18b20_temp", "dht22_temp", "dht22_humi", "is_valve_open")
+
+
+def random_columns(N, rng, t_start=0.0, p_nan=0.0):
+    """Columns of ``N`` samples at irregular, increasing times."""
+    columns = {
+        "time": t_start + np.cumsum(rng.uniform(0.05, 0.5, N)),
+        "ds18b20_temp": 20 + np.cumsum(rng.normal(0, 0.1, N)),
+        "dht22_temp": 20.5 + rng.normal(0, 0.5, N),
+        "dht22_humi": 50 + np.cumsum(rng.normal(0, 0.2, N)),
+        "is_valve_open": (rng.random(N) < 0.5).astype(np.uint8),
+    }
+    for name in ("ds18b20_temp", "dht22_temp", "dht22_humi"):
+        columns[name][rng.random(N) < p_nan] = np.nan
+    return columns
+
+
+def split_randomly(columns, rng, N_max=50):
+    """Split the columns into consecutive batches of random size."""
+    N = len(columns["time"])
+    edges = np.unique(np.r_[0, rng.integers(0, N, N // 10 + 1), N])
+    for i0, i1 in zip(edges[:-1], edges[1:]):
+        for j0 in range(i0, i1, N_max):
+            j1 = min(j0 + N_max, i1)
+            yield {name: values[j0:j1] for name, values in columns.items()}
+
+
+# ------------------------------------------------------------------------------
+#   HistoryBuffer
+# ------------------------------------------------------------------------------
+
+
+def test_append_wraps_around():
+    history = HistoryBuffer(capacity=5)
+    for i in range(12):
+        history.append(i, i + 0.5, 0, 0, i % 2)
+
+        view = history.view()
+        expected = np.arange(max(i - 4, 0), i + 1)
+        assert len(history) == len(expected)
+        assert view["time"].tolist() == expected.tolist()
+        assert view["ds18b20_temp"].tolist() == (expected + 0.5).tolist()
+
+
+@pytest.mark.parametrize("N_batch", [1, 3, 5, 7, 13])
+def test_extend_wraps_around(N_batch):
+    history = HistoryBuffer(capacity=5)
+    t = np.arange(40.0)
+    for i0 in range(0, len(t), N_batch):
+        batch = t[i0 : i0 + N_batch]
+        history.extend(time=batch, dht22_humi=batch * 2)
+
+        expected = t[max(i0 + len(batch) - 5, 0) : i0 + len(batch)]
+        view = history.view()
+        assert view["time"].tolist() == expected.tolist()
+        assert view["dht22_humi"].tolist() == (expected * 2).tolist()
+        assert (view["ds18b20_temp"] == 0).all()  # Left out
+
+
+def test_view_is_contiguous_and_zero_copy():
+    history = HistoryBuffer(capacity=4)
+    history.extend(time=np.arange(6.0))
+
+    view = history.view()
+    assert view.base is not None
+    assert view.flags["C_CONTIGUOUS"]
+
+
+def test_generation_counter():
+    history = HistoryBuffer(capacity=3)
+    assert history.N_written == 0
+
+    history.append(0, 0, 0, 0, 0)
+    assert history.N_written == 1
+
+    history.extend(time=np.arange(1.0, 6.0))
+    assert history.N_written == 6  # Counts beyond the capacity
+
+    history.extend(time=np.array([]))
+    assert history.N_written == 6  # Nothing changed
+
+    history.clear()
+    assert len(history) == 0
+    assert history.N_written == 7  # Content changed
+
+    history.append(10, 0, 0, 0, 0)
+    assert history.view()["time"].tolist() == [10]
+
+
+# ------------------------------------------------------------------------------
+#   AggregateTier
+# ------------------------------------------------------------------------------
+
+
+def reference_aggregates(columns, period):
+    """Brute-force min/mean/max per bucket of ``period``, of all buckets but
+    the last one, which is still open."""
+    buckets = np.floor(columns["time"] / period).astype(np.int64)
+    rows = []
+    for bucket in np.unique(buckets)[:-1]:
+        is_in = buckets == bucket
+        row = {"time": (bucket + 0.5) * period}
+        for name in FIELDS:
+            values = columns[name][is_in].astype(np.float64)
+            values = values[~np.isnan(values)]
+            if len(values):
+                stats = (values.min(), values.mean(), values.max())
+            else:
+                stats = (np.nan, np.nan, np.nan)
+            for suffix, value in zip(("_min", "_mean", "_max"), stats):
+                row[name + suffix] = value
+        rows.append(row)
+    return rows
+
+
+def assert_matches_reference(view, rows):
+    assert len(view) == len(rows)
+    for name in view.dtype.names:
+        np.testing.assert_allclose(
+            view[name],
+            [row[name] for row in rows],
+            rtol=1e-6,
+            equal_nan=True,
+            err_msg=name,
+        )
+
+
+@pytest.mark.parametrize("period", [1.0, 2.5, 60.0])
+@pytest.mark.parametrize("p_nan", [0.0, 0.3])
+def test_tier_matches_reference(period, p_nan):
+    rng = np.random.default_rng(1)
+    columns = random_columns(3000, rng, t_start=1000.0, p_nan=p_nan)
+    tier = AggregateTier(period, retention=1e6)
+    for batch in split_randomly(columns, rng):
+        tier.ingest(batch.pop("time"), **batch)
+
+    rows = reference_aggregates(columns, period)
+    assert_matches_reference(tier.buffer.view(), rows)
+
+
+def test_tier_all_nan_bucket():
+    tier = AggregateTier(1.0, retention=100)
+    tier.ingest(
+        [0.1, 0.5, 1.2, 2.1],
+        dht22_humi=[np.nan, np.nan, 50.0, 60.0],
+    )
+
+    view = tier.buffer.view()
+    assert view["time"].tolist() == [0.5, 1.5]
+    assert np.isnan(view["dht22_humi_min"][0])
+    assert np.isnan(view["dht22_humi_mean"][0])
+    assert view["dht22_humi_mean"][1] == 50
+
+
+def test_tier_retention():
+    rng = np.random.default_rng(2)
+    columns = random_columns(2000, rng)
+    tier = AggregateTier(1.0, retention=50)
+    tier.ingest(columns["time"], **{name: columns[name] for name in FIELDS})
+
+    rows = reference_aggregates(columns, 1.0)
+    assert tier.buffer.capacity == 50
+    assert_matches_reference(tier.buffer.view(), rows[-50:])
+
+
+def test_tiered_history_feeds_all_tiers():
+    rng = np.random.default_rng(3)
+    columns = random_columns(1000, rng)
+    history = TieredHistory(capacity=100, tiers=[(1.0, 1e4), (10.0, 1e5)])
+    for batch in split_randomly(columns, rng):
+        if len(batch["time"]) == 1:
+            history.append(*(batch[name][0] for name in history.dtype.names))
+        else:
+            history.extend(**batch)
+
+    assert history.view()["time"].tolist() == columns["time"][-100:].tolist()
+    for tier in history.tiers:
+        rows = reference_aggregates(columns, tier.period)
+        assert_matches_reference(tier.buffer.view(), rows)
+
+    history.clear()
+    assert len(history) == 0
+    assert all(len(tier.buffer) == 0 for tier in history.tiers)
+
+
+def test_tiered_history_clear_waits_for_ingest():
+    # The GUI thread clears the history while the DAQ thread appends to it
+    history = TieredHistory(capacity=10, tiers=[(1.0, 100)])
+    tier = history.tiers[0]
+    is_ingesting = threading.Event()
+    may_finish = threading.Event()
+    ingest = tier.ingest
+
+    def slow_ingest(*args, **kwargs):
+        is_ingesting.set()
+        may_finish.wait(5)
+        ingest(*args, **kwargs)
+
+    tier.ingest = slow_ingest
+    appender = threading.Thread(
+        target=history.append, args=(0.5, 20, 20, 50, 0)
+    )
+    appender.start()
+    assert is_ingesting.wait(5)
+
+    clearer = threading.Thread(target=history.clear)
+    clearer.start()
+    clearer.join(0.2)
+    assert clearer.is_alive()  # Waits for the ingest to finish
+
+    may_finish.set()
+    appender.join(5)
+    clearer.join(5)
+    assert len(history) == 0
+    assert len(tier.buffer) == 0
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the loader of the text log files, in particular of locating a time
+range by bisection."""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+# pylint: disable=missing-function-docstring, redefined-outer-name
+
+import gzip
+import json
+
+import numpy as np
+import pytest
+
+from ambre_logfile import load_log
+
+HEADER = (
+    "[HEADER]\n"
+    "Some comment\n"
+    "[DATA]\n"
+    "time\tDS18B20 temp.\tDHT22 temp.\tDHT22 humi.\tvalve\n"
+    "[s]\t[±0.5 °C]\t[±0.5 °C]\t[±3 pct]\t[0/1]\n"
+)
+
+
+def format_rows(time, humi):
+    return "".join(
+        "%.3f\t%.1f\t%.1f\t%.1f\t%i\n" % (t, 20.0, 20.5, h, h > 50)
+        for t, h in zip(time, humi)
+    )
+
+
+@pytest.fixture
+def log(tmp_path):
+    """Log file with irregular times and rows of NaNs marking outages."""
+    rng = np.random.default_rng(0)
+    time = np.round(np.cumsum(rng.uniform(0.01, 2, 2000)), 3)
+    humi = np.round(rng.uniform(40, 60, len(time)), 1)
+    humi[[0, 500, 501, 1234, len(time) - 1]] = np.nan
+
+    filepath = tmp_path / "log.txt"
+    filepath.write_text(HEADER + format_rows(time, humi), encoding="utf-8")
+    return filepath, time, humi
+
+
+def test_load_all(log):
+    filepath, time, humi = log
+    comments, data = load_log(filepath)
+
+    assert comments == "Some comment"
+    np.testing.assert_array_equal(data["time"], time)
+    np.testing.assert_array_equal(data["dht22_humi"], humi.astype("f4"))
+    assert np.isnan(data["dht22_humi"][[0, 500, 501, 1234, -1]]).all()
+
+
+@pytest.mark.parametrize("chunk_size", [64, 1 << 24])
+def test_time_range_matches_filter(log, chunk_size):
+    filepath, time, humi = log
+    rng = np.random.default_rng(1)
+
+    # Exact row times, in between rows, at the NaN rows and out of range
+    bounds = np.r_[
+        time[rng.integers(0, len(time), 20)],
+        rng.uniform(-10, time[-1] + 10, 20),
+        time[[0, 500, 501, 1234, -1]],
+        -1.0,
+        time[-1] + 1,
+    ]
+    for _ in range(100):
+        t_start, t_stop = np.sort(rng.choice(bounds, 2))
+        _, data = load_log(
+            filepath, t_start=t_start, t_stop=t_stop, chunk_size=chunk_size
+        )
+
+        is_in = (time >= t_start) & (time <= t_stop)
+        np.testing.assert_array_equal(data["time"], time[is_in])
+        np.testing.assert_array_equal(
+            data["dht22_humi"], humi[is_in].astype("f4")
+        )
+
+
+def test_open_ended_time_range(log):
+    filepath, time, _ = log
+    t = time[1000]
+
+    _, data = load_log(filepath, t_start=t)
+    np.testing.assert_array_equal(data["time"], time[1000:])
+
+    _, data = load_log(filepath, t_stop=t)
+    np.testing.assert_array_equal(data["time"], time[:1001])
+
+    _, data = load_log(filepath, t_start=time[-1] + 1)
+    assert len(data) == 0
+
+
+def test_ignores_partially_written_row(log):
+    filepath, time, _ = log
+    with open(filepath, "a", encoding="utf-8") as f:
+        f.write("%.3f\t20.0\t20" % (time[-1] + 1))
+
+    _, data = load_log(filepath)
+    np.testing.assert_array_equal(data["time"], time)
+
+
+def test_no_rows(tmp_path):
+    filepath = tmp_path / "log.txt"
+    filepath.write_text(HEADER, encoding="utf-8")
+
+    comments, data = load_log(filepath, t_start=0, t_stop=10)
+    assert comments == "Some comment"
+    assert len(data) == 0
+
+
+def test_rotated_segments(log, tmp_path):
+    filepath, time, humi = log
+    rows = format_rows(time, humi).splitlines(keepends=True)
+
+    # First segment holds the header, the others got compressed
+    (tmp_path / "seg.txt").write_text(
+        HEADER + "".join(rows[:700]), encoding="utf-8"
+    )
+    with gzip.open(tmp_path / "seg.002.txt.gz", "wt", encoding="utf-8") as f:
+        f.write("".join(rows[700:1500]))
+    (tmp_path / "seg.003.txt").write_text(
+        "".join(rows[1500:]), encoding="utf-8"
+    )
+    (tmp_path / "seg.segments.json").write_text(
+        json.dumps(
+            {
+                "base": "seg.txt",
+                "segments": ["seg.txt", "seg.002.txt.gz", "seg.003.txt"],
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    comments, data = load_log(tmp_path / "seg.txt")
+    assert comments == "Some comment"
+    np.testing.assert_array_equal(data["time"], time)
+
+    _, data = load_log(
+        tmp_path / "seg.txt", t_start=time[600], t_stop=time[1600]
+    )
+    np.testing.assert_array_equal(data["time"], time[600:1601])
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the rendering and serving of the Prometheus metrics, on a fake
+core."""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+# pylint: disable=missing-function-docstring, redefined-outer-name
+
+import types
+import urllib.error
+import urllib.request
+
+import pytest
+from prometheus_client.parser import text_string_to_metric_families
+
+from ambre_metrics import MetricsServer, _format_value, render
+
+
+def create_fake_core(device_id="Ambre chamber"):
+    state = types.SimpleNamespace(
+        time=10.0,
+        ds18b20_temp=20.25,
+        dht22_temp=20.5,
+        dht22_humi=float("nan"),
+        humi_threshold=50.0,
+        is_valve_open=True,
+        open_valve_when_super_humi=False,
+    )
+    return types.SimpleNamespace(
+        state=state,
+        device_id=device_id,
+        clock=types.SimpleNamespace(monotonic=lambda: 12.5),
+        qdev=None,
+        timing=None,
+        log=None,
+        reconnector=None,
+    )
+
+
+def test_render_known_state():
+    assert render([create_fake_core()]) == (
+        "# HELP ambre_temperature_celsius Temperature reading\n"
+        "# TYPE ambre_temperature_celsius gauge\n"
+        'ambre_temperature_celsius{device="Ambre chamber",sensor="ds18b20"} 20.25\n'
+        'ambre_temperature_celsius{device="Ambre chamber",sensor="dht22"} 20.5\n'
+        "# HELP ambre_humidity_percent Humidity reading\n"
+        "# TYPE ambre_humidity_percent gauge\n"
+        'ambre_humidity_percent{device="Ambre chamber",sensor="dht22"} NaN\n'
+        "# HELP ambre_humidity_threshold_percent Humidity threshold of the "
+        "valve control\n"
+        "# TYPE ambre_humidity_threshold_percent gauge\n"
+        'ambre_humidity_threshold_percent{device="Ambre chamber"} 50.0\n'
+        "# HELP ambre_valve_open Is the valve open?\n"
+        "# TYPE ambre_valve_open gauge\n"
+        'ambre_valve_open{device="Ambre chamber"} 1.0\n'
+        "# HELP ambre_valve_open_when_super_humi Does the valve open above the "
+        "humidity threshold, instead of below?\n"
+        "# TYPE ambre_valve_open_when_super_humi gauge\n"
+        'ambre_valve_open_when_super_humi{device="Ambre chamber"} 0.0\n'
+        "# HELP ambre_reading_age_seconds Time since the most recent reading\n"
+        "# TYPE ambre_reading_age_seconds gauge\n"
+        'ambre_reading_age_seconds{device="Ambre chamber"} 2.5\n'
+    )  # fmt: skip
+
+
+def test_render_parses_and_groups_cores():
+    cores = [create_fake_core("chamber 1"), create_fake_core('a "b"\\c')]
+    families = {
+        family.name: family
+        for family in text_string_to_metric_families(render(cores))
+    }
+
+    temps = families["ambre_temperature_celsius"].samples
+    assert len(temps) == 4
+    assert [x.labels["device"] for x in temps] == [
+        "chamber 1",
+        "chamber 1",
+        'a "b"\\c',
+        'a "b"\\c',
+    ]
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (True, "1.0"),
+        (3, "3.0"),
+        (0.1, "0.1"),
+        (float("nan"), "NaN"),
+        (float("inf"), "+Inf"),
+        (float("-inf"), "-Inf"),
+    ],
+)
+def test_format_value(value, expected):
+    assert _format_value(value) == expected
+
+
+def test_server_caches_between_scrapes():
+    core = create_fake_core()
+    server = MetricsServer([core], port=0)
+    body = server.get_metrics()
+    core.state.ds18b20_temp = 30.0
+    assert server.get_metrics() is body
+    assert server.N_scrapes == 2
+    assert server.N_renders == 1
+
+
+def test_server_serves_metrics_over_http(capsys):
+    # pylint: disable=protected-access
+    server = MetricsServer([create_fake_core()], port=0)
+    assert server.start()
+    try:
+        port = server._server.server_address[1]
+        url = "http://127.0.0.1:%i" % port
+        with urllib.request.urlopen(url + "/metrics", timeout=5) as response:
+            assert response.status == 200
+            assert b"ambre_valve_open" in response.read()
+
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(url + "/other", timeout=5)
+        assert excinfo.value.code == 404
+    finally:
+        server.quit()
+
+    assert "Serving metrics at" in capsys.readouterr().out
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the state transitions of the ``PowerGovernor``, on a fake main
+window."""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+# pylint: disable=missing-function-docstring, redefined-outer-name
+# pylint: disable=protected-access
+
+import pytest
+from PyQt5 import QtCore
+
+from ambre_power import ACTIVE, BACKGROUND, HIDDEN, PowerGovernor
+
+
+class FakeWindow(object):
+    def __init__(self):
+        self.is_visible = True
+        self.is_minimized = False
+        self.is_active = True
+
+    def isVisible(self):  # pylint: disable=invalid-name
+        return self.is_visible
+
+    def isMinimized(self):  # pylint: disable=invalid-name
+        return self.is_minimized
+
+    def isActiveWindow(self):  # pylint: disable=invalid-name
+        return self.is_active
+
+    def windowHandle(self):  # pylint: disable=invalid-name
+        return None
+
+    def installEventFilter(self, obj):  # pylint: disable=invalid-name
+        pass
+
+    def removeEventFilter(self, obj):  # pylint: disable=invalid-name
+        pass
+
+
+class Emitter(QtCore.QObject):
+    signal = QtCore.pyqtSignal()
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+@pytest.fixture
+def governed(qapp):
+    # pylint: disable=unused-argument
+    window = FakeWindow()
+    timer = QtCore.QTimer()
+    emitter = Emitter()
+    calls = {"slot": 0, "restore": 0}
+
+    def slot():
+        calls["slot"] += 1
+
+    def restore():
+        calls["restore"] += 1
+
+    gov = PowerGovernor(window, poll_interval_ms=60000)
+    gov.add_timer(timer, active_ms=100, background_ms=1000)
+    gov.add_signal(emitter.signal, slot)
+    gov.add_restore_slot(restore)
+    gov.start()
+    yield gov, window, timer, emitter, calls
+    gov.stop()
+
+
+def test_timers_follow_the_window_state(governed):
+    gov, window, timer, _, _ = governed
+    assert gov.state == ACTIVE
+    assert timer.isActive() and timer.interval() == 100
+
+    window.is_active = False
+    gov._update_state()
+    assert gov.state == BACKGROUND
+    assert timer.isActive() and timer.interval() == 1000
+
+    window.is_minimized = True
+    gov._update_state()
+    assert gov.state == HIDDEN
+    assert not timer.isActive()
+
+    window.is_minimized = False
+    window.is_active = True
+    gov._update_state()
+    assert gov.state == ACTIVE
+    assert timer.isActive() and timer.interval() == 100
+
+
+def test_hidden_disconnects_and_restore_redraws_once(governed):
+    gov, window, _, emitter, calls = governed
+    emitter.signal.emit()
+    assert calls["slot"] == 1
+
+    window.is_visible = False
+    gov._update_state()
+    emitter.signal.emit()
+    assert calls["slot"] == 1
+    assert calls["restore"] == 0
+
+    window.is_visible = True
+    gov._update_state()
+    gov._update_state()  # No change of state, so no extra redraw
+    emitter.signal.emit()
+    assert calls["slot"] == 2
+    assert calls["restore"] == 1
+
+
+def test_state_changes_get_signalled(governed):
+    gov, window, _, _, _ = governed
+    states = []
+    gov.signal_state_changed.connect(states.append)
+
+    window.is_active = False
+    gov._update_state()
+    gov._update_state()
+    window.is_minimized = True
+    gov._update_state()
+    assert states == [BACKGROUND, HIDDEN]
+
+
+def test_stopped_governor_ignores_the_window(governed):
+    gov, window, timer, _, _ = governed
+    gov.stop()
+    assert not timer.isActive()
+
+    window.is_active = False
+    gov._update_state()
+    assert gov.state == ACTIVE
+    assert not timer.isActive()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the aggregation and reporting of the hot-path profiler, on a fake
+clock."""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+# pylint: disable=missing-function-docstring, redefined-outer-name
+
+import json
+
+import pytest
+
+import ambre_profiler
+from ambre_profiler import StageProfiler, report, request_dump, save
+
+
+@pytest.fixture
+def ticks(monkeypatch):
+    """Timestamps for `perf_counter()` to hand out, in order [s]."""
+    ticks = []
+    monkeypatch.setattr(
+        ambre_profiler.time, "perf_counter", lambda: ticks.pop(0)
+    )
+    return ticks
+
+
+def run_pipeline(profiler, ticks, t0, dt_query, dt_log):
+    ticks.extend((t0, t0 + dt_query, t0 + dt_query + dt_log))
+    profiler.start()
+    profiler.lap("query")
+    profiler.lap("log")
+
+
+def test_disabled_records_nothing(ticks):
+    profiler = StageProfiler()
+    profiler.start()
+    profiler.lap("query")
+    assert not ticks  # The clock did not get read either
+    assert profiler.stats() == {}
+
+
+def test_stats_per_stage(ticks):
+    profiler = StageProfiler(enabled=True)
+    run_pipeline(profiler, ticks, 0.0, 0.004, 0.001)
+    run_pipeline(profiler, ticks, 1.0, 0.002, 0.003)
+
+    stats = profiler.stats()
+    assert list(stats) == ["query", "log"]
+    assert stats["query"]["count"] == 2
+    assert stats["query"]["mean"] == pytest.approx(0.003)
+    assert stats["query"]["max"] == pytest.approx(0.004)
+    assert stats["log"]["total"] == pytest.approx(0.004)
+
+    profiler.reset()
+    assert profiler.stats() == {}
+
+
+def test_report_and_save(ticks, tmp_path):
+    profiler = StageProfiler(enabled=True)
+    run_pipeline(profiler, ticks, 0.0, 0.003, 0.001)
+    profilers = {"Ard": profiler, "Idle": StageProfiler(enabled=True)}
+
+    lines = report(profilers).splitlines()
+    assert lines[0] == "Hot-path profile [µs]:"
+    assert lines[2].split() == ["query", "1", "3000.0", "3000.0", "75.0%"]
+    assert lines[3].split() == ["log", "1", "1000.0", "1000.0", "25.0%"]
+    assert lines[5].strip() == "(no samples)"
+
+    filepath = tmp_path / "profile.json"
+    save(profilers, filepath)
+    with open(filepath, encoding="utf-8") as f:
+        record = json.load(f)
+    assert record["profiles"]["Ard"] == profiler.stats()
+    assert record["profiles"]["Idle"] == {}
+
+
+def test_request_enables_then_dumps(tmp_path, capsys):
+    profilers = {"Ard": StageProfiler()}
+    filepath = tmp_path / "profile.json"
+
+    request_dump(profilers, filepath)
+    assert profilers["Ard"].enabled
+    assert not filepath.exists()
+
+    request_dump(profilers, filepath)
+    assert filepath.exists()
+    assert "Hot-path profile" in capsys.readouterr().out
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the backoff schedule and the outage bookkeeping of the
+``Reconnector``, on a fake clock."""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+# pylint: disable=missing-function-docstring, redefined-outer-name
+
+import time
+
+import pytest
+
+import ambre_reconnect
+from ambre_reconnect import Reconnector
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.t = 100.0
+        self.strftime = time.strftime
+
+    def perf_counter(self):
+        return self.t
+
+
+class FakeArduino(object):
+    """Reconnect function that succeeds from a given attempt onwards."""
+
+    def __init__(self, N_failures):
+        self.N_failures = N_failures
+        self.N_calls = 0
+
+    def reconnect(self):
+        self.N_calls += 1
+        return self.N_calls > self.N_failures
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ambre_reconnect, "time", clock)
+    return clock
+
+
+def run_outage(reconnector, clock):
+    """Attempt to reconnect whenever due, until reconnected. Returns the pause
+    before each attempt [s]."""
+    pauses = []
+    while reconnector.needs_attempt():
+        pause = reconnector.time_until_attempt()
+        pauses.append(pause)
+        clock.t += pause
+        reconnector.attempt()
+    return pauses
+
+
+def test_backoff_schedule(clock):
+    ard = FakeArduino(N_failures=9)
+    reconnector = Reconnector(
+        "test", ard.reconnect, backoff_min=1, backoff_max=60
+    )
+    reconnector.notify_success()
+    clock.t += 5
+
+    assert reconnector.notify_failure()  # Starts the outage
+    assert not reconnector.notify_failure()  # Still the same outage
+
+    # First attempt right away, then doubling up to the maximum
+    pauses = run_outage(reconnector, clock)
+    assert pauses == [0, 1, 2, 4, 8, 16, 32, 60, 60, 60]
+    assert reconnector.N_attempts_outage() == 10
+    assert reconnector.last_time_to_recover == sum(pauses)
+
+    clock.t += 0.5
+    reconnector.notify_success()
+    assert not reconnector.is_in_outage()
+    assert reconnector.last_outage_duration == 5 + sum(pauses) + 0.5
+    assert reconnector.N_attempts_outage() == 0
+
+
+def test_backoff_restarts_each_outage(clock):
+    ard = FakeArduino(N_failures=3)
+    reconnector = Reconnector("test", ard.reconnect, backoff_min=2)
+    reconnector.notify_success()
+
+    reconnector.notify_failure()
+    assert run_outage(reconnector, clock) == [0, 2, 4, 8]
+    reconnector.notify_success()
+
+    ard.N_failures = ard.N_calls + 1
+    reconnector.notify_failure()
+    assert run_outage(reconnector, clock) == [0, 2]
+    reconnector.notify_success()
+
+    assert reconnector.N_outages == 2
+    assert reconnector.N_attempts == 6
+    assert reconnector.total_outage_duration == 14 + 2
+
+
+def test_reconnected_without_readings_keeps_backing_off(clock):
+    ard = FakeArduino(N_failures=1)
+    reconnector = Reconnector("test", ard.reconnect, backoff_min=1)
+    reconnector.notify_success()
+
+    reconnector.notify_failure()
+    assert run_outage(reconnector, clock) == [0, 1]
+
+    # The port opened, but the Arduino does not reply yet
+    assert not reconnector.notify_failure()
+    assert reconnector.is_in_outage()
+    assert reconnector.needs_attempt()
+    assert reconnector.time_until_attempt() == 2
+
+
+def test_backoff_max_below_min(clock):
+    ard = FakeArduino(N_failures=3)
+    reconnector = Reconnector(
+        "test", ard.reconnect, backoff_min=5, backoff_max=1
+    )
+    reconnector.notify_failure()
+    assert run_outage(reconnector, clock) == [0, 5, 5, 5]
+
+
+def test_metrics(clock):
+    ard = FakeArduino(N_failures=1)
+    reconnector = Reconnector("test", ard.reconnect, backoff_min=1)
+    reconnector.notify_success()
+    clock.t += 3
+
+    reconnector.notify_failure()
+    clock.t += 1
+    metrics = reconnector.metrics()
+    assert metrics["is_in_outage"]
+    assert metrics["outage_duration"] == 4  # Since the last reading
+    assert metrics["N_outages"] == 1
+
+    run_outage(reconnector, clock)
+    reconnector.notify_success()
+    metrics = reconnector.metrics()
+    assert not metrics["is_in_outage"]
+    assert metrics["outage_duration"] == 0
+    assert metrics["N_attempts"] == 2
+    assert metrics["last_outage_duration"] == 4 + 1
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the simulated Arduino."""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+# pylint: disable=missing-function-docstring
+
+from ambre_simulator import SimulatedArduino
+
+
+def test_connect_verbose(capsys):
+    ard = SimulatedArduino(connect_to_specific_ID="Ambre chamber 2")
+    assert ard.connect_at_port()
+    out = capsys.readouterr().out
+    assert "Connecting to" in out
+    assert "Found `Ambre chamber 2`" in out
+    ard.close()
+
+
+def test_connect_quietly(capsys):
+    # As done by the port discovery and on every reconnect attempt
+    ard = SimulatedArduino()
+    assert ard.connect_at_port(verbose=False)
+    assert capsys.readouterr().out == ""
+
+    success, reply = ard.query("id?")
+    assert success
+    assert reply == "Arduino, Ambre chamber"
+    ard.close()
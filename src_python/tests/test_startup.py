@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the startup profiler."""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+# pylint: disable=missing-function-docstring
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from ambre_startup import StartupProfiler
+
+
+def test_imports_neither_qt_nor_numpy():
+    # Must be importable before the imports it times
+    code = (
+        "import sys, ambre_startup; "
+        "print(sorted(x for x in sys.modules "
+        "if x.split('.')[0] in ('PyQt5', 'numpy')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_phases_and_first_sample(tmp_path):
+    # pylint: disable=protected-access
+    startup = StartupProfiler()
+    startup.mark("imports")
+    startup.add_span("connect", startup._t0, startup._t0 + 0.5)
+    startup.first_sample()
+    startup.first_sample()  # Only the first one counts
+
+    assert [x[0] for x in startup.phases] == ["imports", "first sample"]
+    assert startup.phases[0][2] == startup.phases[1][1]  # Back to back
+    assert startup.time_to_first_sample == startup.phases[-1][2]
+    assert "time to first sample" in startup.report()
+
+    filepath = tmp_path / "startup.jsonl"
+    startup.save(filepath, engine="qdeviceio")
+    startup.save(filepath)
+    records = [
+        json.loads(x) for x in filepath.read_text(encoding="utf-8").splitlines()
+    ]
+    assert len(records) == 2
+    assert records[0]["engine"] == "qdeviceio"
+    assert records[0]["spans"]["connect"] == 0.5
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the encoding, decoding and validation of the binary telemetry
+frames, and of the resynchronisation of the stream reader on corrupt frames."""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+# pylint: disable=missing-function-docstring, redefined-outer-name
+
+import numpy as np
+import pytest
+
+from ambre_telemetry import (
+    FRAME_SIZE,
+    TelemetryStreamReader,
+    crc16,
+    decode_frame,
+    encode_frame,
+)
+
+
+class FakeSerial(object):
+    """Serial port handing out the bytes fed to it, in reads of any size."""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def feed(self, data):
+        self.data.extend(data)
+
+    @property
+    def in_waiting(self):
+        return len(self.data)
+
+    def read(self, size):
+        chunk = bytes(self.data[:size])
+        del self.data[:size]
+        return chunk
+
+
+def make_frames(N, millis_start=0):
+    return [
+        encode_frame(millis_start + 10 * i, 20 + i, 21.5, 50 + i / 4, i % 2)
+        for i in range(N)
+    ]
+
+
+def stream_millis(frames):
+    return frames["millis"].tolist()
+
+
+# ------------------------------------------------------------------------------
+#   Frames
+# ------------------------------------------------------------------------------
+
+
+def test_crc16_check_value():
+    # Standard check value of CRC-16/CCITT-FALSE
+    assert crc16(b"123456789") == 0x29B1
+
+
+def test_encode_decode_round_trip():
+    frame = encode_frame(123456, 20.25, 21.5, 55.125, 1)
+    assert len(frame) == FRAME_SIZE
+    assert decode_frame(frame) == [123456, 20.25, 21.5, 55.125, 1]
+
+
+def test_decode_keeps_nan_readings():
+    readings = decode_frame(encode_frame(0, np.nan, np.nan, np.nan, 0))
+    assert np.isnan(readings[1:4]).all()
+
+
+@pytest.mark.parametrize("idx", range(FRAME_SIZE))
+def test_decode_rejects_any_corrupt_byte(idx):
+    frame = bytearray(encode_frame(123456, 20.25, 21.5, 55.125, 1))
+    frame[idx] ^= 0x10
+    assert decode_frame(bytes(frame)) is None
+
+
+def test_decode_rejects_wrong_size():
+    frame = encode_frame(0, 20, 20, 50, 0)
+    assert decode_frame(frame[:-1]) is None
+    assert decode_frame(frame + b"\x00") is None
+
+
+# ------------------------------------------------------------------------------
+#   TelemetryStreamReader
+# ------------------------------------------------------------------------------
+
+
+def test_stream_reads_frames_in_bulk():
+    ser = FakeSerial()
+    reader = TelemetryStreamReader(ser)
+    ser.feed(b"".join(make_frames(5)))
+
+    frames = reader.read()
+    assert stream_millis(frames) == [0, 10, 20, 30, 40]
+    assert frames["dht22_humi"].tolist() == [50, 50.25, 50.5, 50.75, 51]
+    assert reader.N_corrupt == 0
+
+
+def test_stream_keeps_partial_frame():
+    ser = FakeSerial()
+    reader = TelemetryStreamReader(ser)
+    data = b"".join(make_frames(2))
+
+    ser.feed(data[: FRAME_SIZE + 5])
+    assert stream_millis(reader.read()) == [0]
+    assert reader.bytes_needed() == FRAME_SIZE - 5
+
+    ser.feed(data[FRAME_SIZE + 5 :])
+    assert stream_millis(reader.read()) == [10]
+    assert reader.bytes_needed() == FRAME_SIZE
+
+
+def test_stream_resyncs_on_leading_garbage():
+    ser = FakeSerial()
+    reader = TelemetryStreamReader(ser)
+    ser.feed(b"\x01\x02\x03" + b"".join(make_frames(3)))
+
+    assert stream_millis(reader.read()) == [0, 10, 20]
+    assert reader.N_corrupt == 1
+
+
+def test_stream_skips_corrupt_frame():
+    ser = FakeSerial()
+    reader = TelemetryStreamReader(ser)
+    frames = make_frames(5)
+    corrupt = bytearray(frames[2])
+    corrupt[10] ^= 0xFF  # Breaks the CRC
+    frames[2] = bytes(corrupt)
+    ser.feed(b"".join(frames))
+
+    assert stream_millis(reader.read()) == [0, 10, 30, 40]
+    assert reader.N_corrupt == 1
+
+
+def test_stream_resyncs_on_truncated_frame():
+    ser = FakeSerial()
+    reader = TelemetryStreamReader(ser)
+    frames = make_frames(4)
+    frames[1] = frames[1][:9]  # Lost bytes
+    ser.feed(b"".join(frames))
+
+    millis = stream_millis(reader.read())
+    assert millis == [0, 20, 30]
+    assert reader.N_corrupt >= 1
+
+
+def test_stream_resyncs_on_false_sync_word_byte_by_byte():
+    ser = FakeSerial()
+    reader = TelemetryStreamReader(ser)
+
+    # A false sync word, as if the start of a frame got lost
+    data = b"\x5a\xa5\x11" + b"".join(make_frames(3))
+
+    millis = []
+    for byte in data:
+        ser.feed(bytes([byte]))
+        millis += stream_millis(reader.read())
+    assert millis == [0, 10, 20]
+    assert reader.N_corrupt >= 1
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests of the coalesced and dirty-tracked refresh of the ``ViewModel``."""
+__author__ = "Dennis van Gils"
+__authoremail__ = "vangils.dennis@gmail.com"
+__url__ = "https://github.com/Dennis-van-Gils/project-Ambre-chamber"
+__date__ = "15-10-2026"
+__version__ = "2.1"
+# pylint: disable=missing-function-docstring, redefined-outer-name
+
+import types
+
+import numpy as np
+import pytest
+from PyQt5 import QtCore
+
+from ambre_viewmodel import ViewModel
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def run_event_loop(ms):
+    loop = QtCore.QEventLoop()
+    QtCore.QTimer.singleShot(ms, loop.quit)
+    loop.exec_()
+
+
+def test_burst_of_requests_coalesces_into_one_refresh(qapp):
+    # pylint: disable=unused-argument
+    shown = []
+    vm = ViewModel(None, frame_interval_ms=10)
+    vm.bind(shown.append, lambda: "x")
+
+    for _ in range(5):
+        vm.request_update()
+    run_event_loop(50)
+
+    assert vm.N_requests == 5
+    assert vm.N_refreshes == 1
+    assert shown == ["x"]
+
+    vm.request_update()
+    run_event_loop(50)
+    assert vm.N_refreshes == 2
+
+
+def test_refresh_only_formats_changed_fields():
+    state = types.SimpleNamespace(temp=20.0, humi=np.nan)
+    calls = {"temp": 0, "humi": 0}
+    shown = {}
+
+    def bind(vm, name):
+        def setter(value):
+            shown[name] = value
+
+        def formatter():
+            calls[name] += 1
+            return "%.1f" % getattr(state, name)
+
+        vm.bind(setter, formatter, fields=[name])
+
+    vm = ViewModel(state)
+    bind(vm, "temp")
+    bind(vm, "humi")
+
+    vm.refresh()
+    assert calls == {"temp": 1, "humi": 1}
+    assert shown == {"temp": "20.0", "humi": "nan"}
+
+    # NaN compares equal to the NaN seen before
+    state.temp = 21.0
+    vm.refresh()
+    assert calls == {"temp": 2, "humi": 1}
+    assert shown["temp"] == "21.0"
+
+
+def test_widget_untouched_when_value_unchanged():
+    state = types.SimpleNamespace(temp=20.04)
+    shown = []
+    vm = ViewModel(state)
+    vm.bind(shown.append, lambda: "%.1f" % state.temp, fields=["temp"])
+
+    vm.refresh()
+    state.temp = 20.01  # Same formatted value
+    vm.refresh()
+    assert shown == ["20.0"]
+    assert vm.N_widget_updates == 1
+
+
+def test_failing_formatter_leaves_other_widgets_alone(capsys):
+    shown = []
+    vm = ViewModel(None)
+    vm.bind(shown.append, lambda: 1 / 0)
+    vm.bind(shown.append, lambda: "ok")
+
+    vm.refresh()
+    assert shown == ["ok"]
+    assert "ZeroDivisionError" in capsys.readouterr().out